@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 from typing import Optional
 
 import config
-from database import db
+from database import WriteBatch, db
 from notifications import send_notification
 from render_api import render_api
 
@@ -25,23 +25,25 @@ class ActivityTracker:
         """בדיקת שירותים לא פעילים והתראות"""
         print("בודק שירותים לא פעילים...")
 
-        # בדיקת שירותים להתראה (מותנה בדגל הפעלה)
-        if self.inactivity_alerts_enabled:
-            alert_services = db.get_inactive_services(self.inactive_days_alert)
-            for service in alert_services:
-                self._send_inactivity_alert(service)
-        else:
-            print("התראות חוסר פעילות כבויות (INACTIVITY_ALERTS_ENABLED=false)")
-
-        # בדיקת שירותים להשעיה אוטומטית (מותנה בדגל הפעלה)
-        if self.auto_suspend_enabled:
-            suspend_services = db.get_inactive_services(self.auto_suspend_days)
-            for service in suspend_services:
-                self._auto_suspend_service(service)
-        else:
-            print("השבתה אוטומטית כבויה (AUTO_SUSPEND_ENABLED=false)")
-
-    def _send_inactivity_alert(self, service: dict):
+        # עדכוני המונים של הסריקה נשלחים יחד ב-bulk_write אחד בסופה
+        with db.write_batch() as batch:
+            # בדיקת שירותים להתראה (מותנה בדגל הפעלה)
+            if self.inactivity_alerts_enabled:
+                alert_services = db.get_inactive_services(self.inactive_days_alert)
+                for service in alert_services:
+                    self._send_inactivity_alert(service, batch)
+            else:
+                print("התראות חוסר פעילות כבויות (INACTIVITY_ALERTS_ENABLED=false)")
+
+            # בדיקת שירותים להשעיה אוטומטית (מותנה בדגל הפעלה)
+            if self.auto_suspend_enabled:
+                suspend_services = db.get_inactive_services(self.auto_suspend_days)
+                for service in suspend_services:
+                    self._auto_suspend_service(service, batch)
+            else:
+                print("השבתה אוטומטית כבויה (AUTO_SUSPEND_ENABLED=false)")
+
+    def _send_inactivity_alert(self, service: dict, batch: Optional[WriteBatch] = None):
         """שליחת התראה על חוסר פעילות"""
         service_id = service["_id"]
         service_name = service.get("service_name", service_id)
@@ -77,10 +79,10 @@ class ActivityTracker:
                 pass
 
         send_notification(message)
-        db.update_alert_sent(service_id)
+        db.update_alert_sent(service_id, batch=batch)
         print(f"נשלחה התראת חוסר פעילות עבור {service_name}")
 
-    def _auto_suspend_service(self, service: dict):
+    def _auto_suspend_service(self, service: dict, batch: Optional[WriteBatch] = None):
         """השעיה אוטומטית של שירות"""
         service_id = service["_id"]
         service_name = service.get("service_name", service_id)
@@ -93,7 +95,7 @@ class ActivityTracker:
         if result["success"]:
             # עדכון במסד הנתונים
             db.update_service_activity(service_id, status="suspended")
-            db.increment_suspend_count(service_id)
+            db.increment_suspend_count(service_id, batch=batch)
 
             # שליחת התראה על השעיה מוצלחת
             message = "✅ השעיה אוטומטית מוצלחת\n"
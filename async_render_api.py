@@ -0,0 +1,372 @@
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, cast
+
+import httpx
+
+import config
+from render_api import (
+	LogPager,
+	RenderAPIBase,
+	RequestBudget,
+	build_legacy_logs_params,
+	build_logs_params,
+	filter_logs_by_window,
+	list_page_params,
+	mutation_result,
+	next_page_cursor,
+	normalize_log_entries,
+	parse_disks_payload,
+	parse_env_vars_payload,
+	parse_latest_deploy_info,
+	parse_latest_deploy_status,
+	parse_logs_payload,
+	parse_services_payload,
+	recent_logs_window,
+	service_metadata,
+	status_from_deploy_status,
+	status_from_service_info,
+)
+
+logger = logging.getLogger(__name__)
+
+# שגיאות רשת/פענוח שמטופלות כמו requests.RequestException בלקוח הסינכרוני
+REQUEST_ERRORS = (httpx.HTTPError, ValueError)
+
+
+class AsyncRenderAPI(RenderAPIBase):
+	"""לקוח Render אסינכרוני (httpx) עם מאגר חיבורים - מקביל לכל מתודה של RenderAPI"""
+
+	def __init__(self) -> None:
+		super().__init__()
+		# הלקוח נוצר בעצלות בתוך ה-event loop הפעיל
+		self._client: Optional[httpx.AsyncClient] = None
+		self._request_count = 0
+
+	def _get_client(self) -> httpx.AsyncClient:
+		if self._client is None or self._client.is_closed:
+			self._client = httpx.AsyncClient(
+				headers=self.headers,
+				limits=httpx.Limits(
+					max_connections=config.RENDER_HTTP_POOL_MAXSIZE,
+					max_keepalive_connections=config.RENDER_HTTP_POOL_MAXSIZE,
+				),
+			)
+		return self._client
+
+	async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+		"""ביצוע בקשה דרך הלקוח המשותף, במסגרת מגבלת הקצב המשותפת (אותה לוגיקה כמו RenderAPI._request)"""
+		attempt = 0
+		while True:
+			await self.rate_limiter.acquire_async()
+			self._request_count += 1
+			response = await self._get_client().request(method, url, **kwargs)
+			self.rate_limiter.observe(response.status_code, response.headers)
+			if response.status_code != 429 or attempt >= config.RENDER_RATE_LIMIT_MAX_RETRIES:
+				return response
+			attempt += 1
+
+	def get_connection_stats(self) -> Dict[str, int]:
+		"""מונה בקשות של הלקוח האסינכרוני"""
+		return {"requests": self._request_count}
+
+	async def close(self) -> None:
+		"""סגירת הלקוח ושחרור החיבורים הפתוחים"""
+		if self._client is not None:
+			await self._client.aclose()
+			self._client = None
+
+	async def suspend_service(self, service_id: str) -> Dict:
+		"""השעיית שירות"""
+		url = f"{self.base_url}/services/{service_id}/suspend"
+
+		try:
+			response = await self._request("POST", url, timeout=15)
+			return mutation_result(response.status_code, (200,), "Service suspended successfully", "", response.text)
+		except REQUEST_ERRORS as e:
+			return {"success": False, "status_code": 0, "message": f"Request failed: {str(e)}"}
+		finally:
+			# אחרי הבקשה, כדי ששליפה מקבילה לא תחזיר לקאש את האובייקט שלפני השינוי
+			self.metadata_cache.invalidate(service_id)
+
+	async def resume_service(self, service_id: str) -> Dict:
+		"""החזרת שירות לפעילות"""
+		url = f"{self.base_url}/services/{service_id}/resume"
+
+		try:
+			response = await self._request("POST", url, timeout=15)
+			return mutation_result(response.status_code, (200,), "Service resumed successfully", "", response.text)
+		except REQUEST_ERRORS as e:
+			return {"success": False, "status_code": 0, "message": f"Request failed: {str(e)}"}
+		finally:
+			self.metadata_cache.invalidate(service_id)
+
+	async def get_service_info(self, service_id: str) -> Optional[Dict[str, Any]]:
+		"""קבלת מידע על שירות"""
+		url = f"{self.base_url}/services/{service_id}"
+
+		generation = self.metadata_cache.generation(service_id)
+		try:
+			response = await self._request("GET", url, timeout=15)
+			if response.status_code == 200:
+				service_info = cast(Dict[str, Any], response.json())
+				self.metadata_cache.put(service_id, service_metadata(service_info), generation)
+				return service_info
+			return None
+		except REQUEST_ERRORS:
+			return None
+
+	async def get_service_metadata(self, service_id: str) -> Optional[Dict[str, Any]]:
+		"""מטא-דאטה של שירות מהקאש המשותף, או מ-Render (אותה לוגיקה כמו RenderAPI.get_service_metadata)"""
+		cached = self.metadata_cache.get(service_id)
+		if cached is not None:
+			return cached
+		service_info = await self.get_service_info(service_id)
+		return service_metadata(service_info) if service_info else None
+
+	async def _get_latest_deploy_status(self, service_id: str) -> Optional[str]:
+		"""מחזיר את סטטוס הדיפלוי האחרון עבור שירות אם זמין"""
+		url = f"{self.base_url}/services/{service_id}/deploys?limit=1"
+		try:
+			response = await self._request("GET", url, timeout=15)
+			if response.status_code != 200:
+				return None
+			return parse_latest_deploy_status(response.json())
+		except REQUEST_ERRORS:
+			return None
+
+	async def get_latest_deploy_info(self, service_id: str) -> Optional[Dict[str, Any]]:
+		"""מחזיר מידע מפורט על הדיפלוי האחרון של שירות"""
+		url = f"{self.base_url}/services/{service_id}/deploys?limit=1"
+		try:
+			response = await self._request("GET", url, timeout=15)
+			if response.status_code != 200:
+				return None
+			return parse_latest_deploy_info(response.json())
+		except REQUEST_ERRORS:
+			return None
+
+	async def get_service_status(self, service_id: str) -> Optional[str]:
+		"""קבלת סטטוס שירות עדכני (אותה לוגיקה כמו RenderAPI.get_service_status)"""
+		status = status_from_service_info(await self.get_service_info(service_id))
+		if status:
+			return status
+		return status_from_deploy_status(await self._get_latest_deploy_status(service_id))
+
+	async def _iter_pages(
+		self, url: str, parse: Callable[[Any], List[Dict[str, Any]]], state: Optional[Dict[str, bool]] = None
+	) -> AsyncIterator[Dict[str, Any]]:
+		"""מעבר על רשימת Render לפי cursor (אותה לוגיקה כמו RenderAPI._iter_pages)"""
+		cursor: Optional[str] = None
+		seen_cursors = set()
+		for _ in range(config.RENDER_LIST_MAX_PAGES):
+			try:
+				response = await self._request("GET", url, params=list_page_params(cursor), timeout=15)
+				if response.status_code != 200:
+					if cursor:
+						logger.warning(f"Stopped paging {url} at cursor {cursor}: code {response.status_code}")
+					return
+				payload = response.json()
+			except REQUEST_ERRORS as e:
+				logger.error(f"Error fetching page of {url}: {e}")
+				return
+			for item in parse(payload):
+				yield item
+			cursor = next_page_cursor(payload)
+			if cursor is None or cursor in seen_cursors:
+				if state is not None:
+					state["complete"] = True
+				return
+			seen_cursors.add(cursor)
+		logger.warning(f"Stopped paging {url} after {config.RENDER_LIST_MAX_PAGES} pages (RENDER_LIST_MAX_PAGES)")
+
+	async def _list_all(self, url: str, parse: Callable[[Any], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+		"""כל העמודים כרשימה, או רשימה ריקה אם המעבר לא הושלם (אותה לוגיקה כמו RenderAPI._list_all)"""
+		state: Dict[str, bool] = {}
+		items = [item async for item in self._iter_pages(url, parse, state)]
+		if not state.get("complete"):
+			if items:
+				logger.warning(f"Discarding incomplete listing of {url} ({len(items)} items fetched)")
+			return []
+		return items
+
+	def iter_services(self) -> AsyncIterator[Dict[str, Any]]:
+		"""כל השירותים בחשבון, עמוד אחרי עמוד (async generator; בשגיאה באמצע נעצר עם רשימה חלקית)"""
+		return self._iter_pages(f"{self.base_url}/services", parse_services_payload)
+
+	async def list_services(self) -> List[Dict[str, Any]]:
+		"""רשימת כל השירותים (כל העמודים); רשימה ריקה אם לא ניתן היה להביא את כולם"""
+		return await self._list_all(f"{self.base_url}/services", parse_services_payload)
+
+	async def get_suspended_services(self) -> list:
+		"""רשימת שירותים מושעים"""
+		services = await self.list_services()
+		return [service for service in services if service.get("status") == "suspended" or service.get("suspended") is True]
+
+	def iter_disks(self) -> AsyncIterator[Dict[str, Any]]:
+		"""כל הדיסקים בחשבון, עמוד אחרי עמוד (async generator; בשגיאה באמצע נעצר עם רשימה חלקית)"""
+		return self._iter_pages(f"{self.base_url}/disks", parse_disks_payload)
+
+	async def list_disks(self) -> List[Dict[str, Any]]:
+		"""מחזיר רשימת דיסקים (Persistent Disks) אם נתמכים ב-API; רשימה ריקה אם לא ניתן היה להביא את כולם"""
+		return await self._list_all(f"{self.base_url}/disks", parse_disks_payload)
+
+	async def get_env_vars(self, service_id: str) -> List[Dict[str, Any]]:
+		"""קבלת רשימת משתני הסביבה של שירות"""
+		url = f"{self.base_url}/services/{service_id}/env-vars"
+
+		try:
+			response = await self._request("GET", url, timeout=15)
+			if response.status_code == 200:
+				return parse_env_vars_payload(response.json())
+			return []
+		except REQUEST_ERRORS as e:
+			logger.error(f"Error fetching env vars for service {service_id}: {e}")
+			return []
+
+	async def update_env_var(self, service_id: str, key: str, value: str) -> Dict[str, Any]:
+		"""עדכון או הוספת משתנה סביבה בודד לשירות"""
+		url = f"{self.base_url}/services/{service_id}/env-vars/{key}"
+
+		try:
+			# נסה PATCH תחילה (עדכון)
+			response = await self._request("PATCH", url, json={"value": value}, timeout=15)
+
+			if response.status_code == 404:
+				# המשתנה לא קיים, ננסה ליצור
+				create_url = f"{self.base_url}/services/{service_id}/env-vars"
+				create_response = await self._request("POST", create_url, json={"key": key, "value": value}, timeout=15)
+				return mutation_result(
+					create_response.status_code,
+					(200, 201),
+					f"Environment variable '{key}' created successfully",
+					"Failed to create env var: ",
+					create_response.text,
+				)
+			return mutation_result(
+				response.status_code,
+				(200, 201),
+				f"Environment variable '{key}' updated successfully",
+				"Failed to update: ",
+				response.text,
+			)
+		except REQUEST_ERRORS as e:
+			return {"success": False, "status_code": 0, "message": f"Request failed: {str(e)}"}
+		finally:
+			self.metadata_cache.invalidate(service_id)
+
+	async def delete_env_var(self, service_id: str, key: str) -> Dict[str, Any]:
+		"""מחיקת משתנה סביבה משירות"""
+		url = f"{self.base_url}/services/{service_id}/env-vars/{key}"
+
+		try:
+			response = await self._request("DELETE", url, timeout=15)
+			return mutation_result(
+				response.status_code,
+				(200, 204),
+				f"Environment variable '{key}' deleted successfully",
+				"Failed to delete: ",
+				response.text,
+			)
+		except REQUEST_ERRORS as e:
+			return {"success": False, "status_code": 0, "message": f"Request failed: {str(e)}"}
+		finally:
+			self.metadata_cache.invalidate(service_id)
+
+	async def get_service_logs(
+		self,
+		service_id: str,
+		tail: int = 100,
+		start_time: Optional[str] = None,
+		end_time: Optional[str] = None,
+		direction: Optional[str] = None,
+		legacy_fallback: bool = True,
+	) -> List[Dict[str, Any]]:
+		"""קבלת לוגים של שירות (כולל נפילה לפרמטרים הישנים אם legacy_fallback)"""
+		url = f"{self.base_url}/services/{service_id}/logs"
+
+		try:
+			params = build_logs_params(tail, start_time, end_time, direction)
+			resp = await self._request("GET", url, params=params, timeout=30)
+			if resp.status_code == 200:
+				logs = normalize_log_entries(parse_logs_payload(resp.json()))
+				if logs or not legacy_fallback:
+					return logs
+			elif not legacy_fallback:
+				logger.warning(f"Failed to fetch logs for {service_id}. code: {resp.status_code}")
+				return []
+
+			legacy_params = build_legacy_logs_params(tail, start_time, end_time)
+			resp2 = await self._request("GET", url, params=legacy_params, timeout=30)
+			if resp2.status_code == 200:
+				return normalize_log_entries(parse_logs_payload(resp2.json()))
+
+			logger.warning(f"Failed to fetch logs for {service_id}. codes: {resp.status_code}, {resp2.status_code}")
+			return []
+		except REQUEST_ERRORS as e:
+			logger.error(f"Error fetching logs for service {service_id}: {e}")
+			return []
+
+	async def iter_service_logs(
+		self,
+		service_id: str,
+		start_time: Optional[str] = None,
+		end_time: Optional[str] = None,
+		direction: str = "backward",
+		max_pages: Optional[int] = None,
+		request_budget: Optional[RequestBudget] = None,
+	) -> AsyncIterator[Dict[str, Any]]:
+		"""מעבר על לוגים של שירות בעמודים (async generator), כמו RenderAPI.iter_service_logs"""
+		url = f"{self.base_url}/services/{service_id}/logs"
+		pager = LogPager(start_time, end_time, direction, max_pages=max_pages, request_budget=request_budget)
+		while True:
+			params = pager.next_params()
+			if params is None:
+				return
+			try:
+				resp = await self._request("GET", url, params=params, timeout=30)
+				if resp.status_code != 200:
+					logger.warning(f"Failed to fetch logs page for {service_id}. code: {resp.status_code}")
+					return
+				payload = resp.json()
+			except REQUEST_ERRORS as e:
+				logger.error(f"Error fetching logs page for service {service_id}: {e}")
+				return
+			for entry in pager.consume(payload, normalize_log_entries(parse_logs_payload(payload))):
+				yield entry
+
+	async def get_latest_logs(self, service_id: str, lines: int = 100) -> List[Dict[str, Any]]:
+		"""N השורות האחרונות (גם מעל 100) בסדר כרונולוגי"""
+		logs: List[Dict[str, Any]] = []
+		if lines > 0:
+			async for entry in self.iter_service_logs(service_id, direction="backward"):
+				logs.append(entry)
+				if len(logs) >= lines:
+					break
+		if not logs:
+			return await self.get_service_logs(service_id, tail=lines)
+		logs.reverse()
+		return logs
+
+	async def get_recent_logs(self, service_id: str, minutes: int = 5) -> List[Dict[str, Any]]:
+		"""קבלת לוגים מהדקות האחרונות"""
+		try:
+			start_str, _, _ = recent_logs_window(minutes)
+			logs = [
+				entry
+				async for entry in self.iter_service_logs(service_id, start_time=start_str, direction="backward")
+			]
+			logs.reverse()
+			if not logs:
+				logs = await self.get_service_logs(service_id, tail=100)
+			if not logs:
+				return []
+
+			_, start_time, end_time = recent_logs_window(minutes)
+			return filter_logs_by_window(logs, start_time, end_time)
+		except Exception as e:
+			logger.error(f"Error in get_recent_logs for {service_id}: {e}")
+			return []
+
+
+# יצירת instance גלובלי
+async_render_api = AsyncRenderAPI()
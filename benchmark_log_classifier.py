@@ -0,0 +1,83 @@
+"""בנצ'מרק לסיווג שורות לוג: המימוש הקודם (re.search לכל pattern) מול LogClassifier.
+
+הרצה: python benchmark_log_classifier.py [מספר שורות]
+לא נוגע ב-Mongo או ב-Render - רק בחוקים שב-log_analysis.
+"""
+
+import random
+import re
+import sys
+import time
+from typing import List, Optional, Sequence
+
+from log_analysis import CRITICAL_PATTERNS, ERROR_PATTERNS, IGNORE_PATTERNS, LogClassifier
+
+
+def legacy_classify(
+    text: str, error_patterns: Sequence[str], critical_patterns: Sequence[str], ignore_patterns: Sequence[str]
+) -> Optional[str]:
+    """המימוש הקודם של LogMonitor - pattern אחרי pattern"""
+    if any(re.search(p, text) for p in ignore_patterns):
+        return "ignore"
+    if not any(re.search(p, text) for p in error_patterns):
+        return None
+    if any(re.search(p, text) for p in critical_patterns):
+        return "critical"
+    return "error"
+
+
+def synthetic_corpus(size: int) -> List[str]:
+    """שורות לוג סינתטיות בתמהיל דומה ללוג של שירות web (רובן לא שגיאות)"""
+    rng = random.Random(42)
+    templates = [
+        "GET /api/items/{n} 200 in {ms}ms",
+        "POST /api/login {code} in {ms}ms",
+        "INFO worker-{n} processed job {hexid}",
+        "DEBUG cache hit ratio {ms}% for key user:{n}",
+        "ERROR Failed to connect to redis at 10.0.0.{n}: connection refused",
+        "Traceback (most recent call last):",
+        '  File "/app/service/handlers.py", line {n}, in handle',
+        "ValueError: invalid literal for int() with base 10: '{hexid}'",
+        "WARNING request timeout after {ms}ms, retrying",
+        "stats: error: 0 warnings: {n}",
+        "health check ok, no error",
+        "FATAL out of memory while allocating {ms} bytes",
+    ]
+    weights = [30, 10, 25, 15, 3, 2, 2, 2, 3, 4, 3, 1]
+    lines = []
+    for _ in range(size):
+        template = rng.choices(templates, weights)[0]
+        lines.append(
+            template.format(
+                n=rng.randint(1, 999),
+                ms=rng.randint(1, 5000),
+                code=rng.choice([200, 201, 401, 404, 500, 503]),
+                hexid=f"{rng.getrandbits(48):012x}",
+            )
+        )
+    return lines
+
+
+def run_benchmark(size: int = 200_000) -> None:
+    """השוואת זמן סיווג לשורה בין המימוש הקודם למסווג המקומפל"""
+    patterns = (ERROR_PATTERNS, CRITICAL_PATTERNS, IGNORE_PATTERNS)
+    corpus = synthetic_corpus(size)
+
+    started = time.perf_counter()
+    legacy = [legacy_classify(line, *patterns) for line in corpus]
+    legacy_seconds = time.perf_counter() - started
+
+    classifier = LogClassifier(*patterns)
+    started = time.perf_counter()
+    compiled = [classifier.classify(line).kind for line in corpus]
+    compiled_seconds = time.perf_counter() - started
+
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    print(f"lines: {size}")
+    print(f"legacy:   {legacy_seconds:.3f}s ({legacy_seconds / size * 1e6:.2f} us/line)")
+    print(f"compiled: {compiled_seconds:.3f}s ({compiled_seconds / size * 1e6:.2f} us/line)")
+    print(f"speedup:  x{legacy_seconds / compiled_seconds:.1f}, mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
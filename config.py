@@ -11,6 +11,27 @@ ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID", "your_admin_chat_id_here")
 # Render API
 RENDER_API_KEY = os.getenv("RENDER_API_KEY", "your_render_api_key_here")
 RENDER_API_URL = "https://api.render.com/v1"
+# מאגר חיבורים (keep-alive) ל-Render API: מספר pools לשמירה, וגודל מקסימלי לכל host
+RENDER_HTTP_POOL_CONNECTIONS = int(os.getenv("RENDER_HTTP_POOL_CONNECTIONS", "4"))
+RENDER_HTTP_POOL_MAXSIZE = int(os.getenv("RENDER_HTTP_POOL_MAXSIZE", "20"))
+# true = המתנה לחיבור פנוי במקום פתיחת חיבור זמני מעבר לגודל המאגר
+RENDER_HTTP_POOL_BLOCK = os.getenv("RENDER_HTTP_POOL_BLOCK", "false").lower() == "true"
+# עימוד (cursor) ברשימות /services ו-/disks: גודל עמוד (100 = המקסימום של Render) ומספר עמודים מקסימלי
+RENDER_LIST_PAGE_SIZE = int(os.getenv("RENDER_LIST_PAGE_SIZE", "100"))
+RENDER_LIST_MAX_PAGES = int(os.getenv("RENDER_LIST_MAX_PAGES", "50"))
+# בקשות מותנות (ETag/Last-Modified) ומטמון תשובות לפי URL: מספר רשומות מקסימלי
+RENDER_RESPONSE_CACHE_SIZE = int(os.getenv("RENDER_RESPONSE_CACHE_SIZE", "1000"))
+# מגביל קצב משותף לכל הקריאות ל-Render (token bucket): בקשות לדקה, גודל פרץ,
+# ואסימונים ששמורים לקריאות אינטראקטיביות (handlers) על פני ניטור ברקע
+RENDER_RATE_LIMIT_PER_MINUTE = int(os.getenv("RENDER_RATE_LIMIT_PER_MINUTE", "300"))
+RENDER_RATE_LIMIT_BURST = int(os.getenv("RENDER_RATE_LIMIT_BURST", "30"))
+RENDER_RATE_LIMIT_INTERACTIVE_RESERVE = int(os.getenv("RENDER_RATE_LIMIT_INTERACTIVE_RESERVE", "5"))
+# ניסיונות חוזרים אחרי 429, והמתנה מקסימלית ל-Retry-After/Ratelimit-Reset
+RENDER_RATE_LIMIT_MAX_RETRIES = int(os.getenv("RENDER_RATE_LIMIT_MAX_RETRIES", "2"))
+RENDER_RATE_LIMIT_MAX_PAUSE_SECONDS = int(os.getenv("RENDER_RATE_LIMIT_MAX_PAUSE_SECONDS", "60"))
+# קאש מטא-דאטה של שירותים (שם, תוכנית, דיסקים): מספר רשומות מקסימלי ותוקף בשניות
+SERVICE_METADATA_CACHE_SIZE = int(os.getenv("SERVICE_METADATA_CACHE_SIZE", "500"))
+SERVICE_METADATA_CACHE_TTL_SECONDS = int(os.getenv("SERVICE_METADATA_CACHE_TTL_SECONDS", "600"))
 
 # MongoDB
 MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
@@ -44,6 +65,52 @@ STATUS_CHECK_INTERVAL_SECONDS = int(os.getenv("STATUS_CHECK_INTERVAL_SECONDS", "
 STATUS_MONITORING_ENABLED = os.getenv("STATUS_MONITORING_ENABLED", "true").lower() == "true"
 # New: while any service is deploying, poll faster to catch transitions
 DEPLOY_CHECK_INTERVAL_SECONDS = int(os.getenv("DEPLOY_CHECK_INTERVAL_SECONDS", "30"))
+# מספר מקסימלי של בדיקות שירות במקביל בכל סבב ניטור
+STATUS_CHECK_MAX_WORKERS = int(os.getenv("STATUS_CHECK_MAX_WORKERS", "8"))
+# זמן מקסימלי להמתנה לסבב בדיקה; שירות שלא הסתיים ימשיך ברקע וידולג עליו בסבב הבא
+STATUS_CHECK_CYCLE_TIMEOUT_SECONDS = int(os.getenv("STATUS_CHECK_CYCLE_TIMEOUT_SECONDS", "120"))
+# תזמון לכל שירות: שירות יציב מאט בהדרגה (x2) עד לתקרה, שירות מושעה נבדק לעיתים רחוקות
+STATUS_CHECK_MAX_INTERVAL_SECONDS = int(os.getenv("STATUS_CHECK_MAX_INTERVAL_SECONDS", "600"))
+SUSPENDED_CHECK_INTERVAL_SECONDS = int(os.getenv("SUSPENDED_CHECK_INTERVAL_SECONDS", "1800"))
+# תמונת מצב של כל הצי: קריאת list_services אחת לסבב במקום שאילתה לכל שירות;
+# שאילתות לשירות בודד רק כשהאובייקט שלו השתנה, כשהוא באמצע דיפלוי, או אחרי FULL_CHECK שניות
+STATUS_FLEET_SNAPSHOT_ENABLED = os.getenv("STATUS_FLEET_SNAPSHOT_ENABLED", "true").lower() == "true"
+STATUS_FLEET_FULL_CHECK_SECONDS = int(os.getenv("STATUS_FLEET_FULL_CHECK_SECONDS", "1800"))
+
+# ניטור לוגים: מספר עמודים מקסימלי (עד 100 רשומות לעמוד) לשירות בכל סבב
+LOG_MONITOR_MAX_PAGES = int(os.getenv("LOG_MONITOR_MAX_PAGES", "10"))
+# מספר שירותים שנסרקים במקביל בכל סבב ניטור לוגים
+LOG_MONITOR_MAX_WORKERS = int(os.getenv("LOG_MONITOR_MAX_WORKERS", "4"))
+# זמן מקסימלי לקריאת הלוגים של שירות בודד בסבב; היתרה נקראת בסבב הבא מהסמן השמור
+LOG_MONITOR_SERVICE_TIMEOUT_SECONDS = int(os.getenv("LOG_MONITOR_SERVICE_TIMEOUT_SECONDS", "45"))
+# מניעת התראות כפולות: מזהי רשומות שטופלו נשמרים ב-Mongo (TTL) ועד N מהם בזיכרון לכל שירות
+LOG_SEEN_TTL_HOURS = int(os.getenv("LOG_SEEN_TTL_HOURS", "48"))
+LOG_SEEN_MAX_PER_SERVICE = int(os.getenv("LOG_SEEN_MAX_PER_SERVICE", "1000"))
+# שגיאה עם אותו fingerprint לא תדווח שוב לפני שעבר הזמן הזה (0 = דיווח בכל סבב)
+LOG_FINGERPRINT_REALERT_MINUTES = int(os.getenv("LOG_FINGERPRINT_REALERT_MINUTES", "30"))
+# חלון מקסימלי (בדקות) לסף קצב שגיאות כמו 20/5m; קובע את גודל המערך הטבעתי לכל שירות
+LOG_RATE_MAX_WINDOW_MINUTES = int(os.getenv("LOG_RATE_MAX_WINDOW_MINUTES", "60"))
+# זיהוי חריגות: ממוצע/שונות נעים (EWMA) של שגיאות לסבב, לכל שירות ולכל שעה ביום (UTC)
+LOG_ANOMALY_SIGMA = float(os.getenv("LOG_ANOMALY_SIGMA", "3"))
+LOG_ANOMALY_ALPHA = float(os.getenv("LOG_ANOMALY_ALPHA", "0.1"))
+# מספר סבבים מינימלי בשעה נתונה לפני שהבסיס נחשב אמין, ומספר שגיאות מינימלי להתראת חריגה
+LOG_ANOMALY_MIN_SAMPLES = int(os.getenv("LOG_ANOMALY_MIN_SAMPLES", "30"))
+LOG_ANOMALY_MIN_ERRORS = int(os.getenv("LOG_ANOMALY_MIN_ERRORS", "3"))
+
+# ארכיון לוגים מקומי (gzip JSONL לכל שירות לכל שעה) - /logs עונה ממנו לפני פנייה ל-Render
+LOG_ARCHIVE_ENABLED = os.getenv("LOG_ARCHIVE_ENABLED", "true").lower() == "true"
+LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "log_archive")
+LOG_ARCHIVE_RETENTION_HOURS = int(os.getenv("LOG_ARCHIVE_RETENTION_HOURS", "72"))
+LOG_ARCHIVE_MAX_MB = int(os.getenv("LOG_ARCHIVE_MAX_MB", "200"))
+# אינדקס חיפוש טקסט מלא (SQLite FTS5) על הלוגים שנקלטים בניטור - עבור /logsearch
+LOG_SEARCH_ENABLED = os.getenv("LOG_SEARCH_ENABLED", "true").lower() == "true"
+LOG_SEARCH_DB_PATH = os.getenv("LOG_SEARCH_DB_PATH", "log_search.db")
+LOG_SEARCH_RETENTION_HOURS = int(os.getenv("LOG_SEARCH_RETENTION_HOURS", "72"))
+# /tail: מרווח בין משיכות (poll אחד משותף לכל הצופים בשירות) וזמן מעקב מקסימלי
+LOG_TAIL_POLL_SECONDS = int(os.getenv("LOG_TAIL_POLL_SECONDS", "5"))
+LOG_TAIL_MAX_MINUTES = int(os.getenv("LOG_TAIL_MAX_MINUTES", "30"))
+# קריאת לוגים בעמודים (/logs, חלונות זמן): מספר עמודים מקסימלי לקריאה אחת
+LOG_PAGINATION_MAX_PAGES = int(os.getenv("LOG_PAGINATION_MAX_PAGES", "20"))
 
 # דיאגנוסטיקה בהפעלה
 DIAG_ON_START = os.getenv("DIAG_ON_START", "false").lower() == "true"
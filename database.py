@@ -1,10 +1,15 @@
+import atexit
 import logging
+import threading
 import time
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure, PyMongoError, ServerSelectionTimeoutError
 
 import config
 
@@ -14,10 +19,183 @@ logger = logging.getLogger(__name__)
 TRANSIENT_DB_ERRORS = (ConnectionFailure, ServerSelectionTimeoutError)
 
 
+class WriteBatch:
+    """איסוף עדכונים במהלך סבב ושליחתם ב-bulk_write(ordered=False) אחד.
+
+    בטוח לשימוש מכמה threads. flush מחזיר תוצאה לכל פעולה לפי סדר ההוספה.
+    deferred - batch ארוך-חיים שמקבל פעולות שנדחו בנפילת חיבור כשה-batch הזה נסגר (with),
+    ושהפעולות שבו נשלחות מחדש ב-flush הבא של כל batch שמשתמש בו.
+    """
+
+    def __init__(self, collection, deferred: Optional["WriteBatch"] = None):
+        self.collection = collection
+        self._ops: List[Any] = []
+        self._lock = threading.Lock()
+        self._deferred = deferred
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        if self._deferred is not None:
+            requeued = self._take_all()
+            if requeued:
+                self._deferred.add_many(requeued)
+                logger.warning(
+                    "Handed %d deferred operations on %s to the shared retry batch", len(requeued), self.collection.name
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ops)
+
+    def add(self, op) -> None:
+        with self._lock:
+            self._ops.append(op)
+
+    def add_many(self, ops: List[Any]) -> None:
+        with self._lock:
+            self._ops.extend(ops)
+
+    def _take_all(self) -> List[Any]:
+        with self._lock:
+            ops, self._ops = self._ops, []
+        return ops
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """שליחת כל הפעולות שנאספו; מחזיר [{"ok": bool, "error": str|None}] לכל פעולה של ה-batch הזה.
+
+        פעולות שנדחו קודם (deferred) נשלחות יחד איתן, אבל לא נכללות בתוצאה.
+        """
+        own_ops = self._take_all()
+        carried = self._deferred._take_all() if self._deferred is not None else []
+        ops = carried + own_ops
+        if not ops:
+            return []
+
+        results: List[Dict[str, Any]] = [{"ok": True, "error": None} for _ in ops]
+        try:
+            self.collection.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                results[write_error["index"]] = {"ok": False, "error": write_error.get("errmsg")}
+            logger.warning(
+                "Bulk write on %s: %d of %d operations failed",
+                self.collection.name,
+                len(e.details.get("writeErrors", [])),
+                len(ops),
+            )
+        except TRANSIENT_DB_ERRORS as e:
+            # החיבור נפל - נחזיר את הפעולות לתור כדי לנסות ב-flush הבא
+            with self._lock:
+                self._ops[:0] = ops
+            logger.warning("Bulk write on %s deferred (%d operations): %s", self.collection.name, len(ops), e)
+            return [{"ok": False, "error": str(e)} for _ in own_ops]
+        except PyMongoError as e:
+            # שגיאה שאינה חולפת (הרשאות, פקודה לא תקינה) - ניסיון חוזר לא יעזור; הפעולות נזנחות
+            logger.error("Bulk write on %s failed, dropping %d operations: %s", self.collection.name, len(ops), e)
+            return [{"ok": False, "error": str(e)} for _ in own_ops]
+        return results[len(carried) :]
+
+
+# אינדקסים לשאילתות החמות, לפי שם ה-attribute של הקולקציה.
+# partialFilterExpression אינו תומך ב-$ne, ולכן אינדקסי הדגלים חלקיים על "הדגל מופעל"
+# (השאילתות מסננות removed != true בנוסף, על קבוצה קטנה של מסמכים).
+INDEX_SPECS = {
+    "services": [
+        IndexModel(
+            [("status_monitoring.enabled", ASCENDING)],
+            name="status_monitoring_enabled",
+            partialFilterExpression={"status_monitoring.enabled": True},
+        ),
+        IndexModel(
+            [("log_monitoring.enabled", ASCENDING)],
+            name="log_monitoring_enabled",
+            partialFilterExpression={"log_monitoring.enabled": True},
+        ),
+        IndexModel(
+            [("deploy_notifications_enabled", ASCENDING)],
+            name="deploy_notifications_enabled",
+            partialFilterExpression={"deploy_notifications_enabled": True},
+        ),
+        IndexModel([("status", ASCENDING)], name="status"),
+        IndexModel([("last_user_activity", ASCENDING)], name="last_user_activity"),
+    ],
+    "deploy_events": [
+        IndexModel([("service_id", ASCENDING), ("reported_at", DESCENDING)], name="service_id_reported_at"),
+    ],
+    "manual_actions": [
+        IndexModel([("service_id", ASCENDING), ("timestamp", DESCENDING)], name="service_id_timestamp"),
+    ],
+    "reminders": [
+        # תזכורות ממתינות: שוויון על sent ואז טווח על remind_at
+        IndexModel([("sent", ASCENDING), ("remind_at", ASCENDING)], name="sent_remind_at"),
+        IndexModel([("user_id", ASCENDING), ("sent", ASCENDING), ("remind_at", ASCENDING)], name="user_id_sent_remind_at"),
+    ],
+    "user_interactions": [
+        IndexModel([("service_id", ASCENDING), ("user_id", ASCENDING)], name="service_id_user_id"),
+    ],
+    "seen_log_entries": [
+        IndexModel([("service_id", ASCENDING), ("seen_at", DESCENDING)], name="service_id_seen_at"),
+        # מחיקה אוטומטית של מזהים ישנים - האוסף נשאר קטן
+        IndexModel([("seen_at", ASCENDING)], name="seen_at_ttl", expireAfterSeconds=config.LOG_SEEN_TTL_HOURS * 3600),
+    ],
+    "error_fingerprints": [
+        # השגיאות הנפוצות / האחרונות של שירות - בלי מיון בזיכרון
+        IndexModel([("service_id", ASCENDING), ("count", DESCENDING)], name="service_id_count"),
+        IndexModel([("service_id", ASCENDING), ("last_seen", DESCENDING)], name="service_id_last_seen"),
+    ],
+}
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    """סופר פקודות שנשלחו ל-MongoDB, לפי תחום (scope) שמוגדר ל-thread הנוכחי"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def scope(self, name: str):
+        previous = getattr(self._local, "scope", None)
+        self._local.scope = name
+        try:
+            yield
+        finally:
+            self._local.scope = previous
+
+    def pop(self, name: str) -> int:
+        """מחזיר את מספר הפקודות שנספרו בתחום ומאפס אותו"""
+        with self._lock:
+            return self._counts.pop(name, 0)
+
+    def started(self, event):
+        name = getattr(self._local, "scope", None)
+        if name:
+            with self._lock:
+                self._counts[name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
 class Database:
     def __init__(self):
         self._connected = False
+        self._indexes_ensured = False
+        self.round_trips = RoundTripCounter()
+        self._write_batches = weakref.WeakSet()
         self._connect()
+        # batch משותף לפעולות שנדחו מ-batches קצרי-חיים; נשלח יחד עם ה-flush הבא של כל batch
+        self._deferred_writes = WriteBatch(self.services)
+        self._write_batches.add(self._deferred_writes)
+        # פעולות שעדיין ממתינות ב-batch יישלחו גם ביציאה מהתהליך
+        atexit.register(self.flush_pending_writes)
 
     def _connect(self):
         """יצירת חיבור ל-MongoDB עם ניסיונות חוזרים."""
@@ -32,6 +210,7 @@ class Database:
             minPoolSize=1,
             maxIdleTimeMS=60000,
             waitQueueTimeoutMS=30000,
+            event_listeners=[self.round_trips],
         )
         self.db = self.client[config.DATABASE_NAME]
         self.services = self.db.service_activity
@@ -40,6 +219,8 @@ class Database:
         self.status_changes = self.db.status_changes
         self.deploy_events = self.db.deploy_events
         self.reminders = self.db.reminders
+        self.seen_log_entries = self.db.seen_log_entries
+        self.error_fingerprints = self.db.error_fingerprints
 
         # בדיקת חיבור ראשונית (לא חוסמת הפעלה)
         try:
@@ -49,6 +230,70 @@ class Database:
         except TRANSIENT_DB_ERRORS as e:
             self._connected = False
             logger.warning("MongoDB is not reachable at startup: %s. Bot will retry on each operation.", e)
+            return
+        self.ensure_indexes()
+
+    def ensure_indexes(self) -> bool:
+        """יצירת האינדקסים המוגדרים ב-INDEX_SPECS (אידמפוטנטי - אינדקס קיים לא נוצר מחדש)"""
+        ok = True
+        for attr, models in INDEX_SPECS.items():
+            collection = getattr(self, attr)
+            for model in models:
+                try:
+                    collection.create_indexes([model])
+                except OperationFailure as e:
+                    # למשל אינדקס קיים באותו שם עם הגדרות שונות - לא נכשיל את ההפעלה
+                    ok = False
+                    logger.warning("Failed to create index %s on %s: %s", model.document["name"], collection.name, e)
+                except TRANSIENT_DB_ERRORS as e:
+                    logger.warning("MongoDB unavailable while creating indexes on %s: %s", collection.name, e)
+                    return False
+        self._indexes_ensured = True
+        return ok
+
+    def write_batch(self) -> WriteBatch:
+        """batch חדש לעדכוני service_activity (נרשם לשליחה גם בכיבוי)"""
+        batch = WriteBatch(self.services, deferred=self._deferred_writes)
+        self._write_batches.add(batch)
+        return batch
+
+    def flush_pending_writes(self) -> None:
+        """שליחת כל ה-batches הפתוחים (hook לכיבוי)"""
+        for batch in list(self._write_batches):
+            try:
+                batch.flush()
+            except Exception as e:
+                logger.error("Failed to flush pending writes: %s", e)
+
+    def _update_service(self, filter_doc: dict, update_doc: dict, batch: Optional[WriteBatch] = None):
+        """update_one מיידי על service_activity, או הוספה ל-batch אם הועבר (ואז מוחזר None)"""
+        if batch is not None:
+            batch.add(UpdateOne(filter_doc, update_doc))
+            return None
+        return self.services.update_one(filter_doc, update_doc)
+
+    def get_index_usage_stats(self) -> list:
+        """שימוש באינדקסים המנוהלים לפי $indexStats: collection, name, ops, since"""
+        stats = []
+        for attr, models in INDEX_SPECS.items():
+            collection = getattr(self, attr)
+            managed = {model.document["name"] for model in models}
+            try:
+                for entry in collection.aggregate([{"$indexStats": {}}]):
+                    if entry.get("name") not in managed:
+                        continue
+                    accesses = entry.get("accesses", {})
+                    stats.append(
+                        {
+                            "collection": collection.name,
+                            "name": entry.get("name"),
+                            "ops": int(accesses.get("ops", 0)),
+                            "since": accesses.get("since"),
+                        }
+                    )
+            except PyMongoError as e:
+                logger.debug("Index stats unavailable for %s: %s", collection.name, e)
+        return stats
 
     @property
     def is_connected(self) -> bool:
@@ -56,6 +301,9 @@ class Database:
         try:
             self.client.admin.command("ping")
             self._connected = True
+            if not self._indexes_ensured:
+                # החיבור לא היה זמין בהפעלה - ניצור את האינדקסים עכשיו
+                self.ensure_indexes()
             return True
         except TRANSIENT_DB_ERRORS:
             self._connected = False
@@ -300,15 +548,15 @@ class Database:
                 continue
         return count
 
-    def update_alert_sent(self, service_id):
+    def update_alert_sent(self, service_id, batch: Optional[WriteBatch] = None):
         """עדכון שהתראה נשלחה"""
-        self.services.update_one(
-            {"_id": service_id}, {"$set": {"notification_settings.last_alert_sent": datetime.now(timezone.utc)}}
+        self._update_service(
+            {"_id": service_id}, {"$set": {"notification_settings.last_alert_sent": datetime.now(timezone.utc)}}, batch
         )
 
-    def increment_suspend_count(self, service_id):
+    def increment_suspend_count(self, service_id, batch: Optional[WriteBatch] = None):
         """הגדלת מספר ההשעיות"""
-        self.services.update_one({"_id": service_id}, {"$inc": {"suspend_count": 1}})
+        self._update_service({"_id": service_id}, {"$inc": {"suspend_count": 1}}, batch)
 
     # ===== New methods for status monitoring =====
 
@@ -353,10 +601,12 @@ class Database:
         """קבלת רשימת שירותים עם ניטור סטטוס פעיל"""
         return list(self.services.find({"status_monitoring.enabled": True, "removed": {"$ne": True}}))
 
-    def update_service_status(self, service_id: str, status: str):
+    def update_service_status(self, service_id: str, status: str, batch: Optional[WriteBatch] = None):
         """עדכון הסטטוס הנוכחי של שירות"""
-        return self.services.update_one(
-            {"_id": service_id}, {"$set": {"last_known_status": status, "last_status_check": datetime.now(timezone.utc)}}
+        return self._update_service(
+            {"_id": service_id},
+            {"$set": {"last_known_status": status, "last_status_check": datetime.now(timezone.utc)}},
+            batch,
         )
 
     def record_manual_action(self, service_id: str, action_type: str = "manual"):
@@ -393,6 +643,65 @@ class Database:
             )
         )
 
+    def get_monitor_snapshot(self) -> list:
+        """כל מה שמוניטור הסטטוס צריך לסבב אחד, בשאילתה אחת.
+
+        מחזיר שירותים עם ניטור סטטוס או התראות דיפלוי מופעלים, כולל זמן הפעולה הידנית
+        האחרונה (last_manual_action_at) ומזהה הדיפלוי האחרון שדווח (last_reported_deploy_id).
+        """
+        pipeline = [
+            {
+                "$match": {
+                    "$or": [{"status_monitoring.enabled": True}, {"deploy_notifications_enabled": True}],
+                    "removed": {"$ne": True},
+                }
+            },
+            {
+                "$project": {
+                    "service_name": 1,
+                    "last_known_status": 1,
+                    "status_monitoring.enabled": 1,
+                    "status_monitoring.enabled_by": 1,
+                    "deploy_notifications_enabled": 1,
+                }
+            },
+            {
+                "$lookup": {
+                    "from": self.manual_actions.name,
+                    "let": {"sid": "$_id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$service_id", "$$sid"]}}},
+                        {"$sort": {"timestamp": -1}},
+                        {"$limit": 1},
+                        {"$project": {"_id": 0, "timestamp": 1}},
+                    ],
+                    "as": "_last_manual_action",
+                }
+            },
+            {
+                "$lookup": {
+                    "from": self.deploy_events.name,
+                    "let": {"sid": "$_id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$service_id", "$$sid"]}}},
+                        {"$sort": {"reported_at": -1}},
+                        {"$limit": 1},
+                        {"$project": {"_id": 0, "deploy_id": 1}},
+                    ],
+                    "as": "_last_reported_deploy",
+                }
+            },
+            {
+                "$addFields": {
+                    # $ifNull משאיר את השדה (כ-null) גם כשאין רשומה, כדי להבדיל מ"לא נטען"
+                    "last_manual_action_at": {"$ifNull": [{"$arrayElemAt": ["$_last_manual_action.timestamp", 0]}, None]},
+                    "last_reported_deploy_id": {"$ifNull": [{"$arrayElemAt": ["$_last_reported_deploy.deploy_id", 0]}, None]},
+                }
+            },
+            {"$project": {"_last_manual_action": 0, "_last_reported_deploy": 0}},
+        ]
+        return list(self.services.aggregate(pipeline))
+
     def clear_test_data(self):
         """מחיקת נתוני בדיקות דמה מהמערכת"""
         # איפוס סטטוס של שירותים שנמצאים במצב בדיקה
@@ -490,13 +799,15 @@ class Database:
         user_id: int,
         service_name: Optional[str] = None,
         error_threshold: int = 5,
+        error_window_minutes: int = 1,
     ):
-        """הפעלת ניטור לוגים לשירות"""
+        """הפעלת ניטור לוגים לשירות (סף: error_threshold שגיאות ב-error_window_minutes דקות)"""
         update_data = {
             "log_monitoring.enabled": True,
             "log_monitoring.enabled_by": user_id,
             "log_monitoring.enabled_at": datetime.now(timezone.utc),
             "log_monitoring.error_threshold": error_threshold,
+            "log_monitoring.error_window_minutes": error_window_minutes,
         }
 
         if service_name:
@@ -529,19 +840,92 @@ class Database:
         """קבלת הגדרות ניטור לוגים של שירות"""
         service = self.services.find_one({"_id": service_id})
         if not service:
-            return {"error_threshold": 5}
+            return {"error_threshold": 5, "error_window_minutes": 1}
         
         log_monitoring = service.get("log_monitoring", {})
         return {
             "enabled": log_monitoring.get("enabled", False),
             "error_threshold": log_monitoring.get("error_threshold", 5),
+            "error_window_minutes": log_monitoring.get("error_window_minutes", 1),
             "enabled_by": log_monitoring.get("enabled_by"),
             "enabled_at": log_monitoring.get("enabled_at"),
         }
 
-    def record_log_error(self, service_id: str, error_count: int, is_critical: bool):
+    def update_log_cursor(self, service_id: str, cursor: dict, batch: Optional[WriteBatch] = None):
+        """שמירת סמן הקריאה (timestamp אחרון + מזהי הרשומות באותו timestamp) של ניטור הלוגים"""
+        return self._update_service({"_id": service_id}, {"$set": {"log_monitoring.cursor": cursor}}, batch)
+
+    def get_seen_log_keys(self, service_id: str, limit: int) -> List[str]:
+        """המזהים (המקוצרים) האחרונים של רשומות לוג שכבר טופלו, מהחדש לישן"""
+        cursor = (
+            self.seen_log_entries.find({"service_id": service_id}, {"key": 1, "_id": 0})
+            .sort("seen_at", DESCENDING)
+            .limit(limit)
+        )
+        return [doc["key"] for doc in cursor]
+
+    def mark_log_keys_seen(self, service_id: str, keys: Iterable[str]) -> None:
+        """שמירת מזהי רשומות שטופלו (upsert אחד לכל מזהה, בפנייה אחת)"""
+        now = datetime.now(timezone.utc)
+        ops = [
+            UpdateOne(
+                {"_id": f"{service_id}:{key}"},
+                {"$set": {"seen_at": now}, "$setOnInsert": {"service_id": service_id, "key": key}},
+                upsert=True,
+            )
+            for key in keys
+        ]
+        if ops:
+            self.seen_log_entries.bulk_write(ops, ordered=False)
+
+    def record_error_fingerprints(self, service_id: str, groups: List[dict], is_critical: bool = False) -> Dict[str, dict]:
+        """עדכון מונים/first_seen/last_seen לכל fingerprint בפנייה אחת; מחזיר את המסמכים המעודכנים לפי fingerprint"""
+        if not groups:
+            return {}
+        now = datetime.now(timezone.utc)
+        ids = [f"{service_id}:{group['fingerprint']}" for group in groups]
+        ops = [
+            UpdateOne(
+                {"_id": doc_id},
+                {
+                    "$inc": {"count": group["count"]},
+                    "$min": {"first_seen": now},
+                    "$max": {"last_seen": now},
+                    "$set": {"sample": group["sample"][:500], "last_was_critical": is_critical},
+                    "$setOnInsert": {
+                        "service_id": service_id,
+                        "fingerprint": group["fingerprint"],
+                        "template": group["template"],
+                    },
+                },
+                upsert=True,
+            )
+            for doc_id, group in zip(ids, groups)
+        ]
+        self.error_fingerprints.bulk_write(ops, ordered=False)
+        return {doc["fingerprint"]: doc for doc in self.error_fingerprints.find({"_id": {"$in": ids}})}
+
+    def mark_fingerprints_alerted(self, service_id: str, fingerprints: Iterable[str]) -> None:
+        """סימון fingerprints שנשלחה עליהם התראה עכשיו"""
+        ids = [f"{service_id}:{fingerprint}" for fingerprint in fingerprints]
+        if ids:
+            self.error_fingerprints.update_many(
+                {"_id": {"$in": ids}}, {"$set": {"last_alerted_at": datetime.now(timezone.utc)}}
+            )
+
+    def get_top_errors(self, service_id: str, limit: int = 5) -> List[dict]:
+        """השגיאות הנפוצות של שירות לפי מספר מופעים (נשען על האינדקס service_id_count)"""
+        return list(
+            self.error_fingerprints.find({"service_id": service_id}).sort("count", DESCENDING).limit(limit)
+        )
+
+    def update_log_baseline(self, service_id: str, bucket: str, state: dict, batch: Optional[WriteBatch] = None):
+        """שמירת מצב ה-EWMA (mean/var/n) של שעה ביום אחת בשירות"""
+        return self._update_service({"_id": service_id}, {"$set": {f"log_monitoring.baseline.{bucket}": state}}, batch)
+
+    def record_log_error(self, service_id: str, error_count: int, is_critical: bool, batch: Optional[WriteBatch] = None):
         """רישום שגיאות לוג שזוהו"""
-        return self.services.update_one(
+        return self._update_service(
             {"_id": service_id},
             {
                 "$set": {
@@ -555,6 +939,7 @@ class Database:
                     "log_monitoring.total_critical_errors": 1 if is_critical else 0,
                 }
             },
+            batch,
         )
 
     def update_log_threshold(self, service_id: str, error_threshold: int):
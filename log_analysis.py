@@ -0,0 +1,382 @@
+import hashlib
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from render_api import parse_log_timestamp
+
+
+class LogClassification(NamedTuple):
+    """תוצאת סיווג שורת לוג: kind אחד מ-ignore/critical/error/None, והחוק שהתאים"""
+
+    kind: Optional[str]
+    rule: Optional[str]
+
+
+# Patterns לזיהוי שגיאות
+ERROR_PATTERNS = [
+    r'(?i)\berror\b',
+    r'(?i)\bexception\b',
+    r'(?i)\bfailed\b',
+    r'(?i)\bcrash\b',
+    r'(?i)\bfatal\b',
+    r'(?i)traceback',
+    r'(?i)stack trace',
+    r'\b[45]\d{2}\b',  # HTTP error codes (4xx, 5xx)
+    r'(?i)uncaught',
+    r'(?i)unhandled',
+]
+
+# Patterns לזיהוי שגיאות קריטיות
+CRITICAL_PATTERNS = [
+    r'(?i)fatal',
+    r'(?i)segmentation fault',
+    r'(?i)out of memory',
+    r'(?i)disk full',
+    r'(?i)database.*(?:down|unreachable)',
+    r'(?i)connection refused',
+    r'(?i)timeout',
+]
+
+# מילים שמסננות false positives
+IGNORE_PATTERNS = [
+    r'(?i)error:\s*0',  # error: 0 = no error
+    r'(?i)no error',
+    r'(?i)errorless',
+]
+
+
+_FLAGS_PREFIX = re.compile(r"^\(\?([aiLmsux]+)\)")
+_ESCAPE = re.compile(r"\\.")
+_WORD_BOUNDED = re.compile(r"^\\b(.+)\\b$")
+
+
+def _split_flags(pattern: str) -> Tuple[str, str]:
+    """הפרדת דגלים גלובליים בתחילת pattern ((?i)...) מגוף ה-pattern"""
+    match = _FLAGS_PREFIX.match(pattern)
+    if not match:
+        return "", pattern
+    return match.group(1), pattern[match.end():]
+
+
+# escapes שמייצגים תו לפי קוד (\x41, \u0041, \N{...}, \101) - עלולים לייצג אות גדולה
+_CODEPOINT_ESCAPE = re.compile(r"\\[xuUN0-7]")
+
+
+def _is_lowercase_safe(body: str) -> bool:
+    """pattern עם (?i) שאפשר להריץ על טקסט באותיות קטנות בלי IGNORECASE: אין בו אותיות גדולות מילוליות
+    (למשל [A-Z] או Error) ואין תווים לפי קוד"""
+    return not _CODEPOINT_ESCAPE.search(body) and not any(ch.isupper() for ch in _ESCAPE.sub("", body))
+
+
+def _is_case_neutral(body: str) -> bool:
+    r"""pattern בלי אותיות מילוליות (למשל \b[45]\d{2}\b) מתאים באותה מידה לטקסט באותיות קטנות"""
+    return not any(ch.isalpha() for ch in _ESCAPE.sub("", body))
+
+
+class _RuleSet:
+    """קבוצת חוקים מקומפלת: כל חוק הוא named group ב-regex המשולב, כך שהחוק שהתאים ידוע מאותו חיפוש"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.rules = list(patterns)
+        lowered_parts: List[str] = []
+        bounded_parts: List[str] = []
+        exact_parts: List[str] = []
+        for index, pattern in enumerate(self.rules):
+            flags, body = _split_flags(pattern)
+            group = f"_rule{index}"
+            if (flags == "i" and _is_lowercase_safe(body)) or (not flags and _is_case_neutral(body)):
+                # רץ על טקסט שהומר לאותיות קטנות פעם אחת - בלי IGNORECASE היקר
+                bounded = _WORD_BOUNDED.match(body)
+                if bounded:
+                    bounded_parts.append(f"(?P<{group}>{bounded.group(1)})")
+                else:
+                    lowered_parts.append(f"(?P<{group}>{body})")
+            else:
+                exact_parts.append(f"(?P<{group}>{pattern})" if not flags else f"(?P<{group}>(?{flags}:{body}))")
+        if bounded_parts:
+            # \ba\b|\bb\b -> \b(?:a|b)\b: גבול מילה נבדק פעם אחת לכל מיקום
+            lowered_parts.insert(0, r"\b(?:" + "|".join(bounded_parts) + r")\b")
+        self._lowered = re.compile("|".join(lowered_parts)).search if lowered_parts else None
+        self._exact = re.compile("|".join(exact_parts)).search if exact_parts else None
+
+    def _rule(self, match: Optional[re.Match]) -> Optional[str]:
+        # הקבוצה החיצונית של החוק נסגרת אחרונה, ולכן lastgroup הוא שם החוק
+        if match is None or not match.lastgroup:
+            return None
+        return self.rules[int(match.lastgroup[len("_rule"):])]
+
+    def search(self, text: str, lowered: str) -> Optional[str]:
+        """החוק שהתאים (המוקדם ביותר בטקסט), או None"""
+        if self._lowered is not None:
+            rule = self._rule(self._lowered(lowered))
+            if rule is not None:
+                return rule
+        return self._rule(self._exact(text)) if self._exact is not None else None
+
+
+class LogClassifier:
+    """מסווג שורות לוג לפי שלוש קבוצות חוקים שמקומפלות פעם אחת.
+
+    סדר ההחלטה זהה לבדיקה המקורית: ignore קודם (false positive), אחר כך error,
+    ורק שורת שגיאה נבדקת גם מול חוקי critical.
+    """
+
+    def __init__(self, error_patterns: Sequence[str], critical_patterns: Sequence[str], ignore_patterns: Sequence[str]):
+        self._ignore = _RuleSet(ignore_patterns)
+        self._error = _RuleSet(error_patterns)
+        self._critical = _RuleSet(critical_patterns)
+
+    def classify(self, text: str) -> LogClassification:
+        """סיווג שורה בודדת: ignore / critical / error / None"""
+        lowered = text.lower()
+        ignore_rule = self._ignore.search(text, lowered)
+        if ignore_rule is not None:
+            return LogClassification("ignore", ignore_rule)
+        error_rule = self._error.search(text, lowered)
+        if error_rule is None:
+            return LogClassification(None, None)
+        critical_rule = self._critical.search(text, lowered)
+        if critical_rule is not None:
+            return LogClassification("critical", critical_rule)
+        return LogClassification("error", error_rule)
+
+    def is_ignored(self, text: str) -> bool:
+        return self._ignore.search(text, text.lower()) is not None
+
+    def is_error(self, text: str) -> bool:
+        return self._error.search(text, text.lower()) is not None
+
+    def is_critical(self, text: str) -> bool:
+        return self._critical.search(text, text.lower()) is not None
+
+
+# נרמול שורת שגיאה לתבנית: החלקים המשתנים בין מופעים של אותה שגיאה מוחלפים במציין קבוע.
+# הסדר חשוב - קודם תבניות ארוכות (זמן, UUID, נתיב) ורק אחר כך מספרים בודדים.
+_FINGERPRINT_RULES = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b"), "<time>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<uuid>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<hex>"),
+    (re.compile(r"\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{8,}\b"), "<hex>"),
+    (re.compile(r"(?:[A-Za-z]:)?(?:[\\/][\w.@~-]+){2,}[\\/]?"), "<path>"),
+    (re.compile(r"(?<![A-Za-z_])\d+(?:\.\d+)*"), "<n>"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+# שורות frame (Python: File "...", line N / Java/Node: at ...)
+_FRAME_LINE = re.compile(r'^(?:File "|at\s)')
+# פתיחת traceback של Python, וסמני שרשור בין חריגות שממשיכים את אותו אירוע
+_TRACEBACK_START = re.compile(r"^Traceback \(most recent call last\):")
+_PY_CHAIN_MARKER = re.compile(r"^(?:During handling of the above exception|The above exception was the direct cause)")
+_CAUSED_BY = re.compile(r"^Caused by:")
+
+
+def _next_state(state: str, text: str) -> Optional[str]:
+    """המצב החדש של האירוע הפתוח אם השורה ממשיכה אותו, או None אם היא פותחת אירוע חדש.
+
+    plain: שורה רגילה - ממשיכים רק שורות מוזחות / frames / Caused by.
+    traceback: בתוך frames - השורה הלא-מוזחת הראשונה היא הודעת החריגה (closed).
+    closed: אחרי הודעת החריגה - שורות ריקות, או סמן שרשור (chain).
+    chain: אחרי סמן שרשור - שורות ריקות עד ה-Traceback הבא.
+    """
+    blank = not text.strip()
+    indented = text[:1] in (" ", "\t")
+    if state == "traceback":
+        if blank or indented or _FRAME_LINE.match(text):
+            return "traceback"
+        return "closed"
+    if state == "closed":
+        if _PY_CHAIN_MARKER.match(text):
+            return "chain"
+        return "closed" if blank or indented else None
+    if state == "chain":
+        if blank:
+            return "chain"
+        return "traceback" if _TRACEBACK_START.match(text) else None
+    if indented or _FRAME_LINE.match(text) or _CAUSED_BY.match(text):
+        return "plain"
+    return None
+
+
+def assemble_multiline(
+    entries: Iterable[dict], max_gap_seconds: float = 1.0, max_lines: int = 200
+) -> Iterator[dict]:
+    """איחוד רשומות לוג רצופות של אותו אירוע (traceback, stack trace) לרשומה אחת.
+
+    רשומה מצטרפת לאירוע הפתוח אם היא באותו stream, במרחק של עד max_gap_seconds
+    מהרשומה הקודמת, ונראית כהמשך שלו (ראו _next_state).
+    מעבר יחיד (O(n)); לכל היותר אירוע אחד של עד max_lines שורות מוחזק בזיכרון.
+    הרשומה המאוחדת שומרת את השדות של הרשומה הראשונה, עם text מחובר ו-line_count.
+    """
+    current: Optional[dict] = None
+    lines: List[str] = []
+    state = "plain"
+    last_ts = None
+
+    def merged(first: dict) -> dict:
+        # שורות ריקות בסוף (לפני סמן שרשור שלא הגיע) לא חלק מהאירוע
+        while len(lines) > 1 and not lines[-1].strip():
+            lines.pop()
+        if len(lines) == 1:
+            return first
+        event = dict(first)
+        event["text"] = "\n".join(lines)
+        event["line_count"] = len(lines)
+        return event
+
+    for entry in entries:
+        text = entry.get("text", "") or ""
+        ts = parse_log_timestamp(entry.get("timestamp"))
+        next_state = None
+        if (
+            current is not None
+            and len(lines) < max_lines
+            and entry.get("stream") == current.get("stream")
+            and (ts is None or last_ts is None or abs((ts - last_ts).total_seconds()) <= max_gap_seconds)
+        ):
+            next_state = _next_state(state, text)
+        if next_state is not None:
+            lines.append(text)
+            state = next_state
+        else:
+            if current is not None:
+                yield merged(current)
+            current = entry
+            lines = [text]
+            state = "traceback" if _TRACEBACK_START.match(text) else "plain"
+        if ts is not None:
+            last_ts = ts
+
+    if current is not None:
+        yield merged(current)
+
+
+def normalize_error_line(text: str) -> str:
+    """תבנית השגיאה: בלי זמנים, מזהי hex/UUID, נתיבים ומספרים.
+
+    באירוע מרובה שורות (traceback) התבנית היא הודעת החריגה + ה-frame הפנימי ביותר,
+    כך שעומק ה-stack או ההודעה בראשו לא משנים את ה-fingerprint.
+    """
+    if "\n" in text:
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        frames = [line for line in lines if _FRAME_LINE.match(line)]
+        # Python: הודעת החריגה בסוף; Java/Node: בשורה הראשונה
+        message = lines[-1] if lines and _TRACEBACK_START.match(lines[0]) else (lines[0] if lines else "")
+        text = message + (f" @ {frames[-1]}" if frames else "")
+    for regex, placeholder in _FINGERPRINT_RULES:
+        text = regex.sub(placeholder, text)
+    return text.strip()[:300]
+
+
+def error_fingerprint(text: str) -> Tuple[str, str]:
+    """(fingerprint, תבנית) לשורת שגיאה - שורות שנבדלות רק בחלקים המשתנים מקבלות אותו fingerprint"""
+    template = normalize_error_line(text)
+    return hashlib.blake2b(template.encode("utf-8"), digest_size=8).hexdigest(), template
+
+
+def group_errors(errors: Sequence[dict]) -> List[dict]:
+    """קיבוץ שגיאות לפי fingerprint, מהנפוצה לנדירה.
+
+    כל קבוצה: fingerprint, template, sample (המופע הראשון), count, first_ts, last_ts.
+    """
+    groups: dict = {}
+    for error in errors:
+        fingerprint, template = error_fingerprint(error.get("text", ""))
+        timestamp = error.get("timestamp")
+        group = groups.get(fingerprint)
+        if group is None:
+            groups[fingerprint] = {
+                "fingerprint": fingerprint,
+                "template": template,
+                "sample": error.get("text", ""),
+                "count": 1,
+                "first_ts": timestamp,
+                "last_ts": timestamp,
+            }
+        else:
+            group["count"] += 1
+            if timestamp:
+                group["last_ts"] = timestamp
+    return sorted(groups.values(), key=lambda g: g["count"], reverse=True)
+
+
+_RATE_THRESHOLD = re.compile(r"^\s*(\d+)\s*(?:/\s*(\d*)\s*([mh]?)\s*)?$", re.IGNORECASE)
+
+
+def parse_rate_threshold(text: str) -> Tuple[int, int]:
+    """פענוח סף קצב שגיאות: "20/5m" -> (20, 5), "3/1h" -> (3, 60), "5" -> (5, 1)"""
+    match = _RATE_THRESHOLD.match(text or "")
+    if not match:
+        raise ValueError(f"Invalid rate threshold: {text!r}")
+    count = int(match.group(1))
+    unit = (match.group(3) or "m").lower()
+    window = int(match.group(2) or 1) * (60 if unit == "h" else 1)
+    if count < 1 or window < 1:
+        raise ValueError(f"Invalid rate threshold: {text!r}")
+    return count, window
+
+
+def format_rate_threshold(count: int, window_minutes: int) -> str:
+    """הצגת סף קצב בפורמט שהפקודה מקבלת (20/5m)"""
+    if window_minutes % 60 == 0:
+        return f"{count}/{window_minutes // 60}h"
+    return f"{count}/{window_minutes}m"
+
+
+class ErrorRateTracker:
+    """מונה שגיאות בחלון זמן נע: מערך טבעתי של דליים לפי דקה.
+
+    זיכרון קבוע (max_window_minutes דליים) ללא קשר לכמות השגיאות. כל דלי שומר
+    את מספר הדקה שלו, כך שדלי ישן מתאפס בפעם הבאה שנוחתים עליו.
+    """
+
+    def __init__(self, max_window_minutes: int = 60):
+        self.size = max(1, max_window_minutes)
+        self._minutes = [-1] * self.size
+        self._counts = [0] * self.size
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _minute(when: Optional[datetime]) -> int:
+        return int((when or datetime.now(timezone.utc)).timestamp() // 60)
+
+    def add(self, when: Optional[datetime] = None, count: int = 1) -> None:
+        """רישום שגיאות בדקה של when (ברירת מחדל: עכשיו); שגיאות מחוץ לחלון המקסימלי נזרקות"""
+        now_minute = self._minute(None)
+        minute = min(self._minute(when), now_minute)
+        if minute <= now_minute - self.size:
+            return
+        slot = minute % self.size
+        with self._lock:
+            if self._minutes[slot] != minute:
+                self._minutes[slot] = minute
+                self._counts[slot] = 0
+            self._counts[slot] += count
+
+    def total(self, window_minutes: int, now: Optional[datetime] = None) -> int:
+        """מספר השגיאות ב-window_minutes הדקות האחרונות (כולל הדקה הנוכחית)"""
+        now_minute = self._minute(now)
+        oldest = now_minute - min(max(1, window_minutes), self.size)
+        with self._lock:
+            return sum(c for m, c in zip(self._minutes, self._counts) if oldest < m <= now_minute)
+
+
+def ewma_update(state: Optional[dict], value: float, alpha: float) -> dict:
+    """עדכון מצטבר של ממוצע ושונות נעים (EWMA) בתצפית אחת - מצב קבוע של 3 מספרים"""
+    if not state or not state.get("n"):
+        return {"mean": float(value), "var": 0.0, "n": 1}
+    mean, var = state["mean"], state["var"]
+    diff = value - mean
+    increment = alpha * diff
+    return {"mean": mean + increment, "var": (1 - alpha) * (var + diff * increment), "n": state["n"] + 1}
+
+
+def ewma_deviation(state: Optional[dict], value: float, min_std: float = 0.5) -> Optional[float]:
+    """בכמה סטיות תקן value מעל הממוצע (None אם אין בסיס); min_std מונע חלוקה בשונות אפסית"""
+    if not state or not state.get("n"):
+        return None
+    std = max(float(state["var"]) ** 0.5, min_std)
+    return (value - float(state["mean"])) / std
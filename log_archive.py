@@ -0,0 +1,251 @@
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import config
+from render_api import parse_log_timestamp
+
+logger = logging.getLogger(__name__)
+
+# מקטע לכל שירות לכל שעה (UTC): <base_dir>/<service_id>/<YYYYMMDDHH>.jsonl.gz
+SEGMENT_FORMAT = "%Y%m%d%H"
+SEGMENT_SUFFIX = ".jsonl.gz"
+INDEX_FILE = "index.json"
+
+
+def _iso(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _hour_floor(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _merge_intervals(intervals: Iterable[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """איחוד טווחים חופפים או נוגעים"""
+    merged: List[Tuple[datetime, datetime]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract_interval(
+    intervals: List[Tuple[datetime, datetime]], cut_start: datetime, cut_end: datetime
+) -> List[Tuple[datetime, datetime]]:
+    """הסרת [cut_start, cut_end) מרשימת טווחים (אחרי מחיקת מקטע)"""
+    result = []
+    for start, end in intervals:
+        if end <= cut_start or start >= cut_end:
+            result.append((start, end))
+            continue
+        if start < cut_start:
+            result.append((start, cut_start))
+        if end > cut_end:
+            result.append((cut_end, end))
+    return result
+
+
+class LogArchive:
+    """ארכיון לוגים מקומי: JSONL דחוס ב-gzip, מקטע לכל שירות לכל שעה, עם אינדקס זמנים קטן.
+
+    הכתיבה היא append בלבד (כל הוספה היא member gzip נוסף באותו קובץ). האינדקס של כל שירות
+    שומר לכל מקטע את טווח הזמנים ומספר הרשומות, ואת טווחי הזמן שנקלטו ברצף (coverage) -
+    כך שאפשר לדעת אילו חלקים מחלון מבוקש חסרים וצריך להביא מ-Render.
+    """
+
+    def __init__(self, base_dir: str, retention_hours: int = 72, max_bytes: int = 200 * 1024 * 1024):
+        self.base_dir = base_dir
+        self.retention_hours = max(1, retention_hours)
+        self.max_bytes = max_bytes
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, service_dir: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(service_dir, threading.Lock())
+
+    def _service_dir(self, service_id: str) -> str:
+        return os.path.join(self.base_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", service_id))
+
+    def _load_index(self, service_dir: str) -> dict:
+        try:
+            with open(os.path.join(service_dir, INDEX_FILE), encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {"segments": {}, "coverage": []}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Corrupt log archive index in {service_dir}, starting fresh: {e}")
+            return {"segments": {}, "coverage": []}
+        if not isinstance(index, dict):
+            logger.warning(f"Corrupt log archive index in {service_dir}, starting fresh: not a JSON object")
+            return {"segments": {}, "coverage": []}
+        return index
+
+    def _save_index(self, service_dir: str, index: dict) -> None:
+        path = os.path.join(service_dir, INDEX_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _coverage(index: dict) -> List[Tuple[datetime, datetime]]:
+        coverage = []
+        for raw_start, raw_end in index.get("coverage", []):
+            start, end = parse_log_timestamp(raw_start), parse_log_timestamp(raw_end)
+            # טווח שלא ניתן לפענח לא נחשב כנקלט - החיפוש יחזור ל-API עבורו
+            if start is not None and end is not None:
+                coverage.append((start, end))
+        return coverage
+
+    def append(self, service_id: str, entries: List[dict], covered_from: datetime, covered_to: datetime) -> None:
+        """הוספת רשומות שנקלטו, וסימון [covered_from, covered_to] כטווח שנקלט במלואו"""
+        service_dir = self._service_dir(service_id)
+        by_segment: Dict[str, List[dict]] = {}
+        for entry in entries:
+            ts = parse_log_timestamp(entry.get("timestamp")) or covered_to
+            by_segment.setdefault(ts.astimezone(timezone.utc).strftime(SEGMENT_FORMAT), []).append(entry)
+
+        with self._lock(service_dir):
+            os.makedirs(service_dir, exist_ok=True)
+            index = self._load_index(service_dir)
+            for segment, segment_entries in by_segment.items():
+                payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in segment_entries)
+                path = os.path.join(service_dir, segment + SEGMENT_SUFFIX)
+                with open(path, "ab") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                    gz.write(payload.encode("utf-8"))
+                timestamps = [str(e["timestamp"]) for e in segment_entries if e.get("timestamp")]
+                meta = index["segments"].setdefault(segment, {"count": 0, "min": None, "max": None})
+                meta["count"] += len(segment_entries)
+                if timestamps:
+                    meta["min"] = min([t for t in (meta["min"], min(timestamps)) if t])
+                    meta["max"] = max([t for t in (meta["max"], max(timestamps)) if t])
+            if covered_to > covered_from:
+                coverage = _merge_intervals(self._coverage(index) + [(covered_from, covered_to)])
+                index["coverage"] = [[_iso(s), _iso(e)] for s, e in coverage]
+            self._save_index(service_dir, index)
+
+    def read_range(self, service_id: str, start: datetime, end: datetime) -> List[dict]:
+        """כל הרשומות בארכיון בטווח [start, end], בסדר כרונולוגי"""
+        service_dir = self._service_dir(service_id)
+        with self._lock(service_dir):
+            index = self._load_index(service_dir)
+            segments = []
+            hour = _hour_floor(start)
+            while hour <= end:
+                segment = hour.strftime(SEGMENT_FORMAT)
+                if segment in index["segments"]:
+                    segments.append(segment)
+                hour += timedelta(hours=1)
+
+            result = []
+            for segment in segments:
+                try:
+                    with gzip.open(os.path.join(service_dir, segment + SEGMENT_SUFFIX), "rt", encoding="utf-8") as f:
+                        for line in f:
+                            entry = json.loads(line)
+                            ts = parse_log_timestamp(entry.get("timestamp"))
+                            if ts is not None and start <= ts <= end:
+                                result.append((ts, entry))
+                except (OSError, EOFError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable log archive segment {segment} of {service_id}: {e}")
+        result.sort(key=lambda item: item[0])
+        return [entry for _, entry in result]
+
+    def missing_ranges(self, service_id: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """חלקי הטווח [start, end] שלא נקלטו לארכיון (צריך להביא אותם מ-Render)"""
+        service_dir = self._service_dir(service_id)
+        with self._lock(service_dir):
+            coverage = self._coverage(self._load_index(service_dir))
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in coverage:
+            if covered_end <= cursor or covered_start >= end:
+                continue
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _drop_segment(self, service_dir: str, index: dict, segment: str) -> int:
+        """מחיקת מקטע והוצאת השעה שלו מה-coverage; מחזיר את הגודל שהתפנה"""
+        path = os.path.join(service_dir, segment + SEGMENT_SUFFIX)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            size = 0
+        index["segments"].pop(segment, None)
+        hour = datetime.strptime(segment, SEGMENT_FORMAT).replace(tzinfo=timezone.utc)
+        coverage = _subtract_interval(self._coverage(index), hour, hour + timedelta(hours=1))
+        index["coverage"] = [[_iso(s), _iso(e)] for s, e in coverage]
+        return size
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """אכיפת שימור (retention_hours) ומגבלת גודל (max_bytes, מהמקטעים הישנים ביותר); מחזיר מספר מקטעים שנמחקו"""
+        if not os.path.isdir(self.base_dir):
+            return 0
+        cutoff = _hour_floor(now or datetime.now(timezone.utc)) - timedelta(hours=self.retention_hours)
+        cutoff_segment = cutoff.strftime(SEGMENT_FORMAT)
+        removed = 0
+        sizes: List[Tuple[str, str, int]] = []
+        for name in os.listdir(self.base_dir):
+            service_dir = os.path.join(self.base_dir, name)
+            if not os.path.isdir(service_dir):
+                continue
+            with self._lock(service_dir):
+                index = self._load_index(service_dir)
+                for segment in sorted(index["segments"]):
+                    if segment < cutoff_segment:
+                        self._drop_segment(service_dir, index, segment)
+                        removed += 1
+                    else:
+                        path = os.path.join(service_dir, segment + SEGMENT_SUFFIX)
+                        sizes.append((segment, name, os.path.getsize(path) if os.path.exists(path) else 0))
+                self._save_index(service_dir, index)
+
+        total = sum(size for _, _, size in sizes)
+        for segment, name, size in sorted(sizes):
+            if total <= self.max_bytes:
+                break
+            service_dir = os.path.join(self.base_dir, name)
+            with self._lock(service_dir):
+                index = self._load_index(service_dir)
+                self._drop_segment(service_dir, index, segment)
+                self._save_index(service_dir, index)
+            total -= size
+            removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, int]:
+        """מספר שירותים, מקטעים וגודל כולל על הדיסק"""
+        services = segments = total_bytes = 0
+        if os.path.isdir(self.base_dir):
+            for name in os.listdir(self.base_dir):
+                service_dir = os.path.join(self.base_dir, name)
+                if not os.path.isdir(service_dir):
+                    continue
+                services += 1
+                for file_name in os.listdir(service_dir):
+                    if file_name.endswith(SEGMENT_SUFFIX):
+                        segments += 1
+                        total_bytes += os.path.getsize(os.path.join(service_dir, file_name))
+        return {"services": services, "segments": segments, "bytes": total_bytes}
+
+
+# יצירת instance גלובלי
+log_archive = LogArchive(
+    config.LOG_ARCHIVE_DIR,
+    retention_hours=config.LOG_ARCHIVE_RETENTION_HOURS,
+    max_bytes=config.LOG_ARCHIVE_MAX_MB * 1024 * 1024,
+)
@@ -1,63 +1,134 @@
+import hashlib
 import logging
-import re
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional
-from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+from collections import deque
 
 import config
-from database import db
+from database import WriteBatch, db
+from log_archive import log_archive
+from log_search import log_search
+from log_analysis import (
+    CRITICAL_PATTERNS,
+    ERROR_PATTERNS,
+    IGNORE_PATTERNS,
+    ErrorRateTracker,
+    LogClassifier,
+    assemble_multiline,
+    ewma_deviation,
+    ewma_update,
+    group_errors,
+)
 from notifications import send_notification
-from render_api import render_api
+from render_api import log_entry_key, mark_background_requests, parse_log_timestamp, render_api
 
 logger = logging.getLogger(__name__)
 
 
+class SeenLogEntries:
+    """מזהי רשומות לוג שכבר טופלו, לכל שירות.
+
+    בזיכרון: deque לסדר כרונולוגי ו-set לחיפוש O(1), עד max_per_service מזהים.
+    ב-Mongo: אוסף עם TTL; נטען בעצלות בפעם הראשונה שהשירות נבדק אחרי הפעלה.
+    """
+
+    def __init__(self, max_per_service: int = 1000):
+        self.max_per_service = max(1, max_per_service)
+        self._order: Dict[str, deque] = {}
+        self._keys: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(entry: dict) -> str:
+        """מזהה קומפקטי (16 תווים) לרשומה - גם לרשומות בלי id"""
+        return hashlib.blake2b(log_entry_key(entry).encode("utf-8"), digest_size=8).hexdigest()
+
+    def _ensure_loaded(self, service_id: str) -> None:
+        with self._lock:
+            if service_id in self._keys:
+                return
+        try:
+            recent = db.get_seen_log_keys(service_id, self.max_per_service)
+        except Exception as e:
+            logger.warning(f"Could not load seen log entries for {service_id}: {e}")
+            recent = []
+        with self._lock:
+            if service_id not in self._keys:
+                # מהישן לחדש, כדי שהפינוי יתחיל מהישן ביותר
+                self._order[service_id] = deque(reversed(recent), maxlen=self.max_per_service)
+                self._keys[service_id] = set(recent)
+
+    def contains(self, service_id: str, key: str) -> bool:
+        self._ensure_loaded(service_id)
+        with self._lock:
+            return key in self._keys[service_id]
+
+    def add_many(self, service_id: str, keys: List[str]) -> None:
+        """סימון מזהים כמטופלים בזיכרון ושמירתם ב-Mongo"""
+        if not keys:
+            return
+        self._ensure_loaded(service_id)
+        with self._lock:
+            order, known = self._order[service_id], self._keys[service_id]
+            for key in keys:
+                if key in known:
+                    continue
+                # ה-deque עומד להשליך את הישן ביותר - נסיר אותו גם מה-set
+                if len(order) >= self.max_per_service:
+                    known.discard(order[0])
+                order.append(key)
+                known.add(key)
+        try:
+            db.mark_log_keys_seen(service_id, keys)
+        except Exception as e:
+            logger.warning(f"Could not persist seen log entries for {service_id}: {e}")
+
+    def forget(self, service_id: str) -> None:
+        """ניקוי הקאש בזיכרון (העותק ב-Mongo פג מעצמו)"""
+        with self._lock:
+            self._order.pop(service_id, None)
+            self._keys.pop(service_id, None)
+
+
 class LogMonitor:
     """מנטר לוגים של שירותים וזיהוי שגיאות"""
 
-    def __init__(self):
-        self.monitoring_thread = None
+    def __init__(self) -> None:
+        self.monitoring_thread: Optional[threading.Thread] = None
         self.stop_monitoring = threading.Event()
         self.check_interval = 60  # בדיקה כל דקה
+        # קריאה מצטברת: עמודים של עד 100 רשומות קדימה מהסמן השמור, עד מגבלת עמודים לסבב
+        self.max_pages = max(1, config.LOG_MONITOR_MAX_PAGES)
+        # סריקה מקבילית: שירות איטי לא מעכב את השאר; שירות שעדיין רץ מדולג בסבב הבא
+        self.max_workers = max(1, config.LOG_MONITOR_MAX_WORKERS)
+        self.service_timeout = max(1, config.LOG_MONITOR_SERVICE_TIMEOUT_SECONDS)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="log-scan", initializer=mark_background_requests
+        )
+        self._in_flight: Set[str] = set()
+        self._in_flight_lock = threading.Lock()
+        self._write_batch = db.write_batch()
+        self.last_cycle_stats: Dict[str, Any] = {}
+        self._last_archive_prune = 0.0
         
-        # קאש של לוגים שכבר נבדקו (למניעת התראות כפולות)
-        # משתמשים ב-deque לסדר כרונולוגי ו-set לחיפוש מהיר (O(1))
-        self.seen_errors_order: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
-        self.seen_errors_set: Dict[str, set] = defaultdict(set)
-        
-        # Patterns לזיהוי שגיאות
-        self.error_patterns = [
-            r'(?i)\berror\b',
-            r'(?i)\bexception\b',
-            r'(?i)\bfailed\b',
-            r'(?i)\bcrash\b',
-            r'(?i)\bfatal\b',
-            r'(?i)traceback',
-            r'(?i)stack trace',
-            r'\b[45]\d{2}\b',  # HTTP error codes (4xx, 5xx)
-            r'(?i)uncaught',
-            r'(?i)unhandled',
-        ]
-        
-        # Patterns לזיהוי שגיאות קריטיות
-        self.critical_patterns = [
-            r'(?i)fatal',
-            r'(?i)segmentation fault',
-            r'(?i)out of memory',
-            r'(?i)disk full',
-            r'(?i)database.*(?:down|unreachable)',
-            r'(?i)connection refused',
-            r'(?i)timeout',
-        ]
+        # רשומות שכבר טופלו (למניעת התראות כפולות) - נשמרות ב-Mongo ושורדות הפעלה מחדש
+        self.seen_entries = SeenLogEntries(config.LOG_SEEN_MAX_PER_SERVICE)
+
+        # קצב שגיאות לכל שירות בחלון נע (דליים של דקה) - לפי זמן השגיאה ולא לפי גודל הסבב
+        self.rate_window_max = max(1, config.LOG_RATE_MAX_WINDOW_MINUTES)
+        self.error_rates: Dict[str, ErrorRateTracker] = {}
+        self._error_rates_lock = threading.Lock()
         
-        # מילים שמסננות false positives
-        self.ignore_patterns = [
-            r'(?i)error:\s*0',  # error: 0 = no error
-            r'(?i)no error',
-            r'(?i)errorless',
-        ]
+        # Patterns לזיהוי שגיאות, שגיאות קריטיות ו-false positives (ברירות המחדל ב-log_analysis)
+        self.error_patterns = list(ERROR_PATTERNS)
+        self.critical_patterns = list(CRITICAL_PATTERNS)
+        self.ignore_patterns = list(IGNORE_PATTERNS)
+
+        # כל קבוצת patterns מקומפלת פעם אחת ל-regex משולב - סיווג שורה במעבר יחיד
+        self.classifier = LogClassifier(self.error_patterns, self.critical_patterns, self.ignore_patterns)
 
     def start_monitoring(self):
         """הפעלת ניטור לוגים ברקע"""
@@ -79,6 +150,7 @@ class LogMonitor:
 
     def _monitor_loop(self):
         """לולאת הניטור הראשית"""
+        mark_background_requests()
         while not self.stop_monitoring.is_set():
             try:
                 self.check_all_services_logs()
@@ -92,157 +164,407 @@ class LogMonitor:
         """בדיקת לוגים של כל השירותים עם ניטור מופעל"""
         logger.info("Checking logs for monitored services")
         
+        # עדכונים שהצטברו משירותים שחרגו מהסבב הקודם נשלחים לפני קריאת המסמכים,
+        # כדי שהסבב החדש יתחיל מהסמן וה-baseline העדכניים
+        self._write_batch.flush()
+
         # קבלת רשימת השירותים עם ניטור לוגים מופעל
         monitored_services = db.get_log_monitored_services()
         
         if not monitored_services:
             logger.debug("No services with log monitoring enabled")
             return
-        
+
+        cycle_started = time.monotonic()
+        futures = {}
+        skipped_in_flight = 0
         for service in monitored_services:
             service_id = service["_id"]
             service_name = service.get("service_name", service_id)
-            
+            log_settings = service.get("log_monitoring", {})
+
+            # הסמן של שירות מתקדם רק מבדיקה אחת בכל פעם
+            with self._in_flight_lock:
+                if service_id in self._in_flight:
+                    skipped_in_flight += 1
+                    continue
+                self._in_flight.add(service_id)
+
+            future = self._executor.submit(self._run_service_scan, service_id, service_name, log_settings)
+            futures[future] = service_id
+
+        if not futures:
+            return
+
+        # כל שירות עוצר את הקריאה אחרי service_timeout; מעבר לכך רק בקשה אחת שכבר בדרך (עד 30s)
+        done, not_done = wait(futures, timeout=self.service_timeout + 30)
+        # רישומי השגיאות של הסבב נשלחים יחד ב-bulk_write אחד בסופו
+        write_results = self._write_batch.flush()
+
+        fetch_latency = {}
+        for future in done:
+            latency = future.result()
+            if latency is not None:
+                fetch_latency[futures[future]] = latency
+
+        cycle_seconds = time.monotonic() - cycle_started
+        slowest = max(fetch_latency.items(), key=lambda item: item[1]) if fetch_latency else None
+        self.last_cycle_stats = {
+            "services": len(futures),
+            "timed_out": len(not_done),
+            "skipped_in_flight": skipped_in_flight,
+            "duration_seconds": round(cycle_seconds, 2),
+            "max_workers": self.max_workers,
+            "fetch_latency": fetch_latency,
+            "slowest_service": slowest[0] if slowest else None,
+            "slowest_fetch_seconds": slowest[1] if slowest else None,
+            "failed_writes": sum(1 for r in write_results if not r["ok"]),
+            "finished_at": datetime.now(timezone.utc),
+        }
+        logger.info(
+            "Log cycle finished: services=%d, wall=%.2fs, timed_out=%d, skipped_in_flight=%d, slowest=%s (%ss)",
+            len(futures),
+            cycle_seconds,
+            len(not_done),
+            skipped_in_flight,
+            self.last_cycle_stats["slowest_service"],
+            self.last_cycle_stats["slowest_fetch_seconds"],
+        )
+
+        # אכיפת שימור וגודל של הארכיון ושל אינדקס החיפוש, לכל היותר פעם ב-10 דקות
+        if time.monotonic() - self._last_archive_prune >= 600:
+            self._last_archive_prune = time.monotonic()
             try:
-                self._check_service_logs(service_id, service_name)
+                if config.LOG_ARCHIVE_ENABLED:
+                    log_archive.prune()
+                if config.LOG_SEARCH_ENABLED:
+                    log_search.prune()
             except Exception as e:
-                logger.error(f"Error checking logs for {service_name}: {e}")
+                logger.warning(f"Log archive prune failed: {e}")
+
+    def _run_service_scan(self, service_id: str, service_name: str, log_settings: dict) -> Optional[float]:
+        """סריקת שירות בודד ב-worker; מחזיר את זמן שליפת הלוגים (שניות) או None בכשל"""
+        try:
+            return self._check_service_logs(
+                service_id, service_name, self._write_batch, log_settings.get("cursor"), log_settings
+            )
+        except Exception as e:
+            logger.error(f"Error checking logs for {service_name}: {e}")
+            return None
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(service_id)
+
+    def _fetch_new_logs(self, service_id: str, cursor: Optional[dict]) -> Tuple[List[Dict], dict]:
+        """שליפת הרשומות החדשות מאז הסמן, בעמודים קדימה עד שמגיעים להווה.
+
+        מחזיר (רשומות חדשות בסדר כרונולוגי, סמן מעודכן). הסמן הוא ה-timestamp האחרון
+        שנקרא ומזהי הרשומות באותו timestamp (כי start כולל את הגבול).
+        """
+        deadline = time.monotonic() + self.service_timeout
+        if cursor and cursor.get("timestamp"):
+            start = str(cursor["timestamp"])
+            boundary_ids = set(cursor.get("ids") or [])
+        else:
+            # הפעלה ראשונה: רק החלון של הסבב האחרון, בלי לסרוק היסטוריה
+            start_dt = datetime.now(timezone.utc) - timedelta(seconds=self.check_interval)
+            start = start_dt.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+            boundary_ids = set()
+
+        new_logs = []
+        for entry in render_api.iter_service_logs(
+            service_id, start_time=start, direction="forward", max_pages=self.max_pages
+        ):
+            if log_entry_key(entry) not in boundary_ids:
+                new_logs.append(entry)
+            # חריגה מהזמן: עוצרים כאן, והסמן מבטיח שההמשך ייקרא בסבב הבא
+            if time.monotonic() > deadline:
+                logger.warning(f"Log fetch for {service_id} exceeded {self.service_timeout}s; continuing next cycle")
+                break
+
+        if new_logs and new_logs[-1].get("timestamp"):
+            last_ts = str(new_logs[-1]["timestamp"])
+            self._archive_logs(service_id, new_logs, start, last_ts)
+            if last_ts != start:
+                start = last_ts
+                boundary_ids = set()
+            boundary_ids.update(log_entry_key(e) for e in new_logs if e.get("timestamp") == last_ts)
+
+        return new_logs, {"timestamp": start, "ids": sorted(boundary_ids)}
+
+    def _archive_logs(self, service_id: str, logs: List[Dict], covered_from: str, covered_to: str) -> None:
+        """שמירת הרשומות שנקלטו בארכיון המקומי; הטווח מהסמן ועד הרשומה האחרונה נקלט ברצף"""
+        if not config.LOG_ARCHIVE_ENABLED:
+            return
+        start_dt, end_dt = parse_log_timestamp(covered_from), parse_log_timestamp(covered_to)
+        if start_dt is None or end_dt is None:
+            return
+        try:
+            log_archive.append(service_id, logs, start_dt, end_dt)
+        except OSError as e:
+            logger.warning(f"Could not archive logs for {service_id}: {e}")
+
+    def _index_logs(self, service_id: str, logs: List[Dict]) -> None:
+        """הוספת הרשומות שנקלטו לאינדקס החיפוש (/logsearch)"""
+        if not config.LOG_SEARCH_ENABLED:
+            return
+        try:
+            log_search.add(service_id, logs)
+        except Exception as e:
+            logger.warning(f"Could not index logs for {service_id}: {e}")
+
+    def _check_service_logs(
+        self,
+        service_id: str,
+        service_name: str,
+        batch: Optional[WriteBatch] = None,
+        cursor: Optional[dict] = None,
+        log_settings: Optional[dict] = None,
+    ) -> float:
+        """בדיקת הלוגים החדשים של שירות מסוים (מאז הסמן השמור); מחזיר את זמן השליפה בשניות.
+
+        log_settings הוא שדה log_monitoring ממסמך השירות (אם כבר נקרא בסבב).
+        """
+        fetch_started = time.monotonic()
+        logs, new_cursor = self._fetch_new_logs(service_id, cursor)
+        fetch_seconds = round(time.monotonic() - fetch_started, 2)
+        if new_cursor != cursor:
+            db.update_log_cursor(service_id, new_cursor, batch=batch)
 
-    def _check_service_logs(self, service_id: str, service_name: str):
-        """בדיקת לוגים של שירות מסוים"""
-        # קבלת הלוגים מה-5 דקות האחרונות
-        logs = render_api.get_service_logs(service_id, tail=500)
-        
         if not logs:
             logger.debug(f"No logs retrieved for {service_name}")
-            return
+            self._observe_baseline(service_id, log_settings, 0, batch)
+            return fetch_seconds
+
+        self._index_logs(service_id, logs)
         
         errors_found = []
         critical_errors = []
+        seen_keys = []
+        rate_tracker = self._rate_tracker(service_id)
         
-        for log_entry in logs:
+        # traceback שמגיע כרשומות נפרדות מאוחד לאירוע אחד - נספר ומסווג פעם אחת
+        for log_entry in assemble_multiline(logs):
             # כל log entry הוא dict עם timestamp, text, stream (stdout/stderr)
             log_text = log_entry.get("text", "")
-            log_id = log_entry.get("id", "")
+            entry_key = self.seen_entries.digest(log_entry)
             
-            # דילוג על לוגים שכבר ראינו
-            # בדיקה מהירה O(1) ב-set
-            if log_id and log_id in self.seen_errors_set[service_id]:
+            # דילוג על לוגים שכבר טופלו (גם לפני הפעלה מחדש) - בדיקה O(1) ב-set
+            if self.seen_entries.contains(service_id, entry_key):
                 continue
             
-            # בדיקה אם זה false positive
-            if self._is_false_positive(log_text):
-                continue
-            
-            # בדיקה אם יש שגיאה
-            if self._contains_error(log_text):
+            # סיווג יחיד: false positive / שגיאה / שגיאה קריטית
+            classification = self.classifier.classify(log_text)
+            if classification.kind in ("error", "critical"):
                 error_info = {
                     "timestamp": log_entry.get("timestamp"),
                     "text": log_text,
                     "stream": log_entry.get("stream", "unknown"),
+                    "rule": classification.rule,
                 }
                 
-                # סימון כראינו
-                if log_id:
-                    # בדיקה אם ה-deque מלא - אם כן, נסיר את הישן מה-set
-                    if len(self.seen_errors_order[service_id]) >= 1000:
-                        # ה-deque עומד להשליך את הישן ביותר - נסיר אותו גם מה-set
-                        oldest = self.seen_errors_order[service_id][0]
-                        self.seen_errors_set[service_id].discard(oldest)
-                    
-                    # הוספה ל-deque (ינקה אוטומטית את הישן אם מלא)
-                    self.seen_errors_order[service_id].append(log_id)
-                    # הוספה ל-set לחיפוש מהיר
-                    self.seen_errors_set[service_id].add(log_id)
+                # סימון כטופל (נשמר ל-Mongo בסוף הבדיקה, בפנייה אחת)
+                seen_keys.append(entry_key)
+                rate_tracker.add(parse_log_timestamp(log_entry.get("timestamp")))
                 
-                # בדיקה אם זו שגיאה קריטית
-                if self._is_critical_error(log_text):
+                if classification.kind == "critical":
                     critical_errors.append(error_info)
                 else:
                     errors_found.append(error_info)
         
+        self.seen_entries.add_many(service_id, seen_keys)
+
+        # מונים לכל fingerprint נשמרים על כל השגיאות, גם אם לא תישלח התראה
+        fingerprint_docs = self._record_fingerprints(service_id, critical_errors, errors_found)
+        anomaly = self._observe_baseline(service_id, log_settings, len(critical_errors) + len(errors_found), batch)
+
         # שליחת התראות
         if critical_errors:
-            self._send_error_alert(service_id, service_name, critical_errors, is_critical=True)
+            self._send_error_alert(
+                service_id, service_name, critical_errors, is_critical=True, batch=batch, fingerprint_docs=fingerprint_docs
+            )
         elif errors_found:
-            # התראה רגילה רק אם יש הרבה שגיאות או אם הוגדר threshold נמוך
-            service_settings = db.get_log_monitoring_settings(service_id)
+            # התראה רגילה אם קצב השגיאות בחלון הנע הגיע לסף (למשל 20/5m) או שהוא חריג ביחס לבסיס
+            service_settings = log_settings if log_settings is not None else db.get_log_monitoring_settings(service_id)
             error_threshold = service_settings.get("error_threshold", 5)
+            window_minutes = min(max(1, service_settings.get("error_window_minutes", 1)), self.rate_window_max)
+            error_rate = rate_tracker.total(window_minutes)
             
-            if len(errors_found) >= error_threshold:
-                self._send_error_alert(service_id, service_name, errors_found, is_critical=False)
+            if error_rate >= error_threshold or anomaly:
+                self._send_error_alert(
+                    service_id,
+                    service_name,
+                    errors_found,
+                    is_critical=False,
+                    batch=batch,
+                    fingerprint_docs=fingerprint_docs,
+                    rate=(error_rate, window_minutes),
+                    anomaly=anomaly,
+                )
+
+        return fetch_seconds
 
     def _contains_error(self, text: str) -> bool:
         """בדיקה אם הטקסט מכיל שגיאה"""
-        for pattern in self.error_patterns:
-            if re.search(pattern, text):
-                return True
-        return False
+        return self.classifier.is_error(text)
 
     def _is_critical_error(self, text: str) -> bool:
         """בדיקה אם זו שגיאה קריטית"""
-        for pattern in self.critical_patterns:
-            if re.search(pattern, text):
-                return True
-        return False
+        return self.classifier.is_critical(text)
 
     def _is_false_positive(self, text: str) -> bool:
         """בדיקה אם זה false positive"""
-        for pattern in self.ignore_patterns:
-            if re.search(pattern, text):
-                return True
-        return False
+        return self.classifier.is_ignored(text)
+
+    def _observe_baseline(
+        self, service_id: str, log_settings: Optional[dict], error_count: int, batch: Optional[WriteBatch] = None
+    ) -> Optional[dict]:
+        """עדכון בסיס ה-EWMA של השעה הנוכחית בתצפית הסבב; מחזיר פרטי חריגה אם error_count חורג ב-k סטיות תקן.
+
+        המצב נקרא ממסמך השירות שכבר נטען בסבב ונכתב בחזרה דרך ה-batch - בלי פניות נוספות.
+        """
+        if log_settings is None:
+            return None
+        bucket = str(datetime.now(timezone.utc).hour)
+        state = (log_settings.get("baseline") or {}).get(bucket)
+
+        anomaly = None
+        sigma = ewma_deviation(state, error_count)
+        if (
+            state is not None
+            and sigma is not None
+            and state["n"] >= config.LOG_ANOMALY_MIN_SAMPLES
+            and error_count >= config.LOG_ANOMALY_MIN_ERRORS
+            and sigma >= config.LOG_ANOMALY_SIGMA
+        ):
+            anomaly = {"count": error_count, "mean": state["mean"], "std": state["var"] ** 0.5, "sigma": sigma}
+
+        try:
+            db.update_log_baseline(service_id, bucket, ewma_update(state, error_count, config.LOG_ANOMALY_ALPHA), batch=batch)
+        except Exception as e:
+            logger.warning(f"Could not update error baseline for {service_id}: {e}")
+        return anomaly
+
+    def _rate_tracker(self, service_id: str) -> ErrorRateTracker:
+        with self._error_rates_lock:
+            tracker = self.error_rates.get(service_id)
+            if tracker is None:
+                tracker = self.error_rates[service_id] = ErrorRateTracker(self.rate_window_max)
+            return tracker
+
+    def _record_fingerprints(self, service_id: str, critical_errors: List[Dict], errors: List[Dict]) -> Dict[str, dict]:
+        """עדכון מוני ה-fingerprints של הסבב; כשל ב-DB לא מונע התראה"""
+        if not critical_errors and not errors:
+            return {}
+        try:
+            docs = db.record_error_fingerprints(service_id, group_errors(errors), is_critical=False) if errors else {}
+            if critical_errors:
+                docs.update(db.record_error_fingerprints(service_id, group_errors(critical_errors), is_critical=True))
+            return docs
+        except Exception as e:
+            logger.warning(f"Could not record error fingerprints for {service_id}: {e}")
+            return {}
+
+    def _recently_alerted(self, fingerprint_doc: Optional[dict]) -> bool:
+        """האם כבר נשלחה התראה על ה-fingerprint בחלון LOG_FINGERPRINT_REALERT_MINUTES"""
+        if not fingerprint_doc or config.LOG_FINGERPRINT_REALERT_MINUTES <= 0:
+            return False
+        last_alerted: Optional[datetime] = fingerprint_doc.get("last_alerted_at")
+        if last_alerted is None:
+            return False
+        if last_alerted.tzinfo is None:
+            last_alerted = last_alerted.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - last_alerted < timedelta(minutes=config.LOG_FINGERPRINT_REALERT_MINUTES)
+
+    def _send_error_alert(
+        self,
+        service_id: str,
+        service_name: str,
+        errors: List[Dict],
+        is_critical: bool,
+        batch: Optional[WriteBatch] = None,
+        fingerprint_docs: Optional[Dict[str, dict]] = None,
+        rate: Optional[Tuple[int, int]] = None,
+        anomaly: Optional[dict] = None,
+    ):
+        """שליחת התראה על שגיאות שזוהו, מקובצות לפי fingerprint"""
+        fingerprint_docs = fingerprint_docs or {}
+        groups = group_errors(errors)
+        # שגיאות שכבר דווחו לאחרונה (למשל crash loop) לא מייצרות התראה חוזרת
+        fresh_groups = [g for g in groups if not self._recently_alerted(fingerprint_docs.get(g["fingerprint"]))]
+        db.record_log_error(service_id, len(errors), is_critical, batch=batch)
+        if not fresh_groups:
+            logger.info(f"Suppressed repeated error alert for {service_name} ({len(groups)} known fingerprints)")
+            return
 
-    def _send_error_alert(self, service_id: str, service_name: str, errors: List[Dict], is_critical: bool):
-        """שליחת התראה על שגיאות שזוהו"""
         emoji = "🔥" if is_critical else "⚠️"
         severity = "קריטית" if is_critical else "רגילה"
         
         message = f"{emoji} *התראת שגיאה {severity}*\n\n"
         message += f"🤖 שירות: *{service_name}*\n"
         message += f"🆔 ID: `{service_id}`\n"
-        message += f"📊 זוהו {len(errors)} שגיאות\n\n"
+        message += f"📊 {len(errors)} מופעים של {len(groups)} שגיאות שונות\n"
+        if rate:
+            message += f"📈 {rate[0]} שגיאות ב-{rate[1]} הדקות האחרונות\n"
+        if anomaly:
+            message += (
+                f"📉 חריגה מהרגיל: {anomaly['count']} שגיאות בסבב לעומת ממוצע "
+                f"{anomaly['mean']:.1f}±{anomaly['std']:.1f} בשעה זו ({anomaly['sigma']:.1f}σ)\n"
+            )
+        message += "\n"
         
-        # הצגת עד 3 שגיאות ראשונות
-        message += "*שגיאות אחרונות:*\n"
-        for i, error in enumerate(errors[:3], 1):
-            timestamp = error.get("timestamp", "")
-            text = error.get("text", "")
+        # הצגת עד 3 סוגי השגיאות הנפוצים
+        message += "*שגיאות נפוצות:*\n"
+        for i, group in enumerate(fresh_groups[:3], 1):
+            text = group["sample"]
+            doc = fingerprint_docs.get(group["fingerprint"], {})
+            total = doc.get("count", group["count"])
+            is_new = total == group["count"]
             
-            # קיצור הטקסט אם ארוך מדי
+            # קיצור הטקסט אם ארוך מדי (ב-traceback הסוף הוא החלק החשוב)
             if len(text) > 200:
-                text = text[:200] + "..."
+                text = "..." + text[-200:] if "\n" in text else text[:200] + "..."
             
             # הסרת תווים מיוחדים שמפריעים ב-Markdown
             text = text.replace("*", "\\*").replace("_", "\\_").replace("`", "\\`")
             
-            message += f"\n{i}. ```\n{text}\n```"
+            badge = "🆕" if is_new else f"(מתוך {total})"
+            message += f"\n{i}. ×{group['count']} {badge}\n```\n{text}\n```"
         
-        if len(errors) > 3:
-            message += f"\n\n_ועוד {len(errors) - 3} שגיאות נוספות..._"
+        if len(fresh_groups) > 3:
+            message += f"\n\n_ועוד {len(fresh_groups) - 3} סוגי שגיאות נוספים..._"
+        if len(groups) > len(fresh_groups):
+            message += f"\n_{len(groups) - len(fresh_groups)} סוגי שגיאות כבר דווחו לאחרונה_"
         
         message += f"\n\n💡 הקש `/logs {service_id}` לצפייה מלאה"
         
         # שליחת ההתראה
         send_notification(message)
-        
-        # רישום במסד הנתונים
-        db.record_log_error(service_id, len(errors), is_critical)
+        try:
+            db.mark_fingerprints_alerted(service_id, [g["fingerprint"] for g in fresh_groups])
+        except Exception as e:
+            logger.warning(f"Could not mark fingerprints as alerted for {service_id}: {e}")
         
         logger.info(f"Sent {'critical' if is_critical else 'regular'} error alert for {service_name}")
 
-    def enable_monitoring(self, service_id: str, user_id: int, service_name: Optional[str] = None,
-                         error_threshold: int = 5) -> bool:
+    def enable_monitoring(
+        self,
+        service_id: str,
+        user_id: int,
+        service_name: Optional[str] = None,
+        error_threshold: int = 5,
+        error_window_minutes: int = 1,
+    ) -> bool:
         """הפעלת ניטור לוגים לשירות"""
         try:
             if not service_name:
-                service_info = render_api.get_service_info(service_id)
+                service_info = render_api.get_service_metadata(service_id)
                 if not service_info:
                     return False
                 service_name = service_info.get("name", service_id)
             
             # עדכון במסד הנתונים
-            db.enable_log_monitoring(service_id, user_id, service_name, error_threshold)
+            db.enable_log_monitoring(service_id, user_id, service_name, error_threshold, error_window_minutes)
             
             logger.info(f"Log monitoring enabled for {service_name} by user {user_id}")
             return True
@@ -256,10 +578,9 @@ class LogMonitor:
             db.disable_log_monitoring(service_id, user_id)
             
             # ניקוי קאש
-            if service_id in self.seen_errors_order:
-                del self.seen_errors_order[service_id]
-            if service_id in self.seen_errors_set:
-                del self.seen_errors_set[service_id]
+            self.seen_entries.forget(service_id)
+            with self._error_rates_lock:
+                self.error_rates.pop(service_id, None)
             
             logger.info(f"Log monitoring disabled for {service_id} by user {user_id}")
             return True
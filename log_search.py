@@ -0,0 +1,114 @@
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import config
+from render_api import parse_log_timestamp
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5(
+    text,
+    service_id UNINDEXED,
+    stream UNINDEXED,
+    ts UNINDEXED,
+    tokenize = 'unicode61'
+)
+"""
+
+
+def to_fts_phrase(query: str) -> str:
+    """המרת טקסט חופשי לביטוי FTS5 מדויק (בלי אופרטורים שהמשתמש לא התכוון אליהם)"""
+    return '"' + query.replace('"', '""') + '"'
+
+
+class LogSearchIndex:
+    """אינדקס חיפוש טקסט מלא (SQLite FTS5) על הלוגים שנקלטים בניטור.
+
+    כל רשומה נשמרת עם service_id, stream וזמן (epoch) כעמודות לא מאונדקסות;
+    הסינון לפי זמן/שירות נעשה על תוצאות ה-MATCH.
+    """
+
+    def __init__(self, db_path: str, retention_hours: int = 72):
+        self.db_path = db_path
+        self.retention_hours = max(1, retention_hours)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        # החיבור נפתח בעצלות ומשותף לכל ה-threads (הגישה מסונכרנת ב-lock)
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def add(self, service_id: str, entries: List[dict]) -> int:
+        """הוספת רשומות שנקלטו לאינדקס; מחזיר כמה נוספו"""
+        rows = []
+        for entry in entries:
+            text = entry.get("text")
+            if not text:
+                continue
+            ts = parse_log_timestamp(entry.get("timestamp")) or datetime.now(timezone.utc)
+            rows.append((text, service_id, entry.get("stream", ""), int(ts.timestamp())))
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT INTO log_fts (text, service_id, stream, ts) VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def search(self, query: str, since: datetime, service_id: Optional[str] = None, limit: int = 50) -> Dict:
+        """חיפוש ביטוי מאז since (ואופציונלית בשירות אחד).
+
+        Returns:
+            {"counts": {service_id: מספר התאמות}, "matches": [{service_id, text, stream, timestamp}, ...]}
+            matches מהחדש לישן, עד limit.
+        """
+        where = "log_fts MATCH ? AND ts >= ?"
+        params: list = [to_fts_phrase(query), int(since.timestamp())]
+        if service_id:
+            where += " AND service_id = ?"
+            params.append(service_id)
+        with self._lock:
+            conn = self._connection()
+            counts = dict(
+                conn.execute(f"SELECT service_id, COUNT(*) FROM log_fts WHERE {where} GROUP BY service_id", params)
+            )
+            rows = conn.execute(
+                f"SELECT service_id, text, stream, ts FROM log_fts WHERE {where} ORDER BY ts DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        matches = [
+            {
+                "service_id": sid,
+                "text": text,
+                "stream": stream,
+                "timestamp": datetime.fromtimestamp(ts, timezone.utc),
+            }
+            for sid, text, stream, ts in rows
+        ]
+        return {"counts": counts, "matches": matches}
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """מחיקת רשומות ישנות מ-retention_hours; מחזיר כמה נמחקו"""
+        cutoff = int((now or datetime.now(timezone.utc)).timestamp()) - self.retention_hours * 3600
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute("DELETE FROM log_fts WHERE ts < ?", (cutoff,)).rowcount
+
+
+# יצירת instance גלובלי
+log_search = LogSearchIndex(config.LOG_SEARCH_DB_PATH, retention_hours=config.LOG_SEARCH_RETENTION_HOURS)
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import config
+from async_render_api import AsyncRenderAPI, async_render_api
+from render_api import log_entry_key, mark_background_requests
+
+logger = logging.getLogger(__name__)
+
+# מגבלת אורך הודעת טלגרם (4096) פחות מקום לכותרת
+MAX_MESSAGE_CHARS = 3500
+
+
+class _Subscriber:
+    """צופה אחד: הודעה אחת שנערכת עם השורות האחרונות, עד deadline"""
+
+    def __init__(self, message: Any, deadline: float, max_lines: int):
+        self.message = message
+        self.deadline = deadline
+        self.lines: deque = deque(maxlen=max_lines)
+        self.last_text = ""
+
+
+class _ServiceTail:
+    """משיכה משותפת לשירות: סמן אחד ו-task אחד לכל הצופים"""
+
+    def __init__(self, service_id: str, service_name: str, start: str):
+        self.service_id = service_id
+        self.service_name = service_name
+        # סמן: ה-timestamp האחרון שנקרא ומזהי הרשומות בו (start כולל את הגבול)
+        self.cursor = start
+        self.boundary_ids: set = set()
+        self.subscribers: Dict[int, _Subscriber] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.polls = 0
+
+
+class LogTailManager:
+    """/tail: מעקב חי אחרי לוגים של שירות בעריכת הודעה אחת.
+
+    לכל שירות יש poll יחיד ל-Render (סמן מצטבר קדימה), גם כשכמה משתמשים עוקבים אחריו;
+    כל צופה נעצר אוטומטית בתום הזמן שלו, וה-poll נעצר כשלא נשארו צופים.
+    """
+
+    def __init__(self, api: AsyncRenderAPI, poll_interval: int = 5, max_lines: int = 30):
+        self.api = api
+        self.poll_interval = max(1, poll_interval)
+        self.max_lines = max_lines
+        self._tails: Dict[str, _ServiceTail] = {}
+
+    def is_tailing(self, service_id: str) -> bool:
+        return service_id in self._tails
+
+    async def subscribe(self, service_id: str, service_name: str, chat_id: int, message: Any, minutes: int) -> None:
+        """הוספת צופה (צ'אט) לשירות; צ'אט שכבר צופה מקבל הודעה חדשה וזמן מעודכן"""
+        tail = self._tails.get(service_id)
+        if tail is None:
+            # מתחילים דקה אחורה כדי שההודעה הראשונה לא תהיה ריקה
+            start = (datetime.now(timezone.utc) - timedelta(minutes=1)).replace(microsecond=0)
+            tail = _ServiceTail(service_id, service_name, start.isoformat().replace("+00:00", "Z"))
+            self._tails[service_id] = tail
+        subscriber = _Subscriber(message, time.monotonic() + minutes * 60, self.max_lines)
+        # צופה שמצטרף ל-poll קיים מקבל את השורות שכבר נאספו
+        existing = next(iter(tail.subscribers.values()), None)
+        if existing is not None:
+            subscriber.lines.extend(existing.lines)
+        previous = tail.subscribers.get(chat_id)
+        tail.subscribers[chat_id] = subscriber
+        if previous is not None:
+            # ההודעה הקודמת של אותו צ'אט לא תתעדכן יותר - מסמנים אותה כעצורה
+            await self._edit(tail, previous, "⏹️ המעקב הועבר להודעה חדשה")
+        if tail.task is None or tail.task.done():
+            tail.task = asyncio.create_task(self._poll_loop(tail))
+
+    async def unsubscribe_chat(self, chat_id: int) -> int:
+        """עצירת כל המעקבים של צ'אט; מחזיר כמה נעצרו"""
+        stopped = 0
+        for tail in list(self._tails.values()):
+            subscriber = tail.subscribers.pop(chat_id, None)
+            if subscriber is not None:
+                stopped += 1
+                await self._edit(tail, subscriber, "⏹️ המעקב הופסק")
+        return stopped
+
+    async def stop_all(self) -> None:
+        """עצירת כל ה-polls (בכיבוי)"""
+        for tail in list(self._tails.values()):
+            if tail.task is not None:
+                tail.task.cancel()
+        self._tails.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "services": len(self._tails),
+            "subscribers": sum(len(t.subscribers) for t in self._tails.values()),
+            "polls": sum(t.polls for t in self._tails.values()),
+        }
+
+    async def _fetch_new(self, tail: _ServiceTail) -> List[Dict[str, Any]]:
+        """הרשומות החדשות מאז הסמן (עד 2 עמודים בכל poll)"""
+        new_logs = [
+            entry
+            async for entry in self.api.iter_service_logs(
+                tail.service_id, start_time=tail.cursor, direction="forward", max_pages=2
+            )
+            if log_entry_key(entry) not in tail.boundary_ids
+        ]
+        if new_logs and new_logs[-1].get("timestamp"):
+            last_ts = str(new_logs[-1]["timestamp"])
+            if last_ts != tail.cursor:
+                tail.cursor = last_ts
+                tail.boundary_ids = set()
+            tail.boundary_ids.update(log_entry_key(e) for e in new_logs if e.get("timestamp") == last_ts)
+        return new_logs
+
+    def _render(self, tail: _ServiceTail, subscriber: _Subscriber, footer: str) -> str:
+        safe_name = str(tail.service_name).replace("*", "\\*").replace("_", "\\_").replace("`", "\\`").replace("[", "\\[")
+        header = f"📡 *tail* - *{safe_name}*\n🆔 `{tail.service_id}`\n"
+        body = "\n".join(subscriber.lines) or "(ממתין לשורות חדשות...)"
+        # קיצור מההתחלה - השורות החדשות הן החשובות
+        if len(body) > MAX_MESSAGE_CHARS:
+            body = "..." + body[-MAX_MESSAGE_CHARS:]
+        return f"{header}```\n{body}\n```\n{footer}"
+
+    async def _edit(self, tail: _ServiceTail, subscriber: _Subscriber, footer: str) -> None:
+        text = self._render(tail, subscriber, footer)
+        if text == subscriber.last_text:
+            return
+        try:
+            await subscriber.message.edit_text(text, parse_mode="Markdown")
+            subscriber.last_text = text
+        except Exception as e:
+            # "message is not modified" צפוי; כל כשל אחר (הודעה שנמחקה, Markdown שבור) משאיר את ה-tail תקוע
+            if "message is not modified" in str(e).lower():
+                logger.debug(f"Tail edit skipped for {tail.service_id}: {e}")
+            else:
+                logger.warning(f"Tail edit failed for {tail.service_id}: {e}")
+
+    async def _poll_loop(self, tail: _ServiceTail) -> None:
+        # ה-task רץ בהקשר משלו, כך שהסימון לא משפיע על ה-handlers
+        mark_background_requests()
+        try:
+            while tail.subscribers:
+                now = time.monotonic()
+                for chat_id, subscriber in list(tail.subscribers.items()):
+                    if now >= subscriber.deadline:
+                        del tail.subscribers[chat_id]
+                        await self._edit(tail, subscriber, "⏹️ המעקב הסתיים (תם הזמן)")
+                if not tail.subscribers:
+                    break
+
+                tail.polls += 1
+                try:
+                    new_logs = await self._fetch_new(tail)
+                except Exception as e:
+                    logger.warning(f"Tail poll failed for {tail.service_id}: {e}")
+                    new_logs = []
+
+                lines = [
+                    f"{str(e.get('timestamp', ''))[11:19]} {e.get('text', '')}".replace("`", "'") for e in new_logs
+                ]
+                for subscriber in list(tail.subscribers.values()):
+                    subscriber.lines.extend(lines)
+                    remaining = max(0, int(subscriber.deadline - time.monotonic()))
+                    footer = f"🔄 מתעדכן כל {self.poll_interval}s | נותרו {remaining // 60}:{remaining % 60:02d}"
+                    await self._edit(tail, subscriber, footer)
+
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            if self._tails.get(tail.service_id) is tail and not tail.subscribers:
+                del self._tails[tail.service_id]
+
+
+# יצירת instance גלובלי
+log_tail = LogTailManager(async_render_api, poll_interval=config.LOG_TAIL_POLL_SECONDS)
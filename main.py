@@ -7,7 +7,7 @@ import sys
 import threading
 import time
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from urllib.parse import quote, unquote
 
 import schedule
@@ -18,9 +18,21 @@ from telegram.ext import Application, CallbackQueryHandler, CommandHandler, Cont
 
 import config
 from activity_tracker import activity_tracker
+from async_render_api import async_render_api
 from database import db
+from log_analysis import format_rate_threshold, parse_rate_threshold
+from log_archive import log_archive
+from log_search import log_search
+from log_tail import log_tail
 from notifications import send_daily_report, send_startup_notification
-from render_api import render_api
+from render_api import (
+    filter_logs_by_window,
+    log_entry_key,
+    mark_background_requests,
+    parse_log_timestamp,
+    recent_logs_window,
+    render_api,
+)
 try:
     from status_monitor import status_monitor  # New import
 except Exception:
@@ -129,10 +141,18 @@ def manage_mongo_lock():
 
 
 class RenderMonitorBot:
-    def __init__(self):
-        self.app = Application.builder().token(config.TELEGRAM_BOT_TOKEN).post_init(self.setup_bot_commands).build()
+    def __init__(self) -> None:
+        self.app = (
+            Application.builder()
+            .token(config.TELEGRAM_BOT_TOKEN)
+            .post_init(self.setup_bot_commands)
+            .post_shutdown(self._close_async_clients)
+            .build()
+        )
         self.db = db
         self.render_api = render_api
+        # לקוח אסינכרוני ל-handlers, כדי לא לחסום את ה-event loop בזמן קריאות ל-Render
+        self.async_render_api = async_render_api
         self.setup_handlers()
         # הפקודות יוגדרו ב-post_init
 
@@ -148,13 +168,13 @@ class RenderMonitorBot:
         except Exception:
             return False
 
-    def _simplified_status_live_or_db(self, service: dict) -> str:
+    async def _simplified_status_live_or_db(self, service: dict) -> str:
         """מחזיר סטטוס מפושט (online/offline/deploying/unknown) לפי מצב חי מ-Render,
         ובנפילה חוזר לערך שמור במסד הנתונים.
         """
         service_id = service.get("_id")
         try:
-            live_status = self.render_api.get_service_status(service_id)
+            live_status = await self.async_render_api.get_service_status(service_id) if service_id else None
             if live_status:
                 return status_monitor._simplify_status(live_status)
         except Exception as e:
@@ -172,9 +192,9 @@ class RenderMonitorBot:
         # ל-deploying/unknown נחזיר צהוב
         return "🟡"
 
-    def _get_status_emoji_for_service(self, service: dict) -> str:
+    async def _get_status_emoji_for_service(self, service: dict) -> str:
         """נוחות: סטטוס חי->מפושט->אימוג'י עבור שירות."""
-        simplified = self._simplified_status_live_or_db(service)
+        simplified = await self._simplified_status_live_or_db(service)
         return self._status_to_emoji(simplified)
 
     def _service_recency_key(self, service: dict) -> datetime:
@@ -223,7 +243,7 @@ class RenderMonitorBot:
             return []
         return self._deduplicate_services_by_display_name(services)
 
-    def _get_visible_services_with_fallback(self) -> tuple[List[dict], bool]:
+    async def _get_visible_services_with_fallback(self) -> tuple[List[dict], bool]:
         """מחזיר רשימת שירותים עם fallback ל-Render API כשמונגו לא זמין.
 
         מחזיר tuple של (services, is_fallback).
@@ -237,7 +257,7 @@ class RenderMonitorBot:
 
         # Fallback: שליפה ישירה מ-Render API
         try:
-            api_services = self.render_api.list_services()
+            api_services = await self.async_render_api.list_services()
             fallback_list = []
             for svc in api_services:
                 svc_id = svc.get("id", "")
@@ -251,6 +271,11 @@ class RenderMonitorBot:
         except Exception:
             return [], True
 
+    async def _close_async_clients(self, app: Application):
+        """סגירת הלקוח האסינכרוני ל-Render (ומעקבי /tail שרצים עליו) בעת כיבוי האפליקציה"""
+        await log_tail.stop_all()
+        await self.async_render_api.close()
+
     async def setup_bot_commands(self, app: Application):
         """הגדרת תפריט הפקודות בטלגרם (מורץ לאחר אתחול האפליקציה)"""
         from telegram import BotCommand
@@ -271,6 +296,8 @@ class RenderMonitorBot:
             BotCommand("test_monitor", "🧪 בדיקת ניטור"),
             BotCommand("logs", "📋 צפייה בלוגים של שירות"),
             BotCommand("errors", "🔥 צפייה רק בשגיאות"),
+            BotCommand("logsearch", "🔎 חיפוש בלוגים של כל השירותים"),
+            BotCommand("tail", "📡 מעקב חי אחרי לוגים של שירות"),
             BotCommand("logs_monitor", "🔍 הפעלת ניטור לוגים"),
         		BotCommand("logs_unmonitor", "🔇 כיבוי ניטור לוגים"),
         		BotCommand("logs_manage", "🎛️ ניהול ניטור לוגים"),
@@ -315,6 +342,8 @@ class RenderMonitorBot:
         # Log monitoring commands
         self.app.add_handler(CommandHandler("logs", self.logs_command))
         self.app.add_handler(CommandHandler("errors", self.errors_command))  # קיצור דרך לשגיאות
+        self.app.add_handler(CommandHandler("logsearch", self.logsearch_command))
+        self.app.add_handler(CommandHandler("tail", self.tail_command))
         self.app.add_handler(CommandHandler("logs_monitor", self.logs_monitor_command))
         self.app.add_handler(CommandHandler("logs_unmonitor", self.logs_unmonitor_command))
         self.app.add_handler(CommandHandler("logs_manage", self.logs_manage_command))
@@ -423,7 +452,13 @@ class RenderMonitorBot:
 /errors [service_id] [lines] [minutes] - צפייה רק בשגיאות 🔥
   קיצור דרך נוח! דוגמה: /errors srv-123 50 5
 
-/logs_monitor [service_id] [threshold] - הפעלת ניטור לוגים
+/logsearch [query] [hours]h [service_id] - חיפוש טקסט בלוגים שנקלטו בניטור
+  דוגמה: /logsearch connection refused 24h
+
+/tail [service_id] [minutes] - מעקב חי אחרי לוגים בהודעה אחת שמתעדכנת
+/tail stop - עצירת המעקב
+
+/logs_monitor [service_id] [threshold] - הפעלת ניטור לוגים (סף כמו 5 או 20/5m)
 /logs_unmonitor [service_id] - כיבוי ניטור לוגים
 /logs_manage - ניהול ניטור לוגים עם כפתורים
 
@@ -491,7 +526,7 @@ class RenderMonitorBot:
         # אימות מול Render: GET /services/{service_id}
         service_info = None
         try:
-            service_info = self.render_api.get_service_info(service_id)
+            service_info = await self.async_render_api.get_service_metadata(service_id)
         except Exception:
             service_info = None
 
@@ -675,10 +710,11 @@ class RenderMonitorBot:
         if msg is None:
             return
         try:
-            # רשימת שירותים חיים מה-API כדי לכלול גם שירותים שאינם במסד
-            services_live = self.render_api.list_services()
-            # רשימת דיסקים מה-API (אם הנתיב קיים)
-            disks = self.render_api.list_disks()
+            # רשימת שירותים חיים מה-API כדי לכלול גם שירותים שאינם במסד,
+            # ורשימת דיסקים מה-API (אם הנתיב קיים) - שתי הבקשות במקביל
+            services_live, disks = await asyncio.gather(
+                self.async_render_api.list_services(), self.async_render_api.list_disks()
+            )
             service_id_to_disks = {}
             for d in disks:
                 sid = d.get("serviceId") or d.get("service_id") or d.get("service")
@@ -707,18 +743,18 @@ class RenderMonitorBot:
                     or sid
                 )
 
-                plan_str = self.render_api.get_service_plan_string(svc)
-                is_free = self.render_api.is_free_plan(plan_str)
+                plan_str = self.async_render_api.get_service_plan_string(svc)
+                is_free = self.async_render_api.is_free_plan(plan_str)
 
                 # נזהה דיסק לפי רשימת הדיסקים, ואם ריק ננסה לזהות מתוך השירות עצמו
                 disk_list = service_id_to_disks.get(sid, [])
-                has_disk = bool(disk_list) or self.render_api.service_has_disk(svc)
+                has_disk = bool(disk_list) or self.async_render_api.service_has_disk(svc)
 
                 # נסה לקבל מידע מפורט אם לא זוהה מזהה/שם/תוכנית
                 if (not plan_str or is_free is None) or (name == sid or name == "?"):
                     try:
                         if sid and sid != "?":
-                            svc_info = self.render_api.get_service_info(sid)
+                            svc_info = await self.async_render_api.get_service_metadata(sid)
                             if isinstance(svc_info, dict) and svc_info:
                                 # עדכון שם אם חסר
                                 if name == sid or name == "?":
@@ -730,11 +766,11 @@ class RenderMonitorBot:
                                     )
                                 # עדכון תוכנית
                                 if not plan_str or is_free is None:
-                                    plan_str = self.render_api.get_service_plan_string(svc_info) or plan_str
-                                    is_free = self.render_api.is_free_plan(plan_str)
+                                    plan_str = self.async_render_api.get_service_plan_string(svc_info) or plan_str
+                                    is_free = self.async_render_api.is_free_plan(plan_str)
                                 # עדכון מידע דיסק אם עדיין לא זוהה
                                 if not has_disk:
-                                    has_disk = self.render_api.service_has_disk(svc_info)
+                                    has_disk = self.async_render_api.service_has_disk(svc_info)
                     except Exception:
                         pass
 
@@ -764,9 +800,79 @@ class RenderMonitorBot:
 
             message = "🛠️ *דיאגנוסטיקה מהירה*\n\n"
             message += f"🔁 ניטור רץ: {'כן' if (status_monitor.monitoring_thread and status_monitor.monitoring_thread.is_alive()) else 'לא'}\n"
-            message += f"⏱️ מרווח בדיקה: {status_monitor.deploy_check_interval if status_monitor.deploying_active else status_monitor.check_interval}s\n"
+            schedule = status_monitor.get_schedule_summary()
+            if schedule:
+                next_check = schedule["next_check_in"]
+                message += (
+                    f"⏱️ מתזמן: {schedule['scheduled']} שירותים | {schedule['fast']} בקצב מהיר "
+                    f"({status_monitor.deploy_check_interval}s) | {schedule['suspended']} מושעים | "
+                    f"בדיקה הבאה בעוד {int(next_check) if next_check is not None else '-'}s\n"
+                )
             message += f"👁️ שירותים בניטור סטטוס: {len(monitored)}\n"
             message += f"🚀 שירותים עם התראות דיפלוי: {len(deploy_enabled)}\n"
+            cycle_stats = getattr(status_monitor, "last_cycle_stats", None)
+            if cycle_stats:
+                message += (
+                    f"⏲️ סבב אחרון: {cycle_stats['services']} שירותים ב-{cycle_stats['duration_seconds']}s "
+                    f"(עד {cycle_stats['max_workers']} במקביל, {cycle_stats['timed_out']} חרגו מהזמן, "
+                    f"{cycle_stats.get('mongo_round_trips', 0)} פניות ל-MongoDB)\n"
+                )
+                if cycle_stats.get("fleet_snapshot"):
+                    message += (
+                        f"🛰️ תמונת צי: {cycle_stats['render_requests']} בקשות ל-Render בסבב | "
+                        f"{cycle_stats['snapshot_skipped']} שירותים ללא שאילתה נפרדת\n"
+                    )
+                message += (
+                    f"📦 תעבורת סבב: {cycle_stats.get('render_bytes', 0) / 1024:.1f} KB | "
+                    f"פענוח {cycle_stats.get('render_parse_ms', 0)}ms | "
+                    f"{cycle_stats.get('render_not_modified', 0)} ללא שינוי (304) | "
+                    f"{cycle_stats.get('render_unchanged_bodies', 0)} גופים זהים\n"
+                )
+            log_cycle = getattr(log_monitor, "last_cycle_stats", None)
+            if log_cycle:
+                message += (
+                    f"📜 סבב לוגים: {log_cycle['services']} שירותים ב-{log_cycle['duration_seconds']}s "
+                    f"(עד {log_cycle['max_workers']} במקביל, {log_cycle['timed_out']} חרגו מהזמן)"
+                )
+                if log_cycle.get("slowest_service"):
+                    message += f" | האיטי: `{log_cycle['slowest_service']}` {log_cycle['slowest_fetch_seconds']}s"
+                message += "\n"
+            if config.LOG_ARCHIVE_ENABLED:
+                archive_stats = log_archive.get_stats()
+                message += (
+                    f"🗄️ ארכיון לוגים: {archive_stats['services']} שירותים | {archive_stats['segments']} מקטעים | "
+                    f"{archive_stats['bytes'] / (1024 * 1024):.1f}/{config.LOG_ARCHIVE_MAX_MB} MB\n"
+                )
+            tail_stats = log_tail.get_stats()
+            if tail_stats["services"]:
+                message += f"📡 מעקבי tail: {tail_stats['services']} שירותים | {tail_stats['subscribers']} צופים\n"
+            conn_stats = self.render_api.get_connection_stats()
+            message += (
+                f"🔌 Render API: {conn_stats['requests']} בקשות | "
+                f"{conn_stats['new_connections']} חיבורים חדשים | "
+                f"{conn_stats['reused_connections']} שימוש חוזר | "
+                f"איחוד בקשות: {conn_stats['coalesced_hits']} שותפו / {conn_stats['coalesced_misses']} נשלחו\n"
+            )
+            limiter_stats = self.render_api.rate_limiter.get_stats()
+            message += (
+                f"🚦 מגביל קצב: {limiter_stats['tokens']} אסימונים | המתנות: "
+                f"{limiter_stats['throttled_interactive']} אינטראקטיביות / {limiter_stats['throttled_background']} רקע "
+                f"({limiter_stats['wait_seconds']}s) | {limiter_stats['rate_limited']}×429"
+            )
+            if limiter_stats["paused_for"]:
+                message += f" | מושהה עוד {limiter_stats['paused_for']}s"
+            message += "\n"
+            cache_stats = self.render_api.metadata_cache.get_stats()
+            message += (
+                f"🗃️ קאש מטא-דאטה: {cache_stats['hit_ratio']:.0%} פגיעות "
+                f"({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']}) | "
+                f"{cache_stats['size']} רשומות | {cache_stats['invalidations']} ביטולים\n"
+            )
+            index_stats = db.get_index_usage_stats()
+            if index_stats:
+                message += "📇 שימוש באינדקסים:\n"
+                for entry in index_stats:
+                    message += f"   • `{entry['collection']}.{entry['name']}`: {entry['ops']}\n"
             if not monitored and not deploy_enabled and not config.SERVICES_TO_MONITOR:
                 message += "⚠️ אין שירותים לבדיקה (DB ריק ואין SERVICES_TO_MONITOR)\n"
             await msg.reply_text(message, parse_mode="Markdown")
@@ -788,8 +894,9 @@ class RenderMonitorBot:
             return
         user_id = user.id
 
-        # הפעלת הניטור
-        if status_monitor.enable_monitoring(service_id, user_id):
+        # הפעלת הניטור - השירות נשלף דרך ה-client האסינכרוני כדי לא לחסום את ה-event loop
+        service_info = await self.async_render_api.get_service_info(service_id)
+        if service_info and status_monitor.enable_monitoring(service_id, user_id, service_info=service_info):
             await msg.reply_text(f"✅ ניטור סטטוס הופעל עבור השירות {service_id}\n" f"תקבל התראות כשהשירות יעלה או ירד.")
             # ודא שהלולאת ניטור רצה גם אם כובהה בקובץ ההגדרות
             try:
@@ -878,7 +985,7 @@ class RenderMonitorBot:
             service_name = service.get("service_name", service_id)
 
             # סטטוס נוכחי (חי מ-Render עם נפילה ל-DB)
-            status_emoji = self._get_status_emoji_for_service(service)
+            status_emoji = await self._get_status_emoji_for_service(service)
 
             # אימוג'י ניטור
             monitoring_status = status_monitor.get_monitoring_status(service_id)
@@ -922,7 +1029,7 @@ class RenderMonitorBot:
         msg = update.message
         if msg is None:
             return
-        services, is_fallback = self._get_visible_services_with_fallback()
+        services, is_fallback = await self._get_visible_services_with_fallback()
 
         print(f"נמצאו {len(services)} שירותים לבדיקה (fallback={is_fallback}).")
 
@@ -992,7 +1099,7 @@ class RenderMonitorBot:
         status_monitor.mark_manual_action(service_id)
 
         try:
-            self.render_api.suspend_service(service_id)
+            await self.async_render_api.suspend_service(service_id)
             self.db.update_service_activity(service_id, status="suspended")
             self.db.increment_suspend_count(service_id)
             await msg.reply_text(f"✅ השירות {service_id} הושהה בהצלחה.")
@@ -1066,7 +1173,7 @@ class RenderMonitorBot:
         msg = update.message
         if msg is None:
             return
-        services, is_fallback = self._get_visible_services_with_fallback()
+        services, is_fallback = await self._get_visible_services_with_fallback()
 
         if not services:
             await msg.reply_text("📭 אין שירותים במערכת")
@@ -1111,7 +1218,7 @@ class RenderMonitorBot:
 
     async def show_manage_menu(self, query: CallbackQuery):
         """מציג את תפריט הניהול בהודעה קיימת (עריכה)"""
-        services, is_fallback = self._get_visible_services_with_fallback()
+        services, is_fallback = await self._get_visible_services_with_fallback()
 
         if not services:
             await query.edit_message_text("📭 אין שירותים במערכת")
@@ -1187,10 +1294,7 @@ class RenderMonitorBot:
         """
         from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
         try:
-            loop = asyncio.get_event_loop()
-            live_status = await loop.run_in_executor(
-                None, self.render_api.get_service_status, service_id
-            )
+            live_status = await self.async_render_api.get_service_status(service_id)
             if live_status == "suspended":
                 # עדכון DB רק אם הסטטוס השתנה, כדי לא לדרוס את suspended_at
                 try:
@@ -1381,7 +1485,7 @@ class RenderMonitorBot:
             status_monitor.mark_manual_action(service_id)
 
             try:
-                self.render_api.suspend_service(service_id)
+                await self.async_render_api.suspend_service(service_id)
                 # עדכון DB — לא חוסם אם מונגו למטה
                 try:
                     self.db.update_service_activity(service_id, status="suspended")
@@ -1399,7 +1503,7 @@ class RenderMonitorBot:
             status_monitor.mark_manual_action(service_id)
 
             try:
-                self.render_api.resume_service(service_id)
+                await self.async_render_api.resume_service(service_id)
                 # עדכון DB — לא חוסם אם מונגו למטה
                 try:
                     self.db.update_service_activity(service_id, status="active")
@@ -1419,7 +1523,6 @@ class RenderMonitorBot:
         elif data == "back_to_manage":  # מטפל בכפתור "חזור"
             # מציג מחדש את תפריט הניהול בעזרת עריכת ההודעה
             await self.show_manage_menu(query)
-        
 
     async def suspend_button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """טיפול בכפתורי אישור/ביטול השעיה כללית"""
@@ -1437,7 +1540,7 @@ class RenderMonitorBot:
             except (ConnectionFailure, ServerSelectionTimeoutError):
                 # fallback ישיר ל-Render API (בלי לעבור דרך _get_visible_services שינסה DB שוב)
                 try:
-                    api_services = self.render_api.list_services()
+                    api_services = await self.async_render_api.list_services()
                     all_services = []
                     for s in api_services:
                         is_suspended = s.get("suspended") == "suspended" or s.get("suspended") is True
@@ -1452,7 +1555,7 @@ class RenderMonitorBot:
             for service in all_services:
                 service_id = service["_id"]
                 if service.get("status") != "suspended":
-                    success = render_api.suspend_service(service_id)
+                    success = await self.async_render_api.suspend_service(service_id)
                     if success:
                         try:
                             db.update_service_activity(service_id, status="suspended")
@@ -1511,7 +1614,7 @@ class RenderMonitorBot:
             message += "🔇 *התראות דיפלוי: כבויות*\n"
 
         # סטטוס נוכחי (חי)
-        simplified_status = self._simplified_status_live_or_db(service)
+        simplified_status = await self._simplified_status_live_or_db(service)
         status_emoji = self._status_to_emoji(simplified_status)
         message += f"\nסטטוס נוכחי: {status_emoji} {simplified_status}\n"
 
@@ -1550,7 +1653,8 @@ class RenderMonitorBot:
         if data.startswith("enable_monitor_"):
             service_id = data.replace("enable_monitor_", "")
 
-            if status_monitor.enable_monitoring(service_id, user_id):
+            service_info = await self.async_render_api.get_service_info(service_id)
+            if service_info and status_monitor.enable_monitoring(service_id, user_id, service_info=service_info):
                 await query.answer("✅ ניטור הופעל בהצלחה!", show_alert=True)
                 # רענון התצוגה ללא שינוי query.data
                 await self.monitor_detail_callback(update, context, service_id_override=service_id)
@@ -1620,7 +1724,7 @@ class RenderMonitorBot:
             is_monitored = monitoring_status.get("enabled", False)
 
             # סטטוס נוכחי (חי)
-            status_emoji = self._get_status_emoji_for_service(service)
+            status_emoji = await self._get_status_emoji_for_service(service)
 
             # אימוג'י ניטור
             monitor_emoji = "👁️" if is_monitored else "👁️‍🗨️"
@@ -1660,7 +1764,7 @@ class RenderMonitorBot:
             service_id = service["_id"]
             service_name = service.get("service_name", service_id)
             # סטטוס נוכחי (חי)
-            status_emoji = self._get_status_emoji_for_service(service)
+            status_emoji = await self._get_status_emoji_for_service(service)
 
             button_text = f"{status_emoji} 👁️ {service_name[:20]}"
 
@@ -1816,6 +1920,37 @@ class RenderMonitorBot:
 
     # ===== פקודות ניטור לוגים =====
 
+    async def _get_window_logs(self, service_id: str, minutes: int) -> List[dict]:
+        """לוגים מהדקות האחרונות: קודם מהארכיון המקומי, ומ-Render רק לטווחים שלא נקלטו בניטור"""
+        if not config.LOG_ARCHIVE_ENABLED:
+            return await self.async_render_api.get_recent_logs(service_id, minutes=minutes)
+
+        _, start_dt, end_dt = recent_logs_window(minutes)
+        loop = asyncio.get_event_loop()
+        gaps = await loop.run_in_executor(None, log_archive.missing_ranges, service_id, start_dt, end_dt)
+        if gaps == [(start_dt, end_dt)]:
+            # שום חלק מהחלון לא בארכיון (למשל שירות שלא בניטור לוגים)
+            return await self.async_render_api.get_recent_logs(service_id, minutes=minutes)
+
+        archived = await loop.run_in_executor(None, log_archive.read_range, service_id, start_dt, end_dt)
+        fetched = []
+        for gap_start, gap_end in gaps:
+            async for entry in self.async_render_api.iter_service_logs(
+                service_id,
+                start_time=gap_start.isoformat().replace("+00:00", "Z"),
+                end_time=gap_end.isoformat().replace("+00:00", "Z"),
+                direction="forward",
+            ):
+                fetched.append(entry)
+        logging.getLogger(__name__).info(
+            "Logs for %s: %d from archive, %d from Render (%d gaps)", service_id, len(archived), len(fetched), len(gaps)
+        )
+
+        merged = {log_entry_key(entry): entry for entry in archived + fetched}
+        epoch = datetime.min.replace(tzinfo=timezone.utc)
+        logs = sorted(merged.values(), key=lambda e: parse_log_timestamp(e.get("timestamp")) or epoch)
+        return filter_logs_by_window(logs, start_dt, end_dt)
+
     async def logs_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """צפייה בלוגים של שירות"""
         msg = update.message
@@ -1861,7 +1996,7 @@ class RenderMonitorBot:
 
         # ודא שהשירות קיים ב-Render, כדי להבדיל בין "אין לוגים" ל"שירות לא נמצא"
         try:
-            service_info = self.render_api.get_service_info(service_id)
+            service_info = await self.async_render_api.get_service_metadata(service_id)
         except Exception:
             service_info = None
         if not service_info:
@@ -1891,8 +2026,8 @@ class RenderMonitorBot:
         try:
             # קבלת הלוגים
             if minutes:
-                # לוגים מטווח זמן ספציפי
-                logs = self.render_api.get_recent_logs(service_id, minutes=minutes)
+                # לוגים מטווח זמן ספציפי (מהארכיון המקומי, ומ-Render רק לפערים)
+                logs = await self._get_window_logs(service_id, minutes)
                 # הגבלה למספר השורות המבוקש
                 logs = logs[-lines:] if len(logs) > lines else logs
 
@@ -1902,20 +2037,20 @@ class RenderMonitorBot:
                         await msg.reply_text("ℹ️ לא נמצאו לוגים בטווח הזמן המבוקש – מציג האחרונות מכל הזמן")
                     except Exception:
                         pass
-                    logs = self.render_api.get_service_logs(service_id, tail=min(lines, 200))
+                    logs = await self.async_render_api.get_latest_logs(service_id, min(lines, 200))
             else:
                 # לוגים אחרונים (ברירת מחדל)
-                logs = self.render_api.get_service_logs(service_id, tail=min(lines, 200))
+                logs = await self.async_render_api.get_latest_logs(service_id, min(lines, 200))
             
             if not logs:
                 # נסה אסטרטגיות נוספות לפני הודעת ריקנות
                 try:
                     alt_logs = []
                     # 1) נסה טווח זמן של 15 דקות באמצעות האלגוריתם הלוגי
-                    alt_logs = self.render_api.get_recent_logs(service_id, minutes=15)
+                    alt_logs = await self.async_render_api.get_recent_logs(service_id, minutes=15)
                     if not alt_logs:
                         # 2) נסה להביא יותר שורות אחרונות (עד 1000)
-                        alt_logs = self.render_api.get_service_logs(service_id, tail=min(1000, max(lines, 200)))
+                        alt_logs = await self.async_render_api.get_latest_logs(service_id, min(1000, max(lines, 200)))
                     if alt_logs:
                         logs = alt_logs[-lines:] if len(alt_logs) > lines else alt_logs
                 except Exception:
@@ -2067,6 +2202,147 @@ class RenderMonitorBot:
         # קרא לפונקציה הרגילה
         await self.logs_command(update, context)
 
+    async def tail_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """מעקב חי אחרי לוגים של שירות בהודעה אחת שנערכת כל כמה שניות"""
+        msg = update.message
+        chat = update.effective_chat
+        if msg is None or chat is None:
+            return
+
+        if not context.args:
+            await msg.reply_text(
+                "📡 *מעקב חי אחרי לוגים*\n\n"
+                "**שימוש:**\n"
+                "`/tail [service_id] [minutes]` - מעקב (ברירת מחדל: 10 דקות)\n"
+                "`/tail stop` - עצירת המעקב\n\n"
+                f"💡 ההודעה מתעדכנת כל {config.LOG_TAIL_POLL_SECONDS} שניות ונעצרת אוטומטית",
+                parse_mode="Markdown",
+            )
+            return
+
+        if context.args[0].lower() == "stop":
+            stopped = await log_tail.unsubscribe_chat(chat.id)
+            await msg.reply_text(f"⏹️ נעצרו {stopped} מעקבים" if stopped else "ℹ️ אין מעקב פעיל")
+            return
+
+        service_id = context.args[0]
+        try:
+            minutes = int(context.args[1]) if len(context.args) > 1 else 10
+        except ValueError:
+            await msg.reply_text("❌ מספר דקות לא תקין")
+            return
+        minutes = max(1, min(minutes, config.LOG_TAIL_MAX_MINUTES))
+
+        service = self.db.get_service_activity(service_id)
+        service_name = service.get("service_name", service_id) if service else service_id
+        # אימות מול Render רק כשאין כבר poll פעיל לשירות
+        if not log_tail.is_tailing(service_id):
+            service_info = await self.async_render_api.get_service_metadata(service_id)
+            if not service_info:
+                await msg.reply_text(f"❌ השירות לא נמצא ב-Render: `{service_id}`", parse_mode="Markdown")
+                return
+            service_name = service_info.get("name", service_name)
+
+        tail_message = await msg.reply_text(f"📡 מתחיל מעקב אחרי {service_name} ל-{minutes} דקות...")
+        await log_tail.subscribe(service_id, service_name, chat.id, tail_message, minutes)
+
+    def _parse_logsearch_args(self, args: List[str]) -> Tuple[str, int, Optional[str]]:
+        """פענוח `/logsearch`: (ביטוי, שעות, service_id).
+
+        שעות רק עם סיומת h (למשל 24h), עד LOG_SEARCH_RETENTION_HOURS; service_id רק אם הוא שירות מוכר במסד.
+        ביטוי במרכאות נלקח כמו שהוא, וכל מה שאחריו הוא פרמטרים.
+        """
+        text = " ".join(args).strip()
+        if text.startswith('"') and '"' in text[1:]:
+            closing = text.index('"', 1)
+            query, options = text[1:closing], text[closing + 1 :].split()
+        else:
+            query, options = "", list(args)
+
+        hours: Optional[int] = None
+        service_id: Optional[str] = None
+        # הפרמטרים נלקחים מהסוף; כשאין מרכאות תמיד נשארת לפחות מילה אחת לביטוי
+        while options and (query or len(options) > 1):
+            token = options[-1]
+            if hours is None and re.fullmatch(r"\d+h", token, re.IGNORECASE):
+                hours = int(token[:-1])
+            elif service_id is None and self._is_known_service(token):
+                service_id = token
+            else:
+                break
+            options.pop()
+        if not query:
+            query = " ".join(options).strip()
+        hours = max(1, min(hours or 24, config.LOG_SEARCH_RETENTION_HOURS))
+        return query, hours, service_id
+
+    def _is_known_service(self, service_id: str) -> bool:
+        try:
+            return self.db.get_service_activity(service_id) is not None
+        except Exception:
+            return False
+
+    async def logsearch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """חיפוש טקסט מלא בלוגים שנקלטו בניטור, בכל השירותים"""
+        msg = update.message
+        if msg is None:
+            return
+
+        query, hours, service_id = self._parse_logsearch_args(list(context.args or []))
+
+        if not query:
+            await msg.reply_text(
+                "🔎 *חיפוש בלוגים*\n\n"
+                "**שימוש:**\n"
+                "`/logsearch [query] [hours]h [service_id]`\n\n"
+                "**דוגמאות:**\n"
+                "`/logsearch connection refused` - 24 השעות האחרונות, כל השירותים\n"
+                "`/logsearch timeout 6h srv-123456` - 6 שעות, שירות אחד\n"
+                "`/logsearch \"status 500\" 12h` - ביטוי במרכאות, 12 שעות\n\n"
+                "💡 החיפוש רץ על הלוגים של שירותים עם ניטור לוגים פעיל",
+                parse_mode="Markdown",
+            )
+            return
+        if not config.LOG_SEARCH_ENABLED:
+            await msg.reply_text("❌ חיפוש בלוגים כבוי (LOG_SEARCH_ENABLED=false)")
+            return
+
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        started = time.monotonic()
+        try:
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(None, log_search.search, query, since, service_id)
+        except Exception as e:
+            await msg.reply_text(f"❌ כשל בחיפוש: {e}")
+            return
+        elapsed_ms = int((time.monotonic() - started) * 1000)
+
+        safe_query = query.replace("`", "'")
+        counts = result["counts"]
+        if not counts:
+            await msg.reply_text(
+                f"📭 לא נמצא `{safe_query}` ב-{hours} השעות האחרונות ({elapsed_ms}ms)", parse_mode="Markdown"
+            )
+            return
+
+        message = (
+            f"🔎 *{sum(counts.values())} התאמות* ל-`{safe_query}` ב-{hours} השעות האחרונות "
+            f"ב-{len(counts)} שירותים ({elapsed_ms}ms)\n"
+        )
+        for sid, count in sorted(counts.items(), key=lambda item: item[1], reverse=True):
+            service = self.db.get_service_activity(sid)
+            name = service.get("service_name", sid) if service else sid
+            message += f"\n🤖 *{name}* (`{sid}`) - {count}\n"
+            for match in [m for m in result["matches"] if m["service_id"] == sid][:3]:
+                text = match["text"][:200].replace("`", "'")
+                message += f"`{match['timestamp'].strftime('%m-%d %H:%M:%S')}` ```\n{text}\n```\n"
+            if len(message) > 3500:
+                message += "\n_...התוצאות קוצרו_"
+                break
+
+        message += "\n💡 לצפייה בהקשר: `/logs [service_id] 100 [minutes]`"
+        await msg.reply_text(message, parse_mode="Markdown")
+
     async def logs_monitor_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """הפעלת ניטור לוגים לשירות"""
         msg = update.message
@@ -2077,26 +2353,40 @@ class RenderMonitorBot:
             await msg.reply_text(
                 "❌ חסר service ID\n\n"
                 "שימוש: `/logs_monitor [service_id] [threshold]`\n\n"
-                "threshold = מספר שגיאות להתראה (ברירת מחדל: 5)\n"
-                "דוגמה: `/logs_monitor srv-123456 3`",
+                "threshold = מספר שגיאות להתראה, ואופציונלית חלון זמן (ברירת מחדל: 5 בדקה)\n"
+                "דוגמאות: `/logs_monitor srv-123456 3`, `/logs_monitor srv-123456 20/5m`",
                 parse_mode="Markdown"
             )
             return
 
         service_id = context.args[0]
-        threshold = int(context.args[1]) if len(context.args) > 1 else 5
+        try:
+            threshold, window_minutes = parse_rate_threshold(context.args[1]) if len(context.args) > 1 else (5, 1)
+        except ValueError:
+            await msg.reply_text("❌ סף לא תקין. דוגמאות: `5`, `20/5m`, `50/1h`", parse_mode="Markdown")
+            return
+        if window_minutes > config.LOG_RATE_MAX_WINDOW_MINUTES:
+            await msg.reply_text(f"❌ חלון הזמן המקסימלי הוא {config.LOG_RATE_MAX_WINDOW_MINUTES} דקות")
+            return
 
         user = update.effective_user
         if user is None:
             return
         user_id = user.id
 
-        # הפעלת הניטור
-        if log_monitor.enable_monitoring(service_id, user_id, error_threshold=threshold):
+        # הפעלת הניטור - שם השירות נשלף דרך ה-client האסינכרוני כדי לא לחסום את ה-event loop
+        service_info = await self.async_render_api.get_service_metadata(service_id)
+        if service_info and log_monitor.enable_monitoring(
+            service_id,
+            user_id,
+            service_name=service_info.get("name", service_id),
+            error_threshold=threshold,
+            error_window_minutes=window_minutes,
+        ):
             await msg.reply_text(
                 f"✅ ניטור לוגים הופעל עבור השירות\n"
-                f"🔍 סף שגיאות: {threshold}\n\n"
-                f"תקבל התראה כאשר יזוהו {threshold}+ שגיאות בדקה"
+                f"🔍 סף שגיאות: {format_rate_threshold(threshold, window_minutes)}\n\n"
+                f"תקבל התראה כאשר יזוהו {threshold}+ שגיאות ב-{window_minutes} הדקות האחרונות"
             )
             # הפעל את לולאת הניטור אם לא רצה
             try:
@@ -2191,7 +2481,10 @@ class RenderMonitorBot:
         if data.startswith("enable_log_monitor_"):
             service_id = data.replace("enable_log_monitor_", "")
 
-            if log_monitor.enable_monitoring(service_id, user_id):
+            service_info = await self.async_render_api.get_service_metadata(service_id)
+            if service_info and log_monitor.enable_monitoring(
+                service_id, user_id, service_name=service_info.get("name", service_id)
+            ):
                 await query.answer("✅ ניטור לוגים הופעל!", show_alert=True)
                 # רענון התצוגה
                 await self._show_log_detail(query, service_id)
@@ -2241,7 +2534,9 @@ class RenderMonitorBot:
 
         if is_monitored:
             message += "✅ *ניטור לוגים פעיל*\n"
-            threshold = log_monitoring.get("error_threshold", 5)
+            threshold = format_rate_threshold(
+                log_monitoring.get("error_threshold", 5), log_monitoring.get("error_window_minutes", 1)
+            )
             message += f"🎯 סף שגיאות: {threshold}\n"
             
             last_error_count = log_monitoring.get("last_error_count", 0)
@@ -2253,6 +2548,13 @@ class RenderMonitorBot:
             
             total_errors = log_monitoring.get("total_errors", 0)
             message += f"📊 סה\"כ שגיאות: {total_errors}\n"
+
+            top_errors = self.db.get_top_errors(service_id, limit=3)
+            if top_errors:
+                message += "\n🔝 *שגיאות נפוצות:*\n"
+                for entry in top_errors:
+                    template = entry.get("template", "")[:120].replace("`", "'")
+                    message += f"• ×{entry.get('count', 0)} `{template}`\n"
         else:
             message += "❌ *ניטור לוגים כבוי*\n"
 
@@ -2363,7 +2665,7 @@ class RenderMonitorBot:
         	service_id = context.args[0]
         	
         	# בדיקה אם השירות קיים
-        	service_info = self.render_api.get_service_info(service_id)
+        	service_info = await self.async_render_api.get_service_metadata(service_id)
         	if not service_info:
         		await msg.reply_text(
         			f"❌ השירות לא נמצא ב-Render או שה-ID שגוי\n\n"
@@ -2377,7 +2679,7 @@ class RenderMonitorBot:
         	await msg.reply_text(f"📋 מביא רשימת משתני סביבה של *{service_name}*...", parse_mode="Markdown")
         	
         	try:
-        		env_vars = self.render_api.get_env_vars(service_id)
+        		env_vars = await self.async_render_api.get_env_vars(service_id)
         		
         		if not env_vars:
         			await msg.reply_text(
@@ -2450,7 +2752,7 @@ class RenderMonitorBot:
         	value = " ".join(context.args[2:])
         	
         	# בדיקה אם השירות קיים
-        	service_info = self.render_api.get_service_info(service_id)
+        	service_info = await self.async_render_api.get_service_metadata(service_id)
         	if not service_info:
         		await msg.reply_text(
         			f"❌ השירות לא נמצא ב-Render או שה-ID שגוי\n\n"
@@ -2514,7 +2816,7 @@ class RenderMonitorBot:
         	key = context.args[1]
         	
         	# בדיקה אם השירות קיים
-        	service_info = self.render_api.get_service_info(service_id)
+        	service_info = await self.async_render_api.get_service_metadata(service_id)
         	if not service_info:
         		await msg.reply_text(
         			f"❌ השירות לא נמצא ב-Render או שה-ID שגוי\n\n"
@@ -2592,13 +2894,13 @@ class RenderMonitorBot:
         		await query.edit_message_text("⏳ מעדכן משתנה סביבה...")
         		
         		# ביצוע העדכון
-        		result = self.render_api.update_env_var(service_id, key, value)
+        		result = await self.async_render_api.update_env_var(service_id, key, value)
         		
         		# ניקוי הזיכרון
         		del context.user_data[value_key]
         		
         		if result["success"]:
-        			service_info = self.render_api.get_service_info(service_id)
+        			service_info = await self.async_render_api.get_service_metadata(service_id)
         			service_name = service_info.get("name", service_id) if service_info else service_id
         			
         			message = f"✅ *עדכון מוצלח!*\n\n"
@@ -2633,10 +2935,10 @@ class RenderMonitorBot:
         		await query.edit_message_text("⏳ מוחק משתנה סביבה...")
         		
         		# ביצוע המחיקה
-        		result = self.render_api.delete_env_var(service_id, key)
+        		result = await self.async_render_api.delete_env_var(service_id, key)
         		
         		if result["success"]:
-        			service_info = self.render_api.get_service_info(service_id)
+        			service_info = await self.async_render_api.get_service_metadata(service_id)
         			service_name = service_info.get("name", service_id) if service_info else service_id
         			
         			message = f"✅ *מחיקה מוצלחת!*\n\n"
@@ -2928,6 +3230,7 @@ def check_and_send_reminders():
 
 def run_scheduler():
     """הרצת המתזמן ברקע"""
+    mark_background_requests()
     # בדיקה יומית בשעה 09:00
     schedule.every().day.at("09:00").do(activity_tracker.check_inactive_services)
 
@@ -3021,8 +3324,9 @@ def main():
             monitored = db.get_status_monitored_services()
             deploy_enabled = db.get_services_with_deploy_notifications_enabled()
             print("=== DIAG ON START ===")
-            print(f"Monitor thread alive: {bool(status_monitor.monitoring_thread and status_monitor.monitoring_thread.is_alive())}")
-            print(f"Check interval: {status_monitor.deploy_check_interval if status_monitor.deploying_active else status_monitor.check_interval}s")
+            monitor_alive = bool(status_monitor.monitoring_thread and status_monitor.monitoring_thread.is_alive())
+            print(f"Monitor thread alive: {monitor_alive}")
+            print(f"Check schedule: {status_monitor.get_schedule_summary()}")
             print(f"Monitored services: {len(monitored)} | Deploy alerts: {len(deploy_enabled)}")
             print(f"SERVICES_TO_MONITOR fallback: {len(getattr(config, 'SERVICES_TO_MONITOR', []))}")
             print("======================")
@@ -48,6 +48,13 @@ def _send_to_chat(chat_id: str, message: str, title: Optional[str] = None) -> bo
         return False
 
 
+def _get_service_doc(service_id: str) -> dict:
+    """שליפת מסמך השירות (לזיהוי מי הפעיל ניטור)"""
+    from database import db
+
+    return db.get_service_activity(service_id) or {}
+
+
 def send_notification(message: str):
     """שליחת התראה לאדמין דרך טלגרם"""
     if not config.ADMIN_CHAT_ID or not config.TELEGRAM_BOT_TOKEN:
@@ -58,9 +65,15 @@ def send_notification(message: str):
 
 
 def send_status_change_notification(
-    service_id: str, service_name: str, old_status: str, new_status: str, emoji: str = "🔔", action: str = "שינה סטטוס"
+    service_id: str,
+    service_name: str,
+    old_status: str,
+    new_status: str,
+    emoji: str = "🔔",
+    action: str = "שינה סטטוס",
+    service_doc: Optional[dict] = None,
 ):
-    """שליחת התראה על שינוי סטטוס של שירות"""
+    """שליחת התראה על שינוי סטטוס של שירות (service_doc שכבר נטען חוסך שליפה מה-DB)"""
     message = f"{emoji} *התראת שינוי סטטוס*\n\n"
     # Escape כדי למנוע כשלי Markdown בעת שליחת הודעה לטלגרם
     safe_service_name = str(service_name).replace("*", "\\*").replace("_", "\\_").replace("`", "\\`")
@@ -90,9 +103,7 @@ def send_status_change_notification(
 
     # בנוסף: אם יש מפעיל ניטור לשירות – שלח גם אליו
     try:
-        from database import db
-
-        service = db.get_service_activity(service_id) or {}
+        service = service_doc if service_doc is not None else _get_service_doc(service_id)
         monitoring_info = service.get("status_monitoring", {})
         enabled_by = monitoring_info.get("enabled_by")
         if enabled_by and str(enabled_by) != str(config.ADMIN_CHAT_ID):
@@ -114,6 +125,7 @@ def send_deploy_event_notification(
     service_id: str,
     status: str,
     commit_message: Optional[str] = None,
+    service_doc: Optional[dict] = None,
 ) -> bool:
     """התראה ממוקדת על דיפלוי שהסתיים (סיום/כשלון)"""
     def _is_dependency_update_commit(msg: Optional[str]) -> bool:
@@ -183,9 +195,7 @@ def send_deploy_event_notification(
 
     # בנוסף: ניסיון לשלוח גם למי שהפעיל ניטור על השירות (אם קיים)
     try:
-        from database import db
-
-        service = db.get_service_activity(service_id) or {}
+        service = service_doc if service_doc is not None else _get_service_doc(service_id)
         monitoring_info = service.get("status_monitoring", {})
         enabled_by = monitoring_info.get("enabled_by")
         if enabled_by and str(enabled_by) != str(config.ADMIN_CHAT_ID):
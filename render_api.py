@@ -1,274 +1,548 @@
-from typing import Any, Dict, List, Optional, cast
-from datetime import datetime
+import asyncio
+import contextvars
+import copy
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, TypeVar, cast
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import config
 
+# ===== נרמול payloads (משותף ל-RenderAPI ול-AsyncRenderAPI) =====
 
-class RenderAPI:
-	def __init__(self):
-		self.api_key = config.RENDER_API_KEY
-		self.base_url = config.RENDER_API_URL
-		self.headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json", "Accept": "application/json"}
+# מילות מפתח בסטטוס דיפלוי שמעידות שהשירות באמצע פריסה
+DEPLOYING_STATUS_KEYWORDS = (
+	"deploy",
+	"build",
+	"progress",
+	"start",
+	"provision",
+	"pending",
+	"queue",
+	"updat",
+	"initializ",
+	"restarting",
+)
 
-	def suspend_service(self, service_id: str) -> Dict:
-		"""השעיית שירות"""
-		url = f"{self.base_url}/services/{service_id}/suspend"
 
-		try:
-			response = requests.post(url, headers=self.headers, timeout=15)
-			return {
-				"success": response.status_code == 200,
-				"status_code": response.status_code,
-				"message": response.text if response.status_code != 200 else "Service suspended successfully",
-			}
-		except requests.RequestException as e:
-			return {"success": False, "status_code": 0, "message": f"Request failed: {str(e)}"}
+def parse_latest_deploy_status(data: Any) -> Optional[str]:
+	"""מחלץ את סטטוס הדיפלוי האחרון מתוך payload של /deploys"""
+	# תמיכה במערך גולמי, פריסת נתונים, או עטיפה {deploy: {...}}
+	latest: Any
+	if isinstance(data, list):
+		latest = data[0] if data else None
+	elif isinstance(data, dict) and data.get("deploy"):
+		latest = data
+	elif isinstance(data, dict):
+		items = data.get("items") or data.get("data") or []
+		latest = items[0] if items else None
+	else:
+		latest = None
 
-	def resume_service(self, service_id: str) -> Dict:
-		"""החזרת שירות לפעילות"""
-		url = f"{self.base_url}/services/{service_id}/resume"
+	if latest and isinstance(latest, dict):
+		entity = latest.get("deploy") if isinstance(latest.get("deploy"), dict) else latest
+		return cast(Optional[str], entity.get("status") or entity.get("state"))
+	return None
 
-		try:
-			response = requests.post(url, headers=self.headers, timeout=15)
-			return {
-				"success": response.status_code == 200,
-				"status_code": response.status_code,
-				"message": response.text if response.status_code != 200 else "Service resumed successfully",
-			}
-		except requests.RequestException as e:
-			return {"success": False, "status_code": 0, "message": f"Request failed: {str(e)}"}
 
-	def get_service_info(self, service_id: str) -> Optional[Dict[str, Any]]:
-		"""קבלת מידע על שירות"""
-		url = f"{self.base_url}/services/{service_id}"
+def _parse_iso(ts: Optional[str]) -> Optional[datetime]:
+	if not ts or not isinstance(ts, str):
+		return None
+	try:
+		if ts.endswith("Z"):
+			ts = ts.replace("Z", "+00:00")
+		return datetime.fromisoformat(ts)
+	except Exception:
+		return None
 
-		try:
-			response = requests.get(url, headers=self.headers, timeout=15)
-			if response.status_code == 200:
-				return cast(Dict[str, Any], response.json())
-			return None
-		except requests.RequestException:
-			return None
 
-	def _get_latest_deploy_status(self, service_id: str) -> Optional[str]:
-		"""מחזיר את סטטוס הדיפלוי האחרון עבור שירות אם זמין"""
-		url = f"{self.base_url}/services/{service_id}/deploys?limit=1"
-		try:
-			response = requests.get(url, headers=self.headers, timeout=15)
-			if response.status_code != 200:
-				return None
-			data = cast(Any, response.json())
-			# תמיכה במערך גולמי, פריסת נתונים, או עטיפה {deploy: {...}}
-			latest: Any
-			if isinstance(data, list):
-				latest = data[0] if data else None
-			elif isinstance(data, dict) and data.get("deploy"):
-				latest = data
-			else:
-				items = cast(Any, data).get("items") or cast(Any, data).get("data") or []
-				latest = items[0] if items else None
+def parse_latest_deploy_info(data: Any) -> Optional[Dict[str, Any]]:
+	"""הופך payload של /deploys למילון אחיד של הדיפלוי העדכני ביותר"""
+	# הפוך לרשומות אחידות
+	records: List[Dict[str, Any]]
+	if isinstance(data, list):
+		records = cast(List[Dict[str, Any]], data)
+	elif isinstance(data, dict):
+		if data.get("deploy") and isinstance(data.get("deploy"), dict):
+			records = [cast(Dict[str, Any], data)]
+		else:
+			records = cast(List[Dict[str, Any]], data.get("items") or data.get("data") or [])
+	else:
+		records = []
 
-			if latest and isinstance(latest, dict):
-				entity = latest.get("deploy") if isinstance(latest.get("deploy"), dict) else latest
-				return cast(Optional[str], entity.get("status") or entity.get("state"))
-			return None
-		except requests.RequestException:
+	if not records:
+		return None
+
+	def extract_entity(rec: Dict[str, Any]) -> Dict[str, Any]:
+		return cast(Dict[str, Any], rec.get("deploy") if isinstance(rec.get("deploy"), dict) else rec)
+
+	def entity_ts(ent: Dict[str, Any]) -> datetime:
+		updated = cast(Optional[str], ent.get("updatedAt") or ent.get("finishedAt") or ent.get("completedAt"))
+		created = cast(Optional[str], ent.get("createdAt") or ent.get("created_at"))
+		parsed = _parse_iso(updated) or _parse_iso(created)
+		return parsed or datetime.min
+
+	latest_rec = sorted(records, key=lambda r: entity_ts(extract_entity(r)), reverse=True)[0]
+	entity = extract_entity(latest_rec)
+
+	deploy_id = entity.get("id") or entity.get("deployId")
+	status = cast(Optional[str], entity.get("status") or entity.get("state"))
+	created_at = cast(Optional[str], entity.get("createdAt") or entity.get("created_at"))
+	updated_at = cast(
+		Optional[str],
+		(entity.get("updatedAt") or entity.get("finishedAt") or entity.get("completedAt") or entity.get("updated_at")),
+	)
+	commit_message = None
+	commit_id = None
+	commit = entity.get("commit") or {}
+	if isinstance(commit, dict):
+		commit_message = cast(Optional[str], commit.get("message") or commit.get("title"))
+		commit_id = cast(Optional[str], commit.get("id") or commit.get("sha"))
+	else:
+		commit_message = entity.get("commitMessage") or entity.get("message")
+		commit_id = entity.get("commitId") or entity.get("commit")
+
+	return {
+		"id": deploy_id,
+		"status": status,
+		"createdAt": created_at,
+		"updatedAt": updated_at,
+		"commitMessage": commit_message,
+		"commitId": commit_id,
+		"raw": entity,
+	}
+
+
+def status_from_service_info(service_info: Optional[Dict[str, Any]]) -> Optional[str]:
+	"""סטטוס מפורש מתוך אובייקט שירות (suspended/status/state), או None אם אין"""
+	if isinstance(service_info, dict) and service_info:
+		# אינדיקציית השעיה מפורשת
+		if service_info.get("suspended") is True or service_info.get("suspenders"):
+			return "suspended"
+		# סטטוס/מצב ישיר מהאובייקט
+		status = cast(Optional[str], service_info.get("status") or service_info.get("state"))
+		if status:
+			return status
+	return None
+
+
+# שדות באובייקט שירות שמשתנים בזמן ריצה - לא נשמרים בקאש המטא-דאטה
+VOLATILE_SERVICE_FIELDS = ("suspended", "suspenders", "status", "state", "updatedAt")
+
+
+def service_metadata(service_info: Dict[str, Any]) -> Dict[str, Any]:
+	"""אובייקט שירות בלי השדות המשתנים (סטטוס/השעיה) - רק מה שכמעט לא משתנה: שם, תוכנית, דיסקים"""
+	return {k: v for k, v in service_info.items() if k not in VOLATILE_SERVICE_FIELDS}
+
+
+def status_from_deploy_status(deploy_status: Optional[str]) -> str:
+	"""משתמש בסטטוס דיפלוי רק כדי לשקף 'deploying'; אחרת 'unknown'"""
+	if deploy_status:
+		lower = str(deploy_status).lower()
+		if any(k in lower for k in DEPLOYING_STATUS_KEYWORDS):
+			return "deploying"
+		# מצבי סיום כמו failed/succeeded אינם משקפים בהכרח מצב ריצה נוכחי
+		# ולכן לא נקבע בהם online/offline כאן.
+	return "unknown"
+
+
+def parse_services_payload(data: Any) -> List[Dict[str, Any]]:
+	"""הופך payload של /services לרשימת אובייקטי שירות (ללא שכבת העטיפה)"""
+	services: List[Dict[str, Any]] = []
+
+	def _as_service(entity: Any) -> None:
+		"""הוספת ישות כשירות לאחר הסרה של שכבת עטיפה אם קיימת"""
+		if not isinstance(entity, dict):
+			return
+		obj: Any = entity
+		# פריסה אם יש מפתח "service" שמכיל את האובייקט בפועל
+		inner = obj.get("service") if isinstance(obj.get("service"), dict) else None
+		if inner:
+			obj = inner
+
+		# אם זה נראה כמו אובייקט שירות, הוסף
+		if isinstance(obj, dict):
+			services.append(cast(Dict[str, Any], obj))
+
+	# טיפול במבנים שונים שמוחזרים מה-API
+	if isinstance(data, list):
+		for item in data:
+			_as_service(item)
+	elif isinstance(data, dict):
+		for key in ("items", "data", "services", "result", "list"):
+			val = data.get(key)
+			if isinstance(val, list):
+				for item in val:
+					_as_service(item)
+				break
+		else:
+			# ייתכן שזה אובייקט יחיד של שירות
+			_as_service(data)
+
+	return services
+
+
+def parse_disks_payload(data: Any) -> List[Dict[str, Any]]:
+	"""הופך payload של /disks לרשימת דיסקים (ללא שכבת העטיפה {"disk": ..., "cursor": ...})"""
+	items: Any = []
+	if isinstance(data, list):
+		items = data
+	elif isinstance(data, dict):
+		items = data.get("items") or data.get("data") or []
+	if not isinstance(items, list):
+		return []
+	return [
+		cast(Dict[str, Any], item["disk"] if isinstance(item.get("disk"), dict) else item)
+		for item in items
+		if isinstance(item, dict)
+	]
+
+
+def list_page_params(cursor: Optional[str]) -> Dict[str, Any]:
+	"""פרמטרים לעמוד ברשימות Render (/services, /disks)"""
+	params: Dict[str, Any] = {"limit": config.RENDER_LIST_PAGE_SIZE}
+	if cursor:
+		params["cursor"] = cursor
+	return params
+
+
+def next_page_cursor(data: Any) -> Optional[str]:
+	"""ה-cursor לעמוד הבא, או None אם זה העמוד האחרון.
+
+	Render מחזיר רשימה של {"cursor": ..., "<entity>": ...}; עמוד מלא שהפריט האחרון בו נושא cursor
+	מסמן שייתכן שיש עוד.
+	"""
+	if isinstance(data, list):
+		if len(data) < config.RENDER_LIST_PAGE_SIZE or not isinstance(data[-1], dict):
 			return None
+		cursor = data[-1].get("cursor")
+	elif isinstance(data, dict):
+		cursor = data.get("nextCursor") or data.get("cursor")
+	else:
+		return None
+	return str(cursor) if cursor else None
 
-	def get_latest_deploy_info(self, service_id: str) -> Optional[Dict[str, Any]]:
-		"""מחזיר מידע מפורט על הדיפלוי האחרון של שירות
 
-		מחזיר מילון עם שדות עיקריים: id, status/state, createdAt, updatedAt/finishedAt, commitMessage/commitId
-		"""
-		url = f"{self.base_url}/services/{service_id}/deploys?limit=1"
-		try:
-			response = requests.get(url, headers=self.headers, timeout=15)
-			if response.status_code != 200:
-				return None
-			data = cast(Any, response.json())
-
-			# הפוך לרשומות אחידות
-			records: List[Dict[str, Any]]
-			if isinstance(data, list):
-				records = cast(List[Dict[str, Any]], data)
-			elif isinstance(data, dict):
-				if data.get("deploy") and isinstance(data.get("deploy"), dict):
-					records = [cast(Dict[str, Any], data)]
-				else:
-					records = cast(List[Dict[str, Any]], data.get("items") or data.get("data") or [])
-			else:
-				records = []
+def parse_env_vars_payload(data: Any) -> List[Dict[str, Any]]:
+	"""הופך payload של /env-vars לרשימת משתני סביבה"""
+	# טיפול במבני JSON שונים
+	if isinstance(data, list):
+		return cast(List[Dict[str, Any]], data)
+	elif isinstance(data, dict):
+		# חיפוש במפתחות מוכרים
+		for key in ("envVars", "env_vars", "data", "items", "result"):
+			val = data.get(key)
+			if isinstance(val, list):
+				return cast(List[Dict[str, Any]], val)
+	return []
 
-			if not records:
-				return None
 
-			def extract_entity(rec: Dict[str, Any]) -> Dict[str, Any]:
-				return cast(Dict[str, Any], rec.get("deploy") if isinstance(rec.get("deploy"), dict) else rec)
-
-			def parse_iso(ts: Optional[str]) -> Optional[datetime]:
-				if not ts or not isinstance(ts, str):
-					return None
-				try:
-					if ts.endswith("Z"):
-						ts = ts.replace("Z", "+00:00")
-					return datetime.fromisoformat(ts)
-				except Exception:
-					return None
-
-			def entity_ts(ent: Dict[str, Any]) -> datetime:
-				updated = cast(Optional[str], ent.get("updatedAt") or ent.get("finishedAt") or ent.get("completedAt"))
-				created = cast(Optional[str], ent.get("createdAt") or ent.get("created_at"))
-				parsed = parse_iso(updated) or parse_iso(created)
-				return parsed or datetime.min
-
-			latest_rec = sorted(records, key=lambda r: entity_ts(extract_entity(r)), reverse=True)[0]
-			entity = extract_entity(latest_rec)
-
-			deploy_id = entity.get("id") or entity.get("deployId")
-			status = cast(Optional[str], entity.get("status") or entity.get("state"))
-			created_at = cast(Optional[str], entity.get("createdAt") or entity.get("created_at"))
-			updated_at = cast(
-				Optional[str],
-				(entity.get("updatedAt") or entity.get("finishedAt") or entity.get("completedAt") or entity.get("updated_at")),
-			)
-			commit_message = None
-			commit_id = None
-			commit = entity.get("commit") or {}
-			if isinstance(commit, dict):
-				commit_message = cast(Optional[str], commit.get("message") or commit.get("title"))
-				commit_id = cast(Optional[str], commit.get("id") or commit.get("sha"))
-			else:
-				commit_message = entity.get("commitMessage") or entity.get("message")
-				commit_id = entity.get("commitId") or entity.get("commit")
+def build_logs_params(
+	tail: Optional[int], start_time: Optional[str], end_time: Optional[str], direction: Optional[str] = None
+) -> Dict[str, Any]:
+	"""פרמטרי בקשת לוגים בפורמט הנוכחי של Render ('limit', 'start', 'end', 'direction')"""
+	# Render API allows max 100 lines per request
+	params: Dict[str, Any] = {}
+	if tail is not None:
+		params["limit"] = min(max(tail, 0), 100)
+	if start_time:
+		params["start"] = start_time
+	if end_time:
+		params["end"] = end_time
+	if direction:
+		params["direction"] = direction
+	return params
 
-			return {
-				"id": deploy_id,
-				"status": status,
-				"createdAt": created_at,
-				"updatedAt": updated_at,
-				"commitMessage": commit_message,
-				"commitId": commit_id,
-				"raw": entity,
+
+def build_legacy_logs_params(tail: Optional[int], start_time: Optional[str], end_time: Optional[str]) -> Dict[str, Any]:
+	"""פרמטרי בקשת לוגים בפורמט הישן ('tail', 'startTime', 'endTime')"""
+	legacy_params: Dict[str, Any] = {}
+	if tail is not None:
+		legacy_params["tail"] = min(max(tail, 0), 100)  # Max 100 per Render API
+	if start_time:
+		legacy_params["startTime"] = start_time
+	if end_time:
+		legacy_params["endTime"] = end_time
+	return legacy_params
+
+
+def parse_logs_payload(payload: Any) -> List[Dict[str, Any]]:
+	"""איתור רשומות לוג בתוך payload בכל אחד מהמבנים המוכרים"""
+
+	def _looks_like_entry(node: Any) -> bool:
+		if not isinstance(node, dict):
+			return False
+		text_candidate = None
+		for key in ("text", "message", "log", "body", "line"):
+			if node.get(key) is not None:
+				text_candidate = node.get(key)
+				break
+		if text_candidate is None:
+			return False
+		for marker in ("timestamp", "time", "ts", "id", "logId", "stream", "type", "level", "severity"):
+			if marker in node:
+				return True
+		return False
+
+	def _collect_entries(node: Any) -> List[Dict[str, Any]]:
+		if isinstance(node, list):
+			collected: List[Dict[str, Any]] = []
+			for item in node:
+				collected.extend(_collect_entries(item))
+			return collected
+		if isinstance(node, dict):
+			if _looks_like_entry(node):
+				return [node]
+			collected = []
+			for value in node.values():
+				collected.extend(_collect_entries(value))
+			return collected
+		return []
+
+	if isinstance(payload, list):
+		return _collect_entries(payload)
+	if isinstance(payload, dict):
+		for key in ("logs", "entries", "data", "items", "result", "records", "logEntries", "log_entries"):
+			val = payload.get(key)
+			if isinstance(val, list):
+				extracted = _collect_entries(val)
+				if extracted:
+					return extracted
+		for key in ("logGroups", "log_groups", "groups"):
+			groups = payload.get(key)
+			if isinstance(groups, list):
+				collected: List[Dict[str, Any]] = []
+				for group in groups:
+					collected.extend(_collect_entries(group))
+				if collected:
+					return collected
+		inner = payload.get("log") or payload.get("response")
+		if isinstance(inner, dict):
+			result = _collect_entries(inner)
+			if result:
+				return result
+	return _collect_entries(payload)
+
+
+def normalize_log_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+	"""נרמול רשומות לוג למבנה אחיד: id, timestamp, text, stream, raw"""
+	normalized: List[Dict[str, Any]] = []
+	for entry in entries:
+		if not isinstance(entry, dict):
+			continue
+		text = entry.get("text") or entry.get("message") or entry.get("log") or entry.get("body")
+		if text is None:
+			continue
+		if not isinstance(text, str):
+			text = str(text)
+		stream = entry.get("stream") or entry.get("type") or entry.get("channel")
+		if isinstance(stream, str):
+			lower = stream.lower()
+			if "err" in lower:
+				stream = "stderr"
+			elif "out" in lower:
+				stream = "stdout"
+		if not stream:
+			level = entry.get("level") or entry.get("severity")
+			if isinstance(level, str) and "err" in level.lower():
+				stream = "stderr"
+		if not stream:
+			stream = "stdout"
+		timestamp = entry.get("timestamp") or entry.get("time") or entry.get("ts")
+		if timestamp is not None and not isinstance(timestamp, str):
+			timestamp = str(timestamp)
+		log_id = entry.get("id") or entry.get("logId") or entry.get("_id") or entry.get("uuid")
+		normalized.append(
+			{
+				"id": log_id,
+				"timestamp": timestamp,
+				"text": text,
+				"stream": stream,
+				"raw": entry,
 			}
-		except requests.RequestException:
-			return None
+		)
+	return normalized
 
-	def get_service_status(self, service_id: str) -> Optional[str]:
-		"""קבלת סטטוס שירות עדכני
-		עדיפות למידע שירות חי (online/offline/suspended).
-		משתמש בסטטוס דיפלוי רק כדי לציין מצב 'deploying',
-		כדי להימנע מסיווג שגוי כ-offline כשדיפלוי נכשל אך הגרסה הקודמת עדיין פועלת.
-		"""
-		# קודם כל ננסה להביא מידע שירות חי
-		service_info = self.get_service_info(service_id)
-		if isinstance(service_info, dict) and service_info:
-			# אינדיקציית השעיה מפורשת
-			if service_info.get("suspended") is True or service_info.get("suspenders"):
-				return "suspended"
-			# סטטוס/מצב ישיר מהאובייקט
-			status = cast(Optional[str], service_info.get("status") or service_info.get("state"))
-			if status:
-				return status
 
-		# אם לא קיבלנו סטטוס ברור, נבדוק סטטוס דיפלוי
-		deploy_status = self._get_latest_deploy_status(service_id)
-		if deploy_status:
-			# נשתמש בדיפלוי רק כדי לשקף 'deploying'
-			lower = str(deploy_status).lower()
-			if any(
-				k in lower
-				for k in [
-					"deploy",
-					"build",
-					"progress",
-					"start",
-					"provision",
-					"pending",
-					"queue",
-					"updat",
-					"initializ",
-					"restarting",
-				]
-			):
-				return "deploying"
-			# מצבי סיום כמו failed/succeeded אינם משקפים בהכרח מצב ריצה נוכחי
-			# ולכן לא נקבע בהם online/offline כאן.
-
-		return "unknown"
+def parse_log_timestamp(ts: Any) -> Optional[datetime]:
+	"""המרת timestamp של רשומת לוג ל-datetime ב-UTC (None אם לא ניתן לפענח)"""
+	if not ts:
+		return None
+	try:
+		parsed = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+	except ValueError:
+		return None
+	if parsed.tzinfo is None:
+		parsed = parsed.replace(tzinfo=timezone.utc)
+	return parsed
 
-	def list_services(self) -> List[Dict[str, Any]]:
-		"""רשימת כל השירותים"""
-		url = f"{self.base_url}/services"
 
-		try:
-			response = requests.get(url, headers=self.headers, timeout=15)
-			if response.status_code != 200:
-				return []
+def log_entry_key(entry: Dict[str, Any]) -> str:
+	"""מזהה יציב לרשומת לוג: id אם קיים, אחרת timestamp+טקסט"""
+	log_id = entry.get("id")
+	if log_id:
+		return str(log_id)
+	return f"{entry.get('timestamp')}|{entry.get('text', '')}"
 
-			data = response.json()
-			services: List[Dict[str, Any]] = []
 
-			def _as_service(entity: Any) -> None:
-				"""הוספת ישות כשירות לאחר הסרה של שכבת עטיפה אם קיימת"""
-				if not isinstance(entity, dict):
-					return
-				obj: Any = entity
-				# פריסה אם יש מפתח "service" שמכיל את האובייקט בפועל
-				inner = obj.get("service") if isinstance(obj.get("service"), dict) else None
-				if inner:
-					obj = inner
-
-				# אם זה נראה כמו אובייקט שירות, הוסף
-				if isinstance(obj, dict):
-					services.append(cast(Dict[str, Any], obj))
-
-			# טיפול במבנים שונים שמוחזרים מה-API
-			if isinstance(data, list):
-				for item in data:
-					_as_service(item)
-			elif isinstance(data, dict):
-				for key in ("items", "data", "services", "result", "list"):
-					val = data.get(key)
-					if isinstance(val, list):
-						for item in val:
-							_as_service(item)
-						break
-				else:
-					# ייתכן שזה אובייקט יחיד של שירות
-					_as_service(data)
-
-			return services
-		except requests.RequestException:
+class RequestBudget:
+	"""תקציב בקשות משותף (למשל לכל סבב) לכמה קוראי לוגים; בטוח לשימוש מכמה threads"""
+
+	def __init__(self, limit: int):
+		self.remaining = limit
+		self._lock = threading.Lock()
+
+	def take(self) -> bool:
+		with self._lock:
+			if self.remaining <= 0:
+				return False
+			self.remaining -= 1
+			return True
+
+
+class LogPager:
+	"""מצב העימוד של קריאת לוגים, משותף ללקוח הסינכרוני והאסינכרוני.
+
+	משתמש ב-hasMore/nextStartTime/nextEndTime אם ה-API מחזיר אותם, ואחרת מזיז את
+	חלון הזמן (end אחורה או start קדימה) לפי הרשומה האחרונה בעמוד. רשומות הגבול
+	(אותו timestamp) מסוננות כדי שלא יוחזרו פעמיים.
+	"""
+
+	def __init__(
+		self,
+		start_time: Optional[str] = None,
+		end_time: Optional[str] = None,
+		direction: str = "backward",
+		page_size: int = 100,
+		max_pages: Optional[int] = None,
+		request_budget: Optional[RequestBudget] = None,
+	):
+		self.start_time = start_time
+		self.end_time = end_time
+		self.direction = direction
+		self.page_size = min(max(page_size, 1), 100)
+		self.max_pages = max_pages if max_pages is not None else config.LOG_PAGINATION_MAX_PAGES
+		self.request_budget = request_budget
+		self.pages = 0
+		self.done = False
+		self._boundary_ts: Optional[str] = None
+		self._boundary_keys: set = set()
+
+	def next_params(self) -> Optional[Dict[str, Any]]:
+		"""פרמטרי הבקשה הבאה, או None אם העימוד הסתיים / נגמר התקציב"""
+		if self.done or self.pages >= self.max_pages:
+			return None
+		if self.request_budget is not None and not self.request_budget.take():
+			return None
+		self.pages += 1
+		return build_logs_params(self.page_size, self.start_time, self.end_time, self.direction)
+
+	def consume(self, payload: Any, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+		"""עיבוד עמוד: מחזיר את הרשומות החדשות בסדר הקריאה ומעדכן את החלון הבא"""
+		min_ts = datetime.min.replace(tzinfo=timezone.utc)
+		entries = sorted(
+			entries,
+			key=lambda e: parse_log_timestamp(e.get("timestamp")) or min_ts,
+			reverse=self.direction != "forward",
+		)
+		fresh = [e for e in entries if log_entry_key(e) not in self._boundary_keys]
+		if not fresh:
+			self.done = True
 			return []
 
-	def get_suspended_services(self) -> list:
-		"""רשימת שירותים מושעים"""
-		services = self.list_services()
-		return [service for service in services if service.get("status") == "suspended" or service.get("suspended") is True]
+		# גבול העמוד: הרשומה האחרונה בסדר הקריאה
+		edge_ts = fresh[-1].get("timestamp")
+		if edge_ts != self._boundary_ts:
+			self._boundary_ts = edge_ts
+			self._boundary_keys = set()
+		self._boundary_keys.update(log_entry_key(e) for e in fresh if e.get("timestamp") == edge_ts)
 
-	# ===== מידע על דיסקים ותוכניות תמחור =====
+		has_more = payload.get("hasMore") if isinstance(payload, dict) else None
+		if has_more is not None:
+			# עימוד מפורש מה-API
+			if not has_more:
+				self.done = True
+			self.start_time = payload.get("nextStartTime") or self.start_time
+			self.end_time = payload.get("nextEndTime") or self.end_time
+			if not payload.get("nextStartTime") and not payload.get("nextEndTime"):
+				self._shift_window(edge_ts)
+		else:
+			if len(entries) < self.page_size:
+				self.done = True
+			self._shift_window(edge_ts)
+		return fresh
 
-	def list_disks(self) -> List[Dict[str, Any]]:
-		"""מחזיר רשימת דיסקים (Persistent Disks) אם נתמכים ב-API
+	def _shift_window(self, edge_ts: Optional[str]) -> None:
+		if not edge_ts:
+			self.done = True
+		elif self.direction == "forward":
+			self.start_time = str(edge_ts)
+		else:
+			self.end_time = str(edge_ts)
 
-		החזרה: רשימה של אובייקטים עם שדות כגון: id, serviceId, sizeGB, mountPath.
-		במקרה של תקלה או אם ה-API אינו זמין - מוחזרת רשימה ריקה.
-		"""
-		url = f"{self.base_url}/disks"
+
+def recent_logs_window(minutes: int) -> Tuple[str, datetime, datetime]:
+	"""חלון זמן של הדקות האחרונות: (start בפורמט ISO נקי, start, end) ב-UTC"""
+	# Use explicit start time with clean ISO format (no microseconds)
+	end_dt = datetime.now(timezone.utc)
+	start_dt = end_dt - timedelta(minutes=minutes)
+	start_str = start_dt.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+	return start_str, start_dt, end_dt
+
+
+def filter_logs_by_window(logs: List[Dict[str, Any]], start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+	"""סינון נוסף של לוגים לטווח הזמן (עם טיפול ב-Timezone)"""
+	filtered: List[Dict[str, Any]] = []
+	for entry in logs:
+		ts_raw = entry.get("timestamp")
+		if not ts_raw:
+			continue
 		try:
-			response = requests.get(url, headers=self.headers, timeout=15)
-			if response.status_code == 200:
-				data = response.json()
-				if isinstance(data, list):
-					return cast(List[Dict[str, Any]], data)
-				items = cast(Any, data).get("items") or cast(Any, data).get("data")
-				if isinstance(items, list):
-					return cast(List[Dict[str, Any]], items)
-			return []
-		except requests.RequestException:
-			return []
+			iso = str(ts_raw).replace("Z", "+00:00")
+			ts = datetime.fromisoformat(iso)
+
+			# === CRITICAL FIX: Ensure timezone-aware datetime ===
+			# If the parsed timestamp is naive (no timezone), assume UTC
+			if ts.tzinfo is None:
+				ts = ts.replace(tzinfo=timezone.utc)
+
+			if start_time <= ts <= end_time:
+				filtered.append(entry)
+		except Exception:
+			# On parse error, keep the log entry to avoid data loss
+			filtered.append(entry)
+			continue
+	return filtered if filtered else logs
+
+
+def mutation_result(
+	response_status: int, ok_codes: Tuple[int, ...], success_message: str, failure_prefix: str, text: str
+) -> Dict[str, Any]:
+	"""מבנה תשובה אחיד לפעולות שינוי (success, status_code, message)"""
+	if response_status in ok_codes:
+		return {"success": True, "status_code": response_status, "message": success_message}
+	return {"success": False, "status_code": response_status, "message": f"{failure_prefix}{text}"}
+
+
+class RenderAPIBase:
+	"""בסיס משותף ללקוח הסינכרוני והאסינכרוני: הגדרות חיבור ועזרי ניתוח אובייקט שירות"""
+
+	def __init__(self) -> None:
+		self.api_key = config.RENDER_API_KEY
+		self.base_url = config.RENDER_API_URL
+		self.headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json", "Accept": "application/json"}
+		# קאש משותף לשני הלקוחות, כך שפעולה משנה באחד מבטלת את הרשומה גם עבור השני
+		self.metadata_cache = service_metadata_cache
+		self.rate_limiter = render_rate_limiter
 
 	def service_has_disk(self, service: Dict[str, Any]) -> bool:
 		"""נסה לזהות אם לשירות יש דיסק קבוע לפי מבנה ה-JSON.
@@ -357,29 +631,666 @@ class RenderAPI:
 			return False
 		return None
 
+
+class MetadataCache:
+	"""קאש LRU עם TTL למטא-דאטה של שירותים, משותף ללקוח הסינכרוני והאסינכרוני.
+
+	רשומה נמחקת כשעבר ה-TTL, כשהקאש מלא (הכי פחות בשימוש), או ב-invalidate אחרי פעולה משנה.
+	"""
+
+	def __init__(self, max_size: int = 500, ttl_seconds: int = 600):
+		self.max_size = max(1, max_size)
+		self.ttl_seconds = ttl_seconds
+		self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+		self._lock = threading.Lock()
+		# מונה ביטולים לכל שירות: שליפה שהתחילה לפני ביטול לא תשמור את התוצאה (הישנה) שלה
+		self._generations: Dict[str, int] = {}
+		self.hits = 0
+		self.misses = 0
+		self.invalidations = 0
+
+	def get(self, service_id: str) -> Optional[Dict[str, Any]]:
+		with self._lock:
+			entry = self._entries.get(service_id)
+			if entry is None or time.monotonic() >= entry[0]:
+				if entry is not None:
+					del self._entries[service_id]
+				self.misses += 1
+				return None
+			self._entries.move_to_end(service_id)
+			self.hits += 1
+			return copy.deepcopy(entry[1])
+
+	def generation(self, service_id: str) -> int:
+		"""לקריאה לפני שליפה מ-Render; מועבר ל-put כדי לזהות ביטול שקרה בינתיים"""
+		with self._lock:
+			return self._generations.get(service_id, 0)
+
+	def put(self, service_id: str, metadata: Dict[str, Any], generation: Optional[int] = None) -> None:
+		with self._lock:
+			if generation is not None and generation != self._generations.get(service_id, 0):
+				return
+			self._entries[service_id] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(metadata))
+			self._entries.move_to_end(service_id)
+			while len(self._entries) > self.max_size:
+				self._entries.popitem(last=False)
+
+	def invalidate(self, service_id: str) -> None:
+		with self._lock:
+			self._generations[service_id] = self._generations.get(service_id, 0) + 1
+			if self._entries.pop(service_id, None) is not None:
+				self.invalidations += 1
+
+	def get_stats(self) -> Dict[str, Any]:
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				"size": len(self._entries),
+				"hits": self.hits,
+				"misses": self.misses,
+				"invalidations": self.invalidations,
+				"hit_ratio": self.hits / lookups if lookups else 0.0,
+			}
+
+
+# קריאות מ-threads/tasks של ניטור ברקע מסומנות כרקע; כל השאר (handlers) נחשבות אינטראקטיביות
+_background_requests: contextvars.ContextVar[bool] = contextvars.ContextVar("render_background_requests", default=False)
+
+
+def mark_background_requests() -> None:
+	"""סימון ה-thread (או ה-task) הנוכחי כניטור ברקע - קריאות ממנו מפנות את האסימונים השמורים ל-handlers"""
+	_background_requests.set(True)
+
+
+def is_background_request() -> bool:
+	return _background_requests.get()
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+	"""שניות להמתנה לפי Retry-After (שניות או תאריך HTTP) או Ratelimit-Reset (שניות או epoch)"""
+	retry_after = headers.get("Retry-After")
+	if retry_after:
+		try:
+			return max(float(retry_after), 0.0)
+		except ValueError:
+			try:
+				return max((parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+			except (TypeError, ValueError):
+				pass
+	reset = headers.get("Ratelimit-Reset")
+	if reset:
+		try:
+			value = float(reset)
+		except ValueError:
+			return None
+		# ערך גדול הוא חותמת זמן ולא מספר שניות
+		return max(value - time.time(), 0.0) if value > 1_000_000_000 else max(value, 0.0)
+	return None
+
+
+class RateLimiter:
+	"""token bucket משותף לכל הקריאות ל-Render (שני הלקוחות, כל ה-threads).
+
+	קריאות רקע לוקחות אסימון רק אם נשארים אחריו interactive_reserve אסימונים, כך ש-handlers
+	לא ממתינים מאחורי ניטור. תשובת 429 או Ratelimit-Remaining=0 עוצרות את כולם עד הזמן שהשרת ביקש.
+	"""
+
+	def __init__(self, per_minute: int = 300, burst: int = 30, interactive_reserve: int = 5, max_pause: float = 60.0):
+		self.rate = max(per_minute, 1) / 60.0
+		self.capacity = float(max(burst, 1))
+		self.interactive_reserve = min(max(interactive_reserve, 0), max(burst - 1, 0))
+		self.max_pause = max_pause
+		self._tokens = self.capacity
+		self._updated = time.monotonic()
+		self._paused_until = 0.0
+		self._lock = threading.Lock()
+		self.throttled_interactive = 0
+		self.throttled_background = 0
+		self.wait_seconds = 0.0
+		self.rate_limited = 0
+
+	def _reserve(self, background: bool) -> float:
+		"""לקיחת אסימון אם אפשר (0.0), אחרת כמה שניות לחכות לפני ניסיון נוסף"""
+		with self._lock:
+			now = time.monotonic()
+			self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+			self._updated = now
+			if now < self._paused_until:
+				return self._paused_until - now
+			needed = 1.0 + (self.interactive_reserve if background else 0)
+			if self._tokens >= needed:
+				self._tokens -= 1.0
+				return 0.0
+			return (needed - self._tokens) / self.rate
+
+	def _record_wait(self, background: bool, waited: float) -> None:
+		with self._lock:
+			if background:
+				self.throttled_background += 1
+			else:
+				self.throttled_interactive += 1
+			self.wait_seconds += waited
+
+	def acquire(self) -> None:
+		"""המתנה (חוסמת) לאסימון"""
+		background = is_background_request()
+		waited = 0.0
+		while True:
+			delay = self._reserve(background)
+			if delay <= 0:
+				break
+			time.sleep(delay)
+			waited += delay
+		if waited:
+			self._record_wait(background, waited)
+
+	async def acquire_async(self) -> None:
+		"""המתנה לאסימון בלי לחסום את ה-event loop"""
+		background = is_background_request()
+		waited = 0.0
+		while True:
+			delay = self._reserve(background)
+			if delay <= 0:
+				break
+			await asyncio.sleep(delay)
+			waited += delay
+		if waited:
+			self._record_wait(background, waited)
+
+	def observe(self, status_code: int, headers: Any) -> None:
+		"""עדכון לפי תשובה: 429 / Ratelimit-Remaining=0 עוצרים עד Retry-After/Ratelimit-Reset"""
+		remaining_header = headers.get("Ratelimit-Remaining")
+		try:
+			remaining = float(remaining_header) if remaining_header is not None else None
+		except ValueError:
+			remaining = None
+		if status_code != 429 and (remaining is None or remaining > 0):
+			if remaining is not None:
+				# השרת יודע על קריאות של לקוחות אחרים באותו מפתח - לא נחזיק יותר אסימונים ממה שנשאר שם
+				with self._lock:
+					self._tokens = min(self._tokens, remaining)
+			return
+		pause = parse_retry_after(headers)
+		if pause is None:
+			pause = 1.0 / self.rate if status_code != 429 else 5.0
+		pause = min(pause, self.max_pause)
+		with self._lock:
+			if status_code == 429:
+				self.rate_limited += 1
+			self._tokens = 0.0
+			self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+	def get_stats(self) -> Dict[str, Any]:
+		with self._lock:
+			return {
+				"tokens": round(self._tokens, 1),
+				"throttled_interactive": self.throttled_interactive,
+				"throttled_background": self.throttled_background,
+				"wait_seconds": round(self.wait_seconds, 1),
+				"rate_limited": self.rate_limited,
+				"paused_for": round(max(self._paused_until - time.monotonic(), 0.0), 1),
+			}
+
+
+class RequestCounter:
+	"""מוני בקשות/תעבורה ל-Render לפי תחום (scope) שמוגדר ל-thread הנוכחי (כמו RoundTripCounter של MongoDB)"""
+
+	def __init__(self):
+		self._local = threading.local()
+		self._lock = threading.Lock()
+		self._counts: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+	@contextmanager
+	def scope(self, name: str) -> Iterator[None]:
+		previous = getattr(self._local, "scope", None)
+		self._local.scope = name
+		try:
+			yield
+		finally:
+			self._local.scope = previous
+
+	def pop(self, name: str) -> Dict[str, float]:
+		"""מחזיר את המונים שנצברו בתחום ומאפס אותם"""
+		with self._lock:
+			return dict(self._counts.pop(name, {}))
+
+	def add(self, metric: str, value: float = 1) -> None:
+		name = getattr(self._local, "scope", None)
+		if name:
+			with self._lock:
+				self._counts[name][metric] += value
+
+
+class _CachedResponse:
+	def __init__(self, etag: Optional[str], last_modified: Optional[str], digest: bytes, value: Any):
+		self.etag = etag
+		self.last_modified = last_modified
+		self.digest = digest
+		self.value = value
+
+
+class ResponseCache:
+	"""מטמון תשובות GET לפי (תווית, URL, פרמטרים): validators לבקשה מותנית, hash של הגוף והתוצאה המפוענחת.
+
+	304 - התוצאה מוגשת מהמטמון בלי גוף; 200 עם גוף זהה (לפי hash) - בלי פענוח ונרמול מחדש.
+	"""
+
+	def __init__(self, max_size: int = 1000):
+		self.max_size = max(1, max_size)
+		self._entries: "OrderedDict[Hashable, _CachedResponse]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: Hashable) -> Optional[_CachedResponse]:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				self._entries.move_to_end(key)
+			return entry
+
+	def put(self, key: Hashable, entry: _CachedResponse) -> None:
+		with self._lock:
+			self._entries[key] = entry
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_size:
+				self._entries.popitem(last=False)
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+
+class _InFlightCall:
+	def __init__(self):
+		self.done = threading.Event()
+		self.result: Any = None
+		self.error: Optional[BaseException] = None
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+	"""איחוד קריאות זהות שרצות במקביל: הראשונה מבצעת את הבקשה, השאר ממתינות לתוצאה שלה.
+
+	אין כאן קאש - ברגע שהקריאה מסתיימת, הקריאה הבאה עם אותו מפתח יוצאת לרשת מחדש.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._calls: Dict[Hashable, _InFlightCall] = {}
+		self.hits = 0
+		self.misses = 0
+
+	def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+		with self._lock:
+			existing = self._calls.get(key)
+			if existing is None:
+				call = self._calls[key] = _InFlightCall()
+				self.misses += 1
+			else:
+				self.hits += 1
+
+		if existing is not None:
+			existing.done.wait()
+			if existing.error is not None:
+				raise existing.error
+			# עותק לכל ממתין, כדי ששינוי של קורא אחד לא ישפיע על האחרים
+			return cast(T, copy.deepcopy(existing.result))
+
+		try:
+			call.result = fn()
+			return cast(T, call.result)
+		except BaseException as e:
+			call.error = e
+			raise
+		finally:
+			with self._lock:
+				del self._calls[key]
+			call.done.set()
+
+	def get_stats(self) -> Dict[str, int]:
+		with self._lock:
+			return {"hits": self.hits, "misses": self.misses, "in_flight": len(self._calls)}
+
+
+def coalesced(method: Callable[..., T]) -> Callable[..., T]:
+	"""קריאות מקבילות לאותה מתודה עם אותם ארגומנטים חולקות בקשת HTTP אחת (self._single_flight)"""
+
+	@functools.wraps(method)
+	def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:
+		key = (method.__name__, args, tuple(sorted(kwargs.items())))
+		return cast(T, self._single_flight.do(key, lambda: method(self, *args, **kwargs)))
+
+	return wrapper
+
+
+class RenderAPI(RenderAPIBase):
+	def __init__(self) -> None:
+		super().__init__()
+		# Session משותף לכל ה-threads (מוניטורים + handlers) כדי לעשות שימוש חוזר בחיבורי TCP/TLS
+		self.session = self._create_session()
+		self._stats_lock = threading.Lock()
+		self._request_count = 0
+		# בקשות GET מותנות: validators ותוצאות מפוענחות לפי URL, ומוני תעבורה/זמן פענוח
+		self._response_cache = ResponseCache(config.RENDER_RESPONSE_CACHE_SIZE)
+		self._bytes_received = 0
+		self._parse_seconds = 0.0
+		self._not_modified = 0
+		self._unchanged_bodies = 0
+		# מונים לפי תחום, כדי שסבב ניטור יוכל לספור רק את הבקשות שהוא עצמו שלח
+		self.request_counter = RequestCounter()
+		# קריאות קריאה-בלבד זהות שרצות במקביל (מוניטורים, handlers, threads של דיפלוי) חולקות בקשה אחת
+		self._single_flight = SingleFlight()
+
+	def _create_session(self) -> requests.Session:
+		"""יצירת Session עם keep-alive ומאגר חיבורים בגודל מוגדר לכל host"""
+		session = requests.Session()
+		session.headers.update(self.headers)
+		adapter = HTTPAdapter(
+			pool_connections=config.RENDER_HTTP_POOL_CONNECTIONS,
+			pool_maxsize=config.RENDER_HTTP_POOL_MAXSIZE,
+			pool_block=config.RENDER_HTTP_POOL_BLOCK,
+		)
+		session.mount("https://", adapter)
+		session.mount("http://", adapter)
+		return session
+
+	def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+		"""ביצוע בקשה דרך ה-Session המשותף (החיבור חוזר למאגר בסיום), במסגרת מגבלת הקצב.
+
+		429 נשלח שוב (עד RENDER_RATE_LIMIT_MAX_RETRIES) אחרי ההמתנה שהשרת ביקש.
+		"""
+		attempt = 0
+		while True:
+			self.rate_limiter.acquire()
+			with self._stats_lock:
+				self._request_count += 1
+			self.request_counter.add("requests")
+			response = self.session.request(method, url, **kwargs)
+			self.rate_limiter.observe(response.status_code, response.headers)
+			if response.status_code != 429 or attempt >= config.RENDER_RATE_LIMIT_MAX_RETRIES:
+				return response
+			attempt += 1
+
+	def _cached_get(
+		self, url: str, label: str, parse: Callable[[Any], T], params: Optional[Dict[str, Any]] = None, timeout: int = 15
+	) -> Tuple[int, Optional[T]]:
+		"""GET עם ETag/Last-Modified ומטמון תוצאות; מחזיר (status_code, parse(json)) - 304 מוחזר כ-200.
+
+		שרת בלי validators: הגוף מורד, אבל אם ה-hash שלו זהה לקודם מוחזרת התוצאה המפוענחת הקודמת.
+		label מבדיל בין פענוחים שונים של אותו URL (למשל סטטוס דיפלוי מול פרטי דיפלוי).
+		"""
+		key = (label, url, tuple(sorted((params or {}).items())))
+		cached = self._response_cache.get(key)
+		headers = {}
+		if cached is not None:
+			if cached.etag:
+				headers["If-None-Match"] = cached.etag
+			if cached.last_modified:
+				headers["If-Modified-Since"] = cached.last_modified
+
+		response = self._request("GET", url, params=params, headers=headers, timeout=timeout)
+		if response.status_code == 304 and cached is not None:
+			with self._stats_lock:
+				self._not_modified += 1
+			self.request_counter.add("not_modified")
+			return 200, copy.deepcopy(cached.value)
+
+		body = response.content or b""
+		with self._stats_lock:
+			self._bytes_received += len(body)
+		self.request_counter.add("bytes_received", len(body))
+		if response.status_code != 200:
+			return response.status_code, None
+
+		digest = hashlib.blake2b(body, digest_size=16).digest()
+		if cached is not None and cached.digest == digest:
+			with self._stats_lock:
+				self._unchanged_bodies += 1
+			self.request_counter.add("unchanged_bodies")
+			value = copy.deepcopy(cached.value)
+		else:
+			started = time.perf_counter()
+			value = parse(response.json())
+			parse_seconds = time.perf_counter() - started
+			with self._stats_lock:
+				self._parse_seconds += parse_seconds
+			self.request_counter.add("parse_seconds", parse_seconds)
+		entry_value = copy.deepcopy(value)
+		self._response_cache.put(
+			key,
+			_CachedResponse(response.headers.get("ETag"), response.headers.get("Last-Modified"), digest, entry_value),
+		)
+		return 200, value
+
+	def get_transfer_stats(self) -> Dict[str, Any]:
+		"""מונים מצטברים של GETים מותנים: גוף שהתקבל (bytes), זמן פענוח, 304 וגופים זהים שלא פוענחו"""
+		with self._stats_lock:
+			return {
+				"bytes_received": self._bytes_received,
+				"parse_seconds": self._parse_seconds,
+				"not_modified": self._not_modified,
+				"unchanged_bodies": self._unchanged_bodies,
+				"cached_urls": len(self._response_cache),
+			}
+
+	def get_connection_stats(self) -> Dict[str, int]:
+		"""מוני שימוש חוזר בחיבורים: כמה בקשות נשלחו וכמה חיבורים חדשים נפתחו בפועל.
+
+		reused_connections = בקשות שנשלחו על חיבור קיים (ללא handshake חדש).
+		"""
+		new_connections = 0
+		pooled_requests = 0
+		pools = 0
+		for adapter in set(self.session.adapters.values()):
+			manager = getattr(adapter, "poolmanager", None)
+			if manager is None:
+				continue
+			for key in list(manager.pools.keys()):
+				pool = manager.pools.get(key)
+				if pool is None:
+					continue
+				pools += 1
+				new_connections += int(getattr(pool, "num_connections", 0))
+				pooled_requests += int(getattr(pool, "num_requests", 0))
+		with self._stats_lock:
+			total_requests = self._request_count
+		coalescing = self._single_flight.get_stats()
+		return {
+			"requests": total_requests,
+			"pools": pools,
+			"new_connections": new_connections,
+			"reused_connections": max(pooled_requests - new_connections, 0),
+			"coalesced_hits": coalescing["hits"],
+			"coalesced_misses": coalescing["misses"],
+		}
+
+	def close(self) -> None:
+		"""סגירת ה-Session ושחרור החיבורים הפתוחים"""
+		self.session.close()
+
+	def suspend_service(self, service_id: str) -> Dict:
+		"""השעיית שירות"""
+		url = f"{self.base_url}/services/{service_id}/suspend"
+
+		try:
+			response = self._request("POST", url, timeout=15)
+			return mutation_result(response.status_code, (200,), "Service suspended successfully", "", response.text)
+		except requests.RequestException as e:
+			return {"success": False, "status_code": 0, "message": f"Request failed: {str(e)}"}
+		finally:
+			# אחרי הבקשה, כדי ששליפה מקבילה לא תחזיר לקאש את האובייקט שלפני השינוי
+			self.metadata_cache.invalidate(service_id)
+
+	def resume_service(self, service_id: str) -> Dict:
+		"""החזרת שירות לפעילות"""
+		url = f"{self.base_url}/services/{service_id}/resume"
+
+		try:
+			response = self._request("POST", url, timeout=15)
+			return mutation_result(response.status_code, (200,), "Service resumed successfully", "", response.text)
+		except requests.RequestException as e:
+			return {"success": False, "status_code": 0, "message": f"Request failed: {str(e)}"}
+		finally:
+			self.metadata_cache.invalidate(service_id)
+
+	@coalesced
+	def get_service_info(self, service_id: str) -> Optional[Dict[str, Any]]:
+		"""קבלת מידע על שירות"""
+		url = f"{self.base_url}/services/{service_id}"
+
+		generation = self.metadata_cache.generation(service_id)
+		try:
+			status_code, service_info = self._cached_get(url, "service", lambda data: cast(Dict[str, Any], data))
+			if status_code == 200 and service_info:
+				# כל שליפה חיה מרעננת גם את קאש המטא-דאטה
+				self.metadata_cache.put(service_id, service_metadata(service_info), generation)
+				return service_info
+			return None
+		except requests.RequestException:
+			return None
+
+	def get_service_metadata(self, service_id: str) -> Optional[Dict[str, Any]]:
+		"""מטא-דאטה של שירות (שם, תוכנית, דיסקים) מהקאש, או מ-Render אם אין/פג תוקף.
+
+		לא כולל סטטוס - למצב עדכני יש להשתמש ב-get_service_info/get_service_status.
+		"""
+		cached = self.metadata_cache.get(service_id)
+		if cached is not None:
+			return cached
+		service_info = self.get_service_info(service_id)
+		return service_metadata(service_info) if service_info else None
+
+	@coalesced
+	def _get_latest_deploy_status(self, service_id: str) -> Optional[str]:
+		"""מחזיר את סטטוס הדיפלוי האחרון עבור שירות אם זמין"""
+		url = f"{self.base_url}/services/{service_id}/deploys?limit=1"
+		try:
+			status_code, deploy_status = self._cached_get(url, "deploy_status", parse_latest_deploy_status)
+			return deploy_status if status_code == 200 else None
+		except requests.RequestException:
+			return None
+
+	@coalesced
+	def get_latest_deploy_info(self, service_id: str) -> Optional[Dict[str, Any]]:
+		"""מחזיר מידע מפורט על הדיפלוי האחרון של שירות
+
+		מחזיר מילון עם שדות עיקריים: id, status/state, createdAt, updatedAt/finishedAt, commitMessage/commitId
+		"""
+		url = f"{self.base_url}/services/{service_id}/deploys?limit=1"
+		try:
+			status_code, deploy_info = self._cached_get(url, "deploy_info", parse_latest_deploy_info)
+			return deploy_info if status_code == 200 else None
+		except requests.RequestException:
+			return None
+
+	@coalesced
+	def get_service_status(self, service_id: str) -> Optional[str]:
+		"""קבלת סטטוס שירות עדכני
+		עדיפות למידע שירות חי (online/offline/suspended).
+		משתמש בסטטוס דיפלוי רק כדי לציין מצב 'deploying',
+		כדי להימנע מסיווג שגוי כ-offline כשדיפלוי נכשל אך הגרסה הקודמת עדיין פועלת.
+		"""
+		# קודם כל ננסה להביא מידע שירות חי
+		return self.resolve_service_status(service_id, self.get_service_info(service_id))
+
+	def resolve_service_status(self, service_id: str, service_info: Optional[Dict[str, Any]]) -> Optional[str]:
+		"""סטטוס מתוך אובייקט שירות שכבר בידינו (למשל מ-list_services); שאילתת דיפלוי רק אם אין סטטוס מפורש"""
+		status = status_from_service_info(service_info)
+		if status:
+			return status
+
+		# אם לא קיבלנו סטטוס ברור, נבדוק סטטוס דיפלוי
+		return status_from_deploy_status(self._get_latest_deploy_status(service_id))
+
+	def _iter_pages(
+		self, url: str, parse: Callable[[Any], List[Dict[str, Any]]], state: Optional[Dict[str, bool]] = None
+	) -> Iterator[Dict[str, Any]]:
+		"""מעבר על רשימת Render לפי cursor, עד העמוד האחרון או RENDER_LIST_MAX_PAGES.
+
+		state["complete"] מסומן True רק אם הגענו לעמוד האחרון; שגיאה באמצע או חריגה ממספר
+		העמודים עוצרות את המעבר עם מה שכבר הוחזר (רשימה חלקית).
+		"""
+		import logging
+
+		cursor: Optional[str] = None
+		seen_cursors = set()
+		for _ in range(config.RENDER_LIST_MAX_PAGES):
+			try:
+				status_code, page = self._cached_get(
+					url, "page", lambda payload: (parse(payload), next_page_cursor(payload)), params=list_page_params(cursor)
+				)
+				if status_code != 200 or page is None:
+					if cursor:
+						logging.warning(f"Stopped paging {url} at cursor {cursor}: code {status_code}")
+					return
+			except (requests.RequestException, ValueError) as e:
+				logging.error(f"Error fetching page of {url}: {e}")
+				return
+			items, cursor = page
+			yield from items
+			if cursor is None or cursor in seen_cursors:
+				if state is not None:
+					state["complete"] = True
+				return
+			seen_cursors.add(cursor)
+		logging.warning(f"Stopped paging {url} after {config.RENDER_LIST_MAX_PAGES} pages (RENDER_LIST_MAX_PAGES)")
+
+	def _list_all(self, url: str, parse: Callable[[Any], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+		"""כל העמודים כרשימה; רשימה חלקית לא מוחזרת - במקרה כזה מוחזרת רשימה ריקה, כמו בכישלון"""
+		import logging
+
+		state: Dict[str, bool] = {}
+		items = list(self._iter_pages(url, parse, state))
+		if not state.get("complete"):
+			if items:
+				logging.warning(f"Discarding incomplete listing of {url} ({len(items)} items fetched)")
+			return []
+		return items
+
+	def iter_services(self) -> Iterator[Dict[str, Any]]:
+		"""כל השירותים בחשבון, עמוד אחרי עמוד (generator; בשגיאה באמצע נעצר עם רשימה חלקית)"""
+		return self._iter_pages(f"{self.base_url}/services", parse_services_payload)
+
+	@coalesced
+	def list_services(self) -> List[Dict[str, Any]]:
+		"""רשימת כל השירותים (כל העמודים); רשימה ריקה אם לא ניתן היה להביא את כולם"""
+		return self._list_all(f"{self.base_url}/services", parse_services_payload)
+
+	def get_suspended_services(self) -> list:
+		"""רשימת שירותים מושעים"""
+		services = self.list_services()
+		return [service for service in services if service.get("status") == "suspended" or service.get("suspended") is True]
+
+	# ===== מידע על דיסקים ותוכניות תמחור =====
+
+	def iter_disks(self) -> Iterator[Dict[str, Any]]:
+		"""כל הדיסקים בחשבון, עמוד אחרי עמוד (generator; בשגיאה באמצע נעצר עם רשימה חלקית)"""
+		return self._iter_pages(f"{self.base_url}/disks", parse_disks_payload)
+
+	@coalesced
+	def list_disks(self) -> List[Dict[str, Any]]:
+		"""מחזיר רשימת דיסקים (Persistent Disks) אם נתמכים ב-API
+
+		החזרה: רשימה של אובייקטים עם שדות כגון: id, serviceId, sizeGB, mountPath.
+		במקרה של תקלה (גם בעמוד שאינו הראשון) או אם ה-API אינו זמין - מוחזרת רשימה ריקה.
+		"""
+		return self._list_all(f"{self.base_url}/disks", parse_disks_payload)
+
 	# ===== משתני סביבה =====
 
+	@coalesced
 	def get_env_vars(self, service_id: str) -> List[Dict[str, Any]]:
 		"""קבלת רשימת משתני הסביבה של שירות
-		
+
 		Returns:
 			רשימת אובייקטי env var, כל אחד עם: key, value (אם לא סודי)
 		"""
 		url = f"{self.base_url}/services/{service_id}/env-vars"
-		
+
 		try:
-			response = requests.get(url, headers=self.headers, timeout=15)
+			response = self._request("GET", url, timeout=15)
 			if response.status_code == 200:
-				data = response.json()
-				# טיפול במבני JSON שונים
-				if isinstance(data, list):
-					return cast(List[Dict[str, Any]], data)
-				elif isinstance(data, dict):
-					# חיפוש במפתחות מוכרים
-					for key in ("envVars", "env_vars", "data", "items", "result"):
-						val = data.get(key)
-						if isinstance(val, list):
-							return cast(List[Dict[str, Any]], val)
+				return parse_env_vars_payload(response.json())
 			return []
 		except requests.RequestException as e:
 			import logging
@@ -388,302 +1299,225 @@ class RenderAPI:
 
 	def update_env_var(self, service_id: str, key: str, value: str) -> Dict[str, Any]:
 		"""עדכון או הוספת משתנה סביבה בודד לשירות
-		
+
 		Args:
 			service_id: מזהה השירות
 			key: שם המשתנה
 			value: ערך המשתנה
-		
+
 		Returns:
 			מילון עם success, status_code, message
 		"""
 		url = f"{self.base_url}/services/{service_id}/env-vars/{key}"
-		
+
 		payload = {"value": value}
-		
+
 		try:
 			# נסה PATCH תחילה (עדכון)
-			response = requests.patch(url, headers=self.headers, json=payload, timeout=15)
-			
-			if response.status_code in [200, 201]:
-				return {
-					"success": True,
-					"status_code": response.status_code,
-					"message": f"Environment variable '{key}' updated successfully"
-				}
-			elif response.status_code == 404:
+			response = self._request("PATCH", url, json=payload, timeout=15)
+
+			if response.status_code == 404:
 				# המשתנה לא קיים, ננסה ליצור
 				create_url = f"{self.base_url}/services/{service_id}/env-vars"
 				create_payload = {"key": key, "value": value}
-				create_response = requests.post(create_url, headers=self.headers, json=create_payload, timeout=15)
-				
-				if create_response.status_code in [200, 201]:
-					return {
-						"success": True,
-						"status_code": create_response.status_code,
-						"message": f"Environment variable '{key}' created successfully"
-					}
-				else:
-					return {
-						"success": False,
-						"status_code": create_response.status_code,
-						"message": f"Failed to create env var: {create_response.text}"
-					}
-			else:
-				return {
-					"success": False,
-					"status_code": response.status_code,
-					"message": f"Failed to update: {response.text}"
-				}
+				create_response = self._request("POST", create_url, json=create_payload, timeout=15)
+				return mutation_result(
+					create_response.status_code,
+					(200, 201),
+					f"Environment variable '{key}' created successfully",
+					"Failed to create env var: ",
+					create_response.text,
+				)
+			return mutation_result(
+				response.status_code,
+				(200, 201),
+				f"Environment variable '{key}' updated successfully",
+				"Failed to update: ",
+				response.text,
+			)
 		except requests.RequestException as e:
 			return {
 				"success": False,
 				"status_code": 0,
 				"message": f"Request failed: {str(e)}"
 			}
+		finally:
+			self.metadata_cache.invalidate(service_id)
 
 	def delete_env_var(self, service_id: str, key: str) -> Dict[str, Any]:
 		"""מחיקת משתנה סביבה משירות
-		
+
 		Args:
 			service_id: מזהה השירות
 			key: שם המשתנה למחיקה
-		
+
 		Returns:
 			מילון עם success, status_code, message
 		"""
 		url = f"{self.base_url}/services/{service_id}/env-vars/{key}"
-		
+
 		try:
-			response = requests.delete(url, headers=self.headers, timeout=15)
-			
-			if response.status_code in [200, 204]:
-				return {
-					"success": True,
-					"status_code": response.status_code,
-					"message": f"Environment variable '{key}' deleted successfully"
-				}
-			else:
-				return {
-					"success": False,
-					"status_code": response.status_code,
-					"message": f"Failed to delete: {response.text}"
-				}
+			response = self._request("DELETE", url, timeout=15)
+			return mutation_result(
+				response.status_code,
+				(200, 204),
+				f"Environment variable '{key}' deleted successfully",
+				"Failed to delete: ",
+				response.text,
+			)
 		except requests.RequestException as e:
 			return {
 				"success": False,
 				"status_code": 0,
 				"message": f"Request failed: {str(e)}"
 			}
+		finally:
+			self.metadata_cache.invalidate(service_id)
 
 	# ===== לוגים =====
 
-	def get_service_logs(self, service_id: str, tail: int = 100, start_time: Optional[str] = None,
-	                    end_time: Optional[str] = None) -> List[Dict[str, Any]]:
+	def get_service_logs(
+		self,
+		service_id: str,
+		tail: int = 100,
+		start_time: Optional[str] = None,
+		end_time: Optional[str] = None,
+		direction: Optional[str] = None,
+		legacy_fallback: bool = True,
+	) -> List[Dict[str, Any]]:
 		"""קבלת לוגים של שירות
-		
+
 		Args:
 			service_id: מזהה השירות
 			tail: מספר שורות לוג להחזיר (ברירת מחדל: 100, מקסימום: 100 לפי מגבלות Render API)
 			start_time: זמן התחלה (ISO 8601 format)
 			end_time: זמן סיום (ISO 8601 format)
-		
+			direction: "forward" לקבלת הרשומות הישנות ביותר מ-start_time והלאה
+			legacy_fallback: האם לנסות גם את הפרמטרים הישנים כשאין תוצאות
+
 		Returns:
 			רשימת entries של לוגים, כל אחד עם: id, timestamp, text, stream
 		"""
 		url = f"{self.base_url}/services/{service_id}/logs"
-		
-		# Render API uses 'limit', 'start', 'end'
-		# Render API allows max 100 lines per request
-		params = {}
-		if tail is not None:
-			params["limit"] = min(max(tail, 0), 100) 
-		if start_time:
-			params["start"] = start_time
-		if end_time:
-			params["end"] = end_time
-
-		def _parse_logs_payload(payload: Any) -> List[Dict[str, Any]]:
-			def _looks_like_entry(node: Any) -> bool:
-				if not isinstance(node, dict):
-					return False
-				text_candidate = None
-				for key in ("text", "message", "log", "body", "line"):
-					if node.get(key) is not None:
-						text_candidate = node.get(key)
-						break
-				if text_candidate is None:
-					return False
-				for marker in ("timestamp", "time", "ts", "id", "logId", "stream", "type", "level", "severity"):
-					if marker in node:
-						return True
-				return False
-
-			def _collect_entries(node: Any) -> List[Dict[str, Any]]:
-				if isinstance(node, list):
-					collected: List[Dict[str, Any]] = []
-					for item in node:
-						collected.extend(_collect_entries(item))
-					return collected
-				if isinstance(node, dict):
-					if _looks_like_entry(node):
-						return [node]
-					collected: List[Dict[str, Any]] = []
-					for value in node.values():
-						collected.extend(_collect_entries(value))
-					return collected
-				return []
 
-			if isinstance(payload, list):
-				return _collect_entries(payload)
-			if isinstance(payload, dict):
-				for key in ("logs", "entries", "data", "items", "result", "records", "logEntries", "log_entries"):
-					val = payload.get(key)
-					if isinstance(val, list):
-						extracted = _collect_entries(val)
-						if extracted:
-							return extracted
-				for key in ("logGroups", "log_groups", "groups"):
-					groups = payload.get(key)
-					if isinstance(groups, list):
-						collected: List[Dict[str, Any]] = []
-						for group in groups:
-							collected.extend(_collect_entries(group))
-						if collected:
-							return collected
-				inner = payload.get("log") or payload.get("response")
-				if isinstance(inner, dict):
-					result = _collect_entries(inner)
-					if result:
-						return result
-			return _collect_entries(payload)
-
-		def _normalize_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-			normalized: List[Dict[str, Any]] = []
-			for entry in entries:
-				if not isinstance(entry, dict):
-					continue
-				text = entry.get("text") or entry.get("message") or entry.get("log") or entry.get("body")
-				if text is None:
-					continue
-				if not isinstance(text, str):
-					text = str(text)
-				stream = entry.get("stream") or entry.get("type") or entry.get("channel")
-				if isinstance(stream, str):
-					lower = stream.lower()
-					if "err" in lower:
-						stream = "stderr"
-					elif "out" in lower:
-						stream = "stdout"
-				if not stream:
-					level = entry.get("level") or entry.get("severity")
-					if isinstance(level, str) and "err" in level.lower():
-						stream = "stderr"
-				if not stream:
-					stream = "stdout"
-				timestamp = entry.get("timestamp") or entry.get("time") or entry.get("ts")
-				if timestamp is not None and not isinstance(timestamp, str):
-					timestamp = str(timestamp)
-				log_id = entry.get("id") or entry.get("logId") or entry.get("_id") or entry.get("uuid")
-				normalized.append(
-					{
-						"id": log_id,
-						"timestamp": timestamp,
-						"text": text,
-						"stream": stream,
-						"raw": entry,
-					}
-				)
-			return normalized
+		# Render API uses 'limit', 'start', 'end'
+		params = build_logs_params(tail, start_time, end_time, direction)
 
 		import logging
 		try:
 			# First attempt with standard parameters
-			resp = requests.get(url, headers=self.headers, params=params, timeout=30)
+			resp = self._request("GET", url, params=params, timeout=30)
 			if resp.status_code == 200:
-				logs = _normalize_entries(_parse_logs_payload(resp.json()))
-				if logs:
+				logs = normalize_log_entries(parse_logs_payload(resp.json()))
+				if logs or not legacy_fallback:
 					return logs
-			
+			elif not legacy_fallback:
+				logging.warning(f"Failed to fetch logs for {service_id}. code: {resp.status_code}")
+				return []
+
 			# Fallback to legacy parameters if first attempt failed or returned no logs
-			legacy_params = {}
-			if tail is not None:
-				legacy_params["tail"] = min(max(tail, 0), 100)  # Max 100 per Render API
-			if start_time:
-				legacy_params["startTime"] = start_time
-			if end_time:
-				legacy_params["endTime"] = end_time
-				
-			resp2 = requests.get(url, headers=self.headers, params=legacy_params, timeout=30)
+			legacy_params = build_legacy_logs_params(tail, start_time, end_time)
+			resp2 = self._request("GET", url, params=legacy_params, timeout=30)
 			if resp2.status_code == 200:
-				return _normalize_entries(_parse_logs_payload(resp2.json()))
-				
+				return normalize_log_entries(parse_logs_payload(resp2.json()))
+
 			logging.warning(
-				f"Failed to fetch logs for {service_id}. codes: {resp.status_code}, {resp2.status_code if 'resp2' in locals() else 'N/A'}"
+				f"Failed to fetch logs for {service_id}. codes: {resp.status_code}, {resp2.status_code}"
 			)
 			return []
 		except requests.RequestException as e:
 			logging.error(f"Error fetching logs for service {service_id}: {e}")
 			return []
 
+	def iter_service_logs(
+		self,
+		service_id: str,
+		start_time: Optional[str] = None,
+		end_time: Optional[str] = None,
+		direction: str = "backward",
+		max_pages: Optional[int] = None,
+		request_budget: Optional[RequestBudget] = None,
+	) -> Iterator[Dict[str, Any]]:
+		"""מעבר על לוגים של שירות בעמודים (generator) - זיכרון חסום לכל טווח.
+
+		Args:
+			service_id: מזהה השירות
+			start_time / end_time: גבולות הטווח (ISO 8601)
+			direction: "backward" מהחדש לישן, "forward" מהישן לחדש
+			max_pages: מספר עמודים מקסימלי (ברירת מחדל: LOG_PAGINATION_MAX_PAGES)
+			request_budget: תקציב בקשות משותף, אם יש
+
+		Yields:
+			רשומות לוג מנורמלות, לפי סדר הכיוון המבוקש
+		"""
+		import logging
+
+		url = f"{self.base_url}/services/{service_id}/logs"
+		pager = LogPager(start_time, end_time, direction, max_pages=max_pages, request_budget=request_budget)
+		while True:
+			params = pager.next_params()
+			if params is None:
+				return
+			try:
+				resp = self._request("GET", url, params=params, timeout=30)
+				if resp.status_code != 200:
+					logging.warning(f"Failed to fetch logs page for {service_id}. code: {resp.status_code}")
+					return
+				payload = resp.json()
+			except (requests.RequestException, ValueError) as e:
+				logging.error(f"Error fetching logs page for service {service_id}: {e}")
+				return
+			yield from pager.consume(payload, normalize_log_entries(parse_logs_payload(payload)))
+
+	def get_latest_logs(self, service_id: str, lines: int = 100) -> List[Dict[str, Any]]:
+		"""N השורות האחרונות (גם מעל 100) בסדר כרונולוגי; נפילה לבקשה בודדת אם העימוד לא החזיר דבר"""
+		logs = list(islice(self.iter_service_logs(service_id, direction="backward"), lines))
+		if not logs:
+			return self.get_service_logs(service_id, tail=lines)
+		logs.reverse()
+		return logs
+
 	def get_recent_logs(self, service_id: str, minutes: int = 5) -> List[Dict[str, Any]]:
 		"""קבלת לוגים מהדקות האחרונות (מתוקן עם טיפול ב-Timezone)
-		
+
 		Args:
 			service_id: מזהה השירות
 			minutes: כמה דקות אחורה לחפש
-		
+
 		Returns:
 			רשימת לוגים
 		"""
-		from datetime import datetime, timezone, timedelta
 		import logging
-		
+
 		try:
-			# Use explicit start time with clean ISO format (no microseconds)
-			start_dt = datetime.now(timezone.utc) - timedelta(minutes=minutes)
-			start_str = start_dt.replace(microsecond=0).isoformat().replace("+00:00", "Z")
-			
-			# Request max 100 logs (Render API limit)
-			logs = self.get_service_logs(service_id, tail=100, start_time=start_str)
-			
+			start_str, _, _ = recent_logs_window(minutes)
+
+			# כל החלון בעמודים מהחדש לישן (לא רק 100 רשומות), ואז בסדר כרונולוגי
+			logs = list(self.iter_service_logs(service_id, start_time=start_str, direction="backward"))
+			logs.reverse()
+
 			if not logs:
 				# Fallback: try without start_time filter
 				logs = self.get_service_logs(service_id, tail=100)
-			
+
 			if not logs:
 				return []
 
 			# Filter again to ensure time range
-			end_time = datetime.now(timezone.utc)
-			start_time = end_time - timedelta(minutes=minutes)
-			filtered: List[Dict[str, Any]] = []
-			for entry in logs:
-				ts_raw = entry.get("timestamp")
-				if not ts_raw:
-					continue
-				try:
-					iso = str(ts_raw).replace("Z", "+00:00")
-					ts = datetime.fromisoformat(iso)
-					
-					# === CRITICAL FIX: Ensure timezone-aware datetime ===
-					# If the parsed timestamp is naive (no timezone), assume UTC
-					if ts.tzinfo is None:
-						ts = ts.replace(tzinfo=timezone.utc)
-					
-					if start_time <= ts <= end_time:
-						filtered.append(entry)
-				except Exception:
-					# On parse error, keep the log entry to avoid data loss
-					filtered.append(entry)
-					continue
-			records = filtered if filtered else logs
-			return records
+			_, start_time, end_time = recent_logs_window(minutes)
+			return filter_logs_by_window(logs, start_time, end_time)
 		except Exception as e:
 			# Log the actual error instead of silently returning empty list
-			import logging
 			logging.error(f"DEBUG: Critical error in get_recent_logs for {service_id}: {e}")
 			return []
 
+
 # יצירת instance גלובלי
-render_api = RenderAPI()
\ No newline at end of file
+service_metadata_cache = MetadataCache(config.SERVICE_METADATA_CACHE_SIZE, config.SERVICE_METADATA_CACHE_TTL_SECONDS)
+render_rate_limiter = RateLimiter(
+	config.RENDER_RATE_LIMIT_PER_MINUTE,
+	config.RENDER_RATE_LIMIT_BURST,
+	config.RENDER_RATE_LIMIT_INTERACTIVE_RESERVE,
+	config.RENDER_RATE_LIMIT_MAX_PAUSE_SECONDS,
+)
+render_api = RenderAPI()
@@ -1,37 +1,69 @@
+import heapq
 import logging
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 
 import config
 from database import db
 from notifications import send_deploy_event_notification, send_status_change_notification
-from render_api import render_api
+from render_api import VOLATILE_SERVICE_FIELDS, mark_background_requests, render_api
 
 logger = logging.getLogger(__name__)
 
 TRANSIENT_DB_ERRORS = (ConnectionFailure, ServerSelectionTimeoutError)
 
+# תחום ספירת פניות ל-MongoDB ול-Render של סבב הניטור
+MONGO_SCOPE = "status_monitor"
+RENDER_SCOPE = "status_monitor"
+
 
 class StatusMonitor:
 	"""מנטר את הסטטוס של הבוטים ושולח התראות על שינויים"""
 
-	def __init__(self):
-		self.monitoring_enabled = {}
-		self.last_known_status = {}
-		self.manual_action_cache = set()
+	def __init__(self) -> None:
+		self.monitoring_enabled: Dict[str, bool] = {}
+		self.last_known_status: Dict[str, str] = {}
+		self.manual_action_cache: Set[str] = set()
 		self.cache_duration = 300
 		self.check_interval = config.STATUS_CHECK_INTERVAL_SECONDS
-		self.monitoring_thread = None
+		self.monitoring_thread: Optional[threading.Thread] = None
 		self.stop_monitoring = threading.Event()
 		# New: faster polling while a deployment is active
 		self.deploy_check_interval = getattr(config, "DEPLOY_CHECK_INTERVAL_SECONDS", 30)
 		self.deploying_active = False
 		# זיהוי דיפלויים שהסתיימו גם אם החמצנו את מצב "deploying"
-		self.last_checked_deploy_ids = {}
+		self.last_checked_deploy_ids: Dict[str, str] = {}
+		# בדיקות השירותים רצות במקביל במאגר threads חסום; לכל שירות לכל היותר בדיקה אחת בריצה
+		self.max_workers = max(1, config.STATUS_CHECK_MAX_WORKERS)
+		self.cycle_timeout = config.STATUS_CHECK_CYCLE_TIMEOUT_SECONDS
+		self._executor = ThreadPoolExecutor(
+			max_workers=self.max_workers, thread_name_prefix="status-check", initializer=mark_background_requests
+		)
+		self._in_flight: Set[str] = set()
+		self._in_flight_lock = threading.Lock()
+		self.last_cycle_stats: Dict[str, Any] = {}
+		# מתזמן לכל שירות: heap של (זמן יעד, service_id) עם מחיקה עצלה לפי _next_due
+		self.max_check_interval = max(self.deploy_check_interval, config.STATUS_CHECK_MAX_INTERVAL_SECONDS)
+		self.suspended_check_interval = config.SUSPENDED_CHECK_INTERVAL_SECONDS
+		self._schedule: List[Tuple[float, str]] = []
+		self._next_due: Dict[str, float] = {}
+		self._poll_interval: Dict[str, float] = {}
+		self._last_polled_status: Dict[str, str] = {}
+		self._schedule_lock = threading.Lock()
+		# עדכוני הסטטוס של הסבב נאספים ונשלחים ב-bulk_write אחד בסופו
+		self._write_batch = db.write_batch()
+		# תמונת מצב של הצי: טביעת השדות המשתנים של כל שירות מה-list_services הקודם,
+		# הסטטוס שנגזר ממנה, והאם נראה דיפלוי פעיל - כדי לדלג על שאילתות לשירות שלא השתנה
+		self.fleet_snapshot_enabled = config.STATUS_FLEET_SNAPSHOT_ENABLED
+		self.fleet_full_check_interval = config.STATUS_FLEET_FULL_CHECK_SECONDS
+		self._fleet_state: Dict[str, dict] = {}
+		self._fleet_lock = threading.Lock()
+		self._fleet_skipped = 0
 
 	def start_monitoring(self):
 		"""הפעלת ניטור הסטטוס ברקע"""
@@ -53,6 +85,7 @@ class StatusMonitor:
 
 	def _monitor_loop(self):
 		"""לולאת הניטור הראשית"""
+		mark_background_requests()
 		consecutive_db_failures = 0
 		max_backoff = 300  # 5 minutes max backoff
 
@@ -72,36 +105,108 @@ class StatusMonitor:
 			except Exception as e:
 				logger.error(f"Error in monitoring loop: {e}")
 
-			# המתנה עם אפשרות לעצירה מיידית
-			sleep_seconds = self.deploy_check_interval if self.deploying_active else self.check_interval
-			self.stop_monitoring.wait(sleep_seconds)
+			# המתנה עד השירות הבא בתור (לכל היותר מרווח הדיפלוי, כדי לקלוט שירותים חדשים מה-DB)
+			self.stop_monitoring.wait(self._seconds_until_next_due())
+
+	def _seconds_until_next_due(self) -> float:
+		"""כמה שניות עד שהשירות הבא בתור צריך להיבדק"""
+		with self._schedule_lock:
+			while self._schedule and self._next_due.get(self._schedule[0][1]) != self._schedule[0][0]:
+				heapq.heappop(self._schedule)
+			if not self._schedule:
+				return self.deploy_check_interval
+			wait_seconds = self._schedule[0][0] - time.monotonic()
+		return min(max(wait_seconds, 1.0), self.deploy_check_interval)
+
+	def _schedule_service(self, service_id: str, delay: float):
+		"""קביעת זמן הבדיקה הבא של שירות (רשומה קודמת ב-heap מתבטלת)"""
+		due = time.monotonic() + delay
+		with self._schedule_lock:
+			self._next_due[service_id] = due
+			heapq.heappush(self._schedule, (due, service_id))
+
+	def _unschedule_service(self, service_id: str):
+		with self._schedule_lock:
+			self._next_due.pop(service_id, None)
+			self._poll_interval.pop(service_id, None)
+			self._last_polled_status.pop(service_id, None)
+		with self._fleet_lock:
+			self._fleet_state.pop(service_id, None)
+
+	def _pop_due_services(self, known_ids: set) -> set:
+		"""שליפת כל השירותים שזמנם הגיע מה-heap"""
+		now = time.monotonic()
+		due_ids = set()
+		with self._schedule_lock:
+			while self._schedule and self._schedule[0][0] <= now:
+				due, service_id = heapq.heappop(self._schedule)
+				if self._next_due.get(service_id) != due or service_id not in known_ids:
+					continue
+				del self._next_due[service_id]
+				due_ids.add(service_id)
+		return due_ids
+
+	def _reschedule_after_check(self, service_id: str, raw_status: Optional[str], deploy_in_progress: bool):
+		"""חישוב המרווח הבא: פריסה - מהיר, מושעה - נדיר, יציב - הכפלה עד התקרה"""
+		simplified = self._simplify_status(raw_status) if raw_status else "unknown"
+		with self._schedule_lock:
+			previous = self._last_polled_status.get(service_id)
+			self._last_polled_status[service_id] = simplified
+			if deploy_in_progress or simplified == "deploying":
+				interval = self.deploy_check_interval
+			elif isinstance(raw_status, str) and raw_status.lower() == "suspended":
+				interval = self.suspended_check_interval
+			elif previous == simplified:
+				current = self._poll_interval.get(service_id, self.deploy_check_interval)
+				interval = min(current * 2, self.max_check_interval)
+			else:
+				# שינוי מצב (או בדיקה ראשונה) - נמשיך מהר עד שהמצב מתייצב
+				interval = self.deploy_check_interval
+			self._poll_interval[service_id] = interval
+		self._schedule_service(service_id, interval)
+
+	def request_fast_poll(self, service_id: str):
+		"""החזרת שירות לקצב בדיקה מהיר (למשל לאחר suspend/resume ידני)"""
+		with self._schedule_lock:
+			self._poll_interval[service_id] = self.deploy_check_interval
+			self._last_polled_status.pop(service_id, None)
+		self._schedule_service(service_id, self.deploy_check_interval)
+
+	def get_schedule_summary(self) -> dict:
+		"""תמונת מצב של המתזמן: כמה שירותים בכל קצב ומתי הבדיקה הבאה"""
+		with self._schedule_lock:
+			intervals = dict(self._poll_interval)
+			next_due = min(self._next_due.values()) if self._next_due else None
+		return {
+			"scheduled": len(intervals),
+			"fast": sum(1 for v in intervals.values() if v <= self.deploy_check_interval),
+			"suspended": sum(1 for v in intervals.values() if v >= self.suspended_check_interval),
+			"next_check_in": max(next_due - time.monotonic(), 0.0) if next_due is not None else None,
+		}
 
 	def check_all_services(self):
-		"""בדיקת הסטטוס של כל השירותים המנוטרים"""
+		"""בדיקת הסטטוס של השירותים המנוטרים שזמן הבדיקה שלהם הגיע"""
+		# איפוס מוני הפניות ל-Mongo ול-Render לתחילת הסבב
+		db.round_trips.pop(MONGO_SCOPE)
+		render_api.request_counter.pop(RENDER_SCOPE)
+		with db.round_trips.scope(MONGO_SCOPE), render_api.request_counter.scope(RENDER_SCOPE):
+			self._check_due_services()
+
+	def _check_due_services(self):
 		logger.info("Checking status of services (status + deploy alerts)")
 
-		# קבלת רשימת השירותים לניטור מהדאטאבייס
-		monitored_services = db.get_status_monitored_services()
-		# בנוסף: שירותים עם התראות דיפלוי מופעלות גם אם ניטור סטטוס כבוי
-		try:
-			deploy_notif_services = db.get_services_with_deploy_notifications_enabled()
-		except Exception:
-			deploy_notif_services = []
+		# עדכונים שהצטברו מבדיקות שחרגו מהסבב הקודם נשלחים לפני קריאת תמונת המצב
+		self._write_batch.flush()
+		# תמונת מצב של כל השירותים הרלוונטיים בשאילתה אחת; כל הדגלים נקראים ממנה
+		services_to_check = db.get_monitor_snapshot()
 
 		logger.info(
-			"Fetched services: status_monitored=%d, deploy_notif_enabled=%d",
-			len(monitored_services),
-			len(deploy_notif_services),
+			"Fetched services snapshot: total=%d, status_monitored=%d, deploy_notif_enabled=%d",
+			len(services_to_check),
+			sum(1 for doc in services_to_check if doc.get("status_monitoring", {}).get("enabled")),
+			sum(1 for doc in services_to_check if doc.get("deploy_notifications_enabled")),
 		)
 
-		# מיזוג ייחודי לפי service_id
-		all_relevant_services = {}
-		for s in monitored_services:
-			all_relevant_services[s["_id"]] = s
-		for s in deploy_notif_services:
-			all_relevant_services.setdefault(s["_id"], s)
-		services_to_check = list(all_relevant_services.values())
-
 		# Fallback: אם אין כלום ב-DB – נשתמש ברשימת config כדי לפחות לבדוק אירועי דיפלוי
 		if not services_to_check and getattr(config, "SERVICES_TO_MONITOR", []):
 			logger.warning(
@@ -109,55 +214,227 @@ class StatusMonitor:
 			)
 			services_to_check = [{"_id": sid, "service_name": sid} for sid in config.SERVICES_TO_MONITOR]
 
-		any_deploying = False
+		# סנכרון המתזמן מול רשימת השירותים: שירות חדש נבדק מיד, שירות שהוסר יוצא מהתור
+		known_ids = {doc["_id"] for doc in services_to_check}
+		with self._schedule_lock:
+			removed_ids = set(self._poll_interval) - known_ids
+		for service_id in removed_ids:
+			self._unschedule_service(service_id)
+		with self._schedule_lock:
+			new_ids = [sid for sid in known_ids if sid not in self._poll_interval]
+			for sid in new_ids:
+				self._poll_interval[sid] = self.deploy_check_interval
+		for sid in new_ids:
+			self._schedule_service(sid, 0)
+		due_ids = self._pop_due_services(known_ids)
+
+		cycle_started = time.monotonic()
+		fleet = self._fetch_fleet_snapshot() if due_ids else None
+		with self._fleet_lock:
+			self._fleet_skipped = 0
+		futures = []
+		skipped_in_flight = 0
 		for service_doc in services_to_check:
 			service_id = service_doc["_id"]
+			if service_id not in due_ids:
+				continue
 
 			# דילוג על שירותים שלא מופעל עבורם ניטור
 			# אם ניטור סטטוס כבוי, עדיין נבדוק רק אירועי דיפלוי אם התראות דיפלוי מופעלות
 			status_monitoring_enabled = service_doc.get("status_monitoring", {}).get("enabled", False)
-			deploy_notif_enabled = db.get_deploy_notification_status(service_id)
+			deploy_notif_enabled = bool(service_doc.get("deploy_notifications_enabled", False))
 			if not status_monitoring_enabled and not deploy_notif_enabled:
+				self._schedule_service(service_id, self.max_check_interval)
 				continue
 
-			# בדיקה אם השירות עבר פעולה ידנית לאחרונה
-			manual_skip = self._is_manual_action_recent(service_id)
-			if manual_skip:
-				logger.debug(
-					(
-						f"Recent manual action for {service_id} - will skip "
-						f"status-change notifications but still check deploy events"
-					)
+			# שמירה על סדר מעברי מצב לכל שירות: לא מתחילים בדיקה חדשה לפני שהקודמת הסתיימה
+			with self._in_flight_lock:
+				if service_id in self._in_flight:
+					skipped_in_flight += 1
+					continue
+				self._in_flight.add(service_id)
+
+			futures.append(
+				self._executor.submit(
+					self._run_service_check,
+					service_id,
+					service_doc,
+					status_monitoring_enabled,
+					deploy_notif_enabled,
+					fleet.get(service_id) if fleet is not None else None,
 				)
+			)
 
-			try:
-				# קבלת הסטטוס הנוכחי מ-Render
-				current_status = render_api.get_service_status(service_id)
+		if not futures:
+			# גם סבב בלי בדיקות מעדכן את הדגל - אחרת הקצב המהיר נשאר אחרי שהדיפלוי הסתיים
+			self.deploying_active = self.get_schedule_summary()["fast"] > 0
+			return
 
-				if current_status:
-					# בדיקה האם יש שירות כלשהו במצב פריסה כדי להאיץ בדיקות
-					simplified_for_flag = self._simplify_status(current_status)
-					if simplified_for_flag == "deploying":
-						any_deploying = True
-
-					if status_monitoring_enabled and not manual_skip:
-						self._process_status_change(service_id, current_status, service_doc)
-					elif deploy_notif_enabled:
-						# גם אם ניטור סטטוס כבוי, נטפל במעבר deploy->(online/offline) לשם התראת דיפלוי
-						self._process_deploy_transition_for_notif(service_id, current_status, service_doc)
-				else:
-					logger.warning(f"Could not get status for service {service_id}")
+		done, not_done = wait(futures, timeout=self.cycle_timeout)
+		write_results = self._write_batch.flush()
+
+		cycle_seconds = time.monotonic() - cycle_started
+		# רק בקשות שנשלחו מה-thread של הסבב ומה-workers שלו (לא log monitor, handlers או מעקבי דיפלוי)
+		render_counts = render_api.request_counter.pop(RENDER_SCOPE)
+		self.last_cycle_stats = {
+			"services": len(futures),
+			"timed_out": len(not_done),
+			"skipped_in_flight": skipped_in_flight,
+			"duration_seconds": round(cycle_seconds, 2),
+			"max_workers": self.max_workers,
+			"batched_writes": len(write_results),
+			"failed_writes": sum(1 for r in write_results if not r["ok"]),
+			"mongo_round_trips": db.round_trips.pop(MONGO_SCOPE),
+			"fleet_snapshot": fleet is not None,
+			"snapshot_skipped": self._fleet_skipped,
+			"render_requests": int(render_counts.get("requests", 0)),
+			"render_bytes": int(render_counts.get("bytes_received", 0)),
+			"render_parse_ms": round(render_counts.get("parse_seconds", 0.0) * 1000, 1),
+			"render_not_modified": int(render_counts.get("not_modified", 0)),
+			"render_unchanged_bodies": int(render_counts.get("unchanged_bodies", 0)),
+			"finished_at": datetime.now(timezone.utc),
+		}
+		logger.info(
+			"Status cycle finished: services=%d, wall=%.2fs, timed_out=%d, skipped_in_flight=%d, mongo_round_trips=%d, "
+			"render_requests=%d, snapshot_skipped=%d, render_bytes=%d, render_parse_ms=%.1f",
+			len(futures),
+			cycle_seconds,
+			len(not_done),
+			skipped_in_flight,
+			self.last_cycle_stats["mongo_round_trips"],
+			self.last_cycle_stats["render_requests"],
+			self._fleet_skipped,
+			self.last_cycle_stats["render_bytes"],
+			self.last_cycle_stats["render_parse_ms"],
+		)
 
-				# בדיקת דיפלוי שהסתיים: אם התראות דיפלוי מופעלות
-				if deploy_notif_enabled:
-					self._check_deploy_events(service_id, service_doc)
+		# דגל תצוגה: האם יש שירות כלשהו בקצב המהיר
+		self.deploying_active = self.get_schedule_summary()["fast"] > 0
 
-			except Exception as e:
-				logger.error(f"Error checking status for {service_id}: {e}")
+	def _fetch_fleet_snapshot(self) -> Optional[Dict[str, Dict[str, Any]]]:
+		"""כל השירותים מקריאת list_services אחת, לפי id; None אם המצב כבוי או שהקריאה נכשלה"""
+		if not self.fleet_snapshot_enabled:
+			return None
+		try:
+			services = render_api.list_services()
+		except Exception as e:
+			logger.warning(f"Fleet snapshot failed, falling back to per-service checks: {e}")
+			return None
+		if not services:
+			return None
+		return {str(service["id"]): service for service in services if service.get("id")}
+
+	def _needs_full_check(self, service_id: str, snapshot: Dict[str, Any]) -> bool:
+		"""האם צריך שאילתות לשירות הזה, או שאפשר להסתמך על תמונת המצב"""
+		fingerprint = tuple(repr(snapshot.get(field)) for field in VOLATILE_SERVICE_FIELDS)
+		with self._fleet_lock:
+			state = self._fleet_state.get(service_id)
+			if (
+				state is None
+				or state["fingerprint"] != fingerprint
+				or state["deploy_in_progress"]
+				or self._simplify_status(state["status"] or "") == "deploying"
+				or time.monotonic() - state["checked_at"] >= self.fleet_full_check_interval
+			):
+				return True
+			self._fleet_skipped += 1
+			return False
+
+	def _record_fleet_check(
+		self, service_id: str, snapshot: Dict[str, Any], status: Optional[str], deploy_in_progress: bool
+	):
+		with self._fleet_lock:
+			self._fleet_state[service_id] = {
+				"fingerprint": tuple(repr(snapshot.get(field)) for field in VOLATILE_SERVICE_FIELDS),
+				"status": status,
+				"deploy_in_progress": deploy_in_progress,
+				"checked_at": time.monotonic(),
+			}
 
-		# עדכון דגל פריסה פעילה עבור קצב הבדיקה
-		# אם הופעלו התראות דיפלוי לשירותים כלשהם – נשתמש בקצב המהיר כדי לקטוף אירועי סיום מהר יותר
-		self.deploying_active = any_deploying or bool(deploy_notif_services)
+	def _run_service_check(
+		self,
+		service_id: str,
+		service_doc: dict,
+		status_monitoring_enabled: bool,
+		deploy_notif_enabled: bool,
+		snapshot: Optional[Dict[str, Any]] = None,
+	) -> Optional[str]:
+		"""עטיפה שמתזמנת את הבדיקה הבאה ומשחררת את השירות מרשימת הבדיקות הרצות גם במקרה של חריגה"""
+		raw_status, deploy_in_progress = None, False
+		try:
+			with db.round_trips.scope(MONGO_SCOPE), render_api.request_counter.scope(RENDER_SCOPE):
+				raw_status, deploy_in_progress = self._check_service(
+					service_id, service_doc, status_monitoring_enabled, deploy_notif_enabled, snapshot
+				)
+			return raw_status
+		finally:
+			self._reschedule_after_check(service_id, raw_status, deploy_in_progress)
+			with self._in_flight_lock:
+				self._in_flight.discard(service_id)
+
+	def _check_service(
+		self,
+		service_id: str,
+		service_doc: dict,
+		status_monitoring_enabled: bool,
+		deploy_notif_enabled: bool,
+		snapshot: Optional[Dict[str, Any]] = None,
+	) -> Tuple[Optional[str], bool]:
+		"""בדיקת שירות בודד (רץ ב-thread של המאגר).
+
+		snapshot - אובייקט השירות מה-list_services של הסבב, אם יש; כשהוא לא השתנה מאז הבדיקה
+		המלאה האחרונה, הסטטוס נלקח ממנה ולא נשלחות שאילתות לשירות.
+		מחזיר (הסטטוס הגולמי מ-Render, האם נראה דיפלוי שעדיין לא הסתיים).
+		"""
+		current_status = None
+		deploy_in_progress = False
+
+		# בדיקה אם השירות עבר פעולה ידנית לאחרונה
+		manual_skip = self._is_manual_action_recent(service_id)
+		if manual_skip:
+			logger.debug(
+				(
+					f"Recent manual action for {service_id} - will skip "
+					f"status-change notifications but still check deploy events"
+				)
+			)
+
+		try:
+			full_check = snapshot is None or self._needs_full_check(service_id, snapshot)
+			# קבלת הסטטוס הנוכחי מ-Render (או מתמונת המצב של הצי)
+			if snapshot is None:
+				current_status = render_api.get_service_status(service_id)
+			elif full_check:
+				current_status = render_api.resolve_service_status(service_id, snapshot)
+			else:
+				with self._fleet_lock:
+					current_status = self._fleet_state[service_id]["status"]
+
+			if current_status:
+				if status_monitoring_enabled and not manual_skip:
+					self._process_status_change(service_id, current_status, service_doc)
+				elif deploy_notif_enabled:
+					# גם אם ניטור סטטוס כבוי, נטפל במעבר deploy->(online/offline) לשם התראת דיפלוי
+					self._process_deploy_transition_for_notif(service_id, current_status, service_doc)
+			else:
+				logger.warning(f"Could not get status for service {service_id}")
+
+			# בדיקת דיפלוי שהסתיים: אם התראות דיפלוי מופעלות - בכל בדיקה, גם כשתמונת המצב לא השתנתה,
+			# כי דיפלוי חדש לא בהכרח משנה את אובייקט השירות ב-list_services
+			if deploy_notif_enabled:
+				deploy_in_progress = self._check_deploy_events(service_id, service_doc)
+			if snapshot is not None and full_check:
+				self._record_fleet_check(service_id, snapshot, current_status, deploy_in_progress)
+			elif snapshot is not None and deploy_in_progress:
+				# דיפלוי שהתחיל בלי שינוי בתמונת המצב - הבדיקות הבאות מלאות עד שיסתיים
+				with self._fleet_lock:
+					if service_id in self._fleet_state:
+						self._fleet_state[service_id]["deploy_in_progress"] = True
+
+		except Exception as e:
+			logger.error(f"Error checking status for {service_id}: {e}")
+
+		return current_status, deploy_in_progress
 
 	def _process_deploy_transition_for_notif(self, service_id: str, current_status: str, service_doc: dict):
 		"""שליחת התראת סיום דיפלוי גם כאשר ניטור סטטוס כבוי, אם דגל התראות דיפלוי מופעל.
@@ -170,36 +447,42 @@ class StatusMonitor:
 
 		new_simple = self._simplify_status(current_status)
 		if last_status is None:
-			db.update_service_status(service_id, new_simple)
+			db.update_service_status(service_id, new_simple, batch=self._write_batch)
 			return
 
 		old_simple = self._simplify_status(last_status)
 		if old_simple != new_simple and old_simple == "deploying" and new_simple in {"online", "offline"}:
-			self._send_status_notification(service_id, service_name, old_simple, new_simple)
+			self._send_status_notification(service_id, service_name, old_simple, new_simple, service_doc)
 
 		# עדכון הסטטוס במסד הנתונים כדי שנוכל לזהות מעברים בהמשך
-		db.update_service_status(service_id, new_simple)
+		db.update_service_status(service_id, new_simple, batch=self._write_batch)
 
-	def _check_deploy_events(self, service_id: str, service_doc: dict):
-		"""בודק אם יש דיפלוי חדש שהסתיים ושולח התראה פעם אחת"""
+	def _check_deploy_events(self, service_id: str, service_doc: dict) -> bool:
+		"""בודק אם יש דיפלוי חדש שהסתיים ושולח התראה פעם אחת.
+
+		מחזיר True אם הדיפלוי האחרון עדיין לא הגיע למצב סופי.
+		"""
 		try:
 			logger.info("Checking latest deploy for service %s", service_id)
 			info = render_api.get_latest_deploy_info(service_id)
 			if not info:
 				logger.info("No deploy info returned for %s", service_id)
-				return
+				return False
 			deploy_id = info.get("id")
 			raw_status = info.get("status") or ""
 			status = str(raw_status).lower()
 			if not deploy_id:
 				logger.info("Latest deploy has no id for %s: %s", service_id, info)
-				return
+				return False
 
-			# האם כבר דווח?
-			last_reported = db.get_last_reported_deploy_id(service_id)
+			# האם כבר דווח? (מתמונת המצב של הסבב אם נטענה)
+			if "last_reported_deploy_id" in service_doc:
+				last_reported = service_doc.get("last_reported_deploy_id")
+			else:
+				last_reported = db.get_last_reported_deploy_id(service_id)
 			if last_reported == deploy_id:
 				logger.info("Deploy %s for %s already reported; skipping", deploy_id, service_id)
-				return
+				return False
 
 			# נשלח התראה רק אם הסטטוס מסמן סוף (success/failure)
 			# תמיכה במגוון מצבים סופיים שה-API עשוי להחזיר, ובנוסף שימוש במיפוי הפשוט שלנו
@@ -247,10 +530,13 @@ class StatusMonitor:
 				)
 				service_name = service_doc.get("service_name", service_id)
 				commit_message = info.get("commitMessage")
-				sent = send_deploy_event_notification(service_name, service_id, status, commit_message)
+				sent = send_deploy_event_notification(
+					service_name, service_id, status, commit_message, service_doc=service_doc
+				)
 				if sent:
 					logger.info("Deploy notification sent for %s (deploy_id=%s)", service_id, deploy_id)
 					db.record_reported_deploy(service_id, deploy_id, status)
+					return False
 				else:
 					logger.warning(
 						"Deploy notification failed to send for %s (deploy_id=%s, status=%s); will retry next cycle",
@@ -258,6 +544,7 @@ class StatusMonitor:
 						deploy_id,
 						status,
 					)
+					return True
 			else:
 				logger.info(
 					"Non-terminal deploy status for %s: id=%s, status=%s (simplified=%s) — will check again",
@@ -266,8 +553,10 @@ class StatusMonitor:
 					status,
 					simplified,
 				)
+				return True
 		except Exception as e:
 			logger.error(f"Error while checking deploy events for {service_id}: {e}")
+			return False
 
 	def _process_status_change(self, service_id: str, current_status: str, service_doc: dict):
 		"""עיבוד שינוי סטטוס"""
@@ -279,7 +568,7 @@ class StatusMonitor:
 
 		# אם זו הפעם הראשונה שבודקים את השירות
 		if last_status is None:
-			db.update_service_status(service_id, simplified_status)
+			db.update_service_status(service_id, simplified_status, batch=self._write_batch)
 			logger.info(f"Initial status for {service_name}: {simplified_status}")
 			return
 
@@ -288,17 +577,21 @@ class StatusMonitor:
 		# בדיקה אם יש שינוי משמעותי בסטטוס
 		if simplified_status != last_simplified:
 			# בדיקה אם זה שינוי שמעניין את המשתמש
-			if self._is_significant_change(last_simplified, simplified_status, service_id):
+			deploy_notifications_enabled = bool(service_doc.get("deploy_notifications_enabled", False))
+			if self._is_significant_change(
+				last_simplified, simplified_status, service_id, deploy_notifications_enabled
+			):
 				# שליחת התראה
 				self._send_status_notification(
 					service_id,
 					service_name,
 					last_simplified,
 					simplified_status,
+					service_doc,
 				)
 
 			# עדכון הסטטוס במסד הנתונים
-			db.update_service_status(service_id, simplified_status)
+			db.update_service_status(service_id, simplified_status, batch=self._write_batch)
 
 	def _simplify_status(self, status: str) -> str:
 		"""המרת סטטוס Render לסטטוסים פשוטים: online/offline/deploying/unknown"""
@@ -360,8 +653,14 @@ class StatusMonitor:
 
 		return "unknown"
 
-	def _is_significant_change(self, old_status: str, new_status: str, service_id: Optional[str] = None) -> bool:
-		"""בדיקה אם השינוי משמעותי ודורש התראה"""
+	def _is_significant_change(
+		self,
+		old_status: str,
+		new_status: str,
+		service_id: Optional[str] = None,
+		deploy_notifications_enabled: Optional[bool] = None,
+	) -> bool:
+		"""בדיקה אם השינוי משמעותי ודורש התראה (הדגל נטען מה-DB רק אם לא הועבר)"""
 		# שינויים משמעותיים: online <-> offline
 		significant_changes = [
 			("online", "offline"),
@@ -369,37 +668,41 @@ class StatusMonitor:
 		]
 
 		# הוספת התראות על סיום דיפלוי אם מופעל עבור השירות הספציפי
-		if service_id:
+		if deploy_notifications_enabled is None and service_id:
 			deploy_notifications_enabled = db.get_deploy_notification_status(service_id)
-			if deploy_notifications_enabled:
-				significant_changes.extend(
-					[
-						("deploying", "online"),
-						("deploying", "offline"),
-					]
-				)
+		if deploy_notifications_enabled:
+			significant_changes.extend(
+				[
+					("deploying", "online"),
+					("deploying", "offline"),
+				]
+			)
 
 		return (old_status, new_status) in significant_changes
 
-	def _send_status_notification(self, service_id: str, service_name: str, old_status: str, new_status: str):
-		"""שליחת התראה על שינוי סטטוס"""
+	def _send_status_notification(
+		self, service_id: str, service_name: str, old_status: str, new_status: str, service_doc: Optional[dict] = None
+	):
+		"""שליחת התראה על שינוי סטטוס (service_doc מתמונת המצב חוסך שליפות מה-DB)"""
 		# בדיקה אם זה לא בגלל פעולה ידנית שלנו
-		last_action = db.get_last_manual_action(service_id)
+		if service_doc is not None and "last_manual_action_at" in service_doc:
+			action_time = service_doc.get("last_manual_action_at")
+		else:
+			last_action = db.get_last_manual_action(service_id)
+			action_time = last_action.get("timestamp") if last_action else None
 
-		if last_action:
-			action_time = last_action.get("timestamp")
-			if action_time:
-				if action_time.tzinfo is None:
-					action_time = action_time.replace(tzinfo=timezone.utc)
+		if action_time:
+			if action_time.tzinfo is None:
+				action_time = action_time.replace(tzinfo=timezone.utc)
 
-				time_since_action = datetime.now(timezone.utc) - action_time
+			time_since_action = datetime.now(timezone.utc) - action_time
 
-				# אם הפעולה הידנית האחרונה הייתה בדקות האחרונות, לא שולחים התראה
-				# חריג: לא לדכא התראת סיום דיפלוי (deploying -> online/offline)
-				if time_since_action.total_seconds() < self.cache_duration:
-					if not (old_status == "deploying" and new_status in {"online", "offline"}):
-						logger.info(f"Skipping notification for {service_name} - recent manual action")
-						return
+			# אם הפעולה הידנית האחרונה הייתה בדקות האחרונות, לא שולחים התראה
+			# חריג: לא לדכא התראת סיום דיפלוי (deploying -> online/offline)
+			if time_since_action.total_seconds() < self.cache_duration:
+				if not (old_status == "deploying" and new_status in {"online", "offline"}):
+					logger.info(f"Skipping notification for {service_name} - recent manual action")
+					return
 
 		# יצירת אימוג'י וטקסט פעולה מתאימים
 		if old_status == "deploying" and new_status == "online":
@@ -426,6 +729,7 @@ class StatusMonitor:
 			new_status=new_status,
 			emoji=emoji,
 			action=action,
+			service_doc=service_doc,
 		)
 
 	def _is_manual_action_recent(self, service_id: str) -> bool:
@@ -437,15 +741,18 @@ class StatusMonitor:
 		self.manual_action_cache.add(service_id)
 		# הסרה אוטומטית מהקאש אחרי הזמן שהוגדר
 		threading.Timer(self.cache_duration, lambda: self.manual_action_cache.discard(service_id)).start()
+		# פעולה ידנית צפויה לגרום למעבר מצב - נחזיר את השירות לקצב המהיר
+		self.request_fast_poll(service_id)
 
 		# רישום במסד הנתונים
 		db.record_manual_action(service_id)
 
-	def enable_monitoring(self, service_id: str, user_id: int) -> bool:
-		"""הפעלת ניטור סטטוס לשירות מסוים"""
+	def enable_monitoring(self, service_id: str, user_id: int, service_info: Optional[Dict[str, Any]] = None) -> bool:
+		"""הפעלת ניטור סטטוס לשירות מסוים (service_info - מידע שכבר נשלף מ-Render, אם יש)"""
 		try:
 			# קבלת מידע על השירות
-			service_info = render_api.get_service_info(service_id)
+			if service_info is None:
+				service_info = render_api.get_service_info(service_id)
 			if not service_info:
 				return False
 
@@ -509,6 +816,7 @@ class StatusMonitor:
 		רץ ברקע ולא חוסם. מונע כפילויות באמצעות ה-DB.
 		"""
 		def runner():
+			mark_background_requests()
 			try:
 				deadline = datetime.now(timezone.utc) + timedelta(minutes=max_minutes)
 			except Exception: